@@ -4,20 +4,36 @@ from typing import List, Optional
 import numpy as np
 import pandas as pd
 import duckdb
-from alpha_factory.datafeeds.mt5_feed import MT5
+from src.core.feature_graph import FeatureGraph
 
 
-def rsi(series: pd.Series, period: int = 14) -> pd.Series:
+def _wilder_avgs(series: pd.Series, period: int = 14) -> tuple[pd.Series, pd.Series]:
     delta = series.diff()
     gain = delta.clip(lower=0)
     loss = -delta.clip(upper=0)
     avg_gain = gain.ewm(alpha=1 / period, adjust=False).mean()
     avg_loss = loss.ewm(alpha=1 / period, adjust=False).mean()
+    return avg_gain, avg_loss
+
+
+def rsi(series: pd.Series, period: int = 14) -> pd.Series:
+    avg_gain, avg_loss = _wilder_avgs(series, period)
     rs = avg_gain / avg_loss.replace(0, np.nan)
     return 100 - (100 / (1 + rs))
 
 
-def build_features(df: pd.DataFrame, period_rsi: int = 14) -> pd.DataFrame:
+def build_features(
+    df: pd.DataFrame,
+    period_rsi: int = 14,
+    *,
+    graph: Optional[FeatureGraph] = None,
+    symbol: str = "",
+    timeframe: str = "",
+) -> pd.DataFrame:
+    """
+    Indicator columns on top of OHLC bars. Pass a shared FeatureGraph to reuse primitives
+    (and their disk cache) already computed by other callers for the same bars.
+    """
     if df is None or df.empty:
         return pd.DataFrame(
             columns=[
@@ -35,61 +51,221 @@ def build_features(df: pd.DataFrame, period_rsi: int = 14) -> pd.DataFrame:
                 "vol20",
             ]
         )
+    g = graph if graph is not None else FeatureGraph()
     out = df.copy()
-    out["ret"] = np.log(out["close"]).diff()
-    out["ema20"] = out["close"].ewm(span=20, adjust=False).mean()
-    out["ema50"] = out["close"].ewm(span=50, adjust=False).mean()
-    out["rsi14"] = rsi(out["close"], period=period_rsi)
-    out["vol20"] = out["ret"].rolling(20).std()
+    close = g.source(out["close"], symbol=symbol, timeframe=timeframe, field="close")
+    ret = g.node("logret", close)
+    out["ret"] = g.get(ret)
+    out["ema20"] = g.compute("ema", close, span=20)
+    out["ema50"] = g.compute("ema", close, span=50)
+    out["rsi14"] = g.compute("rsi", close, n=period_rsi)
+    out["vol20"] = g.compute("rolling_std", ret, n=20)
     return out
 
 
-def write_parquet(df: pd.DataFrame, path: str) -> str:
+# ---------------- incremental continuation ----------------
+VOL_WINDOW = 20
+EMA_SPANS = (20, 50)
+
+
+def _state_from(
+    close: pd.Series,
+    feat: pd.DataFrame,
+    avg_gain: pd.Series,
+    avg_loss: pd.Series,
+    rets: pd.Series,
+    period_rsi: int,
+) -> dict:
+    tail = rets.iloc[-(VOL_WINDOW - 1) :].tolist()
+    return {
+        "last_ts": pd.Timestamp(close.index[-1]),
+        "last_close": float(close.iloc[-1]),
+        "ema20": float(feat["ema20"].iloc[-1]),
+        "ema50": float(feat["ema50"].iloc[-1]),
+        "avg_gain": float(avg_gain.iloc[-1]),
+        "avg_loss": float(avg_loss.iloc[-1]),
+        "period_rsi": int(period_rsi),
+        "ret_tail": [None if pd.isna(x) else float(x) for x in tail],
+    }
+
+
+def continue_features(
+    df: pd.DataFrame, state: Optional[dict] = None, period_rsi: int = 14
+) -> tuple[pd.DataFrame, Optional[dict], str]:
+    """
+    Compute features only for bars newer than state["last_ts"], seeding the EMA and
+    Wilder recursions (and the vol window tail) from the persisted state. Produces the
+    same values a full build_features() over the whole history would.
+
+    Falls back to a full computation over df when there is no usable state: no state,
+    a different RSI period, or df does not overlap the stored last bar (gap/revision).
+    Returns (features for the computed bars, new state, "full" | "incremental" | "noop").
+    """
+    if df is None or df.empty:
+        return build_features(df), state, "noop"
+    df = df.sort_index()
+    usable = (
+        state is not None
+        and int(state.get("period_rsi", -1)) == int(period_rsi)
+        and state["last_ts"] in df.index
+        and np.isclose(float(df.loc[state["last_ts"], "close"]), state["last_close"])
+    )
+    if not usable:
+        feat = build_features(df, period_rsi)
+        avg_gain, avg_loss = _wilder_avgs(df["close"], period_rsi)
+        st = _state_from(df["close"], feat, avg_gain, avg_loss, feat["ret"], period_rsi)
+        return feat, st, "full"
+
+    new = df[df.index > state["last_ts"]]
+    if new.empty:
+        return build_features(None), state, "noop"
+
+    out = new.copy()
+    close = out["close"].astype(float)
+    # Prepending the carried value reproduces the adjust=False recursion exactly.
+    seeded = pd.concat([pd.Series([state["last_close"]]), close.reset_index(drop=True)])
+    seeded = seeded.reset_index(drop=True)
+    out["ret"] = np.log(seeded).diff().iloc[1:].to_numpy()
+    for span in EMA_SPANS:
+        prev = state[f"ema{span}"]
+        ema = pd.concat([pd.Series([prev]), close.reset_index(drop=True)]).reset_index(drop=True)
+        out[f"ema{span}"] = ema.ewm(span=span, adjust=False).mean().iloc[1:].to_numpy()
+
+    delta = seeded.diff().iloc[1:]
+    alpha = 1 / period_rsi
+    g = pd.concat([pd.Series([state["avg_gain"]]), delta.clip(lower=0)]).reset_index(drop=True)
+    lo = pd.concat([pd.Series([state["avg_loss"]]), -delta.clip(upper=0)]).reset_index(drop=True)
+    avg_gain = g.ewm(alpha=alpha, adjust=False).mean().iloc[1:]
+    avg_loss = lo.ewm(alpha=alpha, adjust=False).mean().iloc[1:]
+    rs = avg_gain / avg_loss.replace(0, np.nan)
+    out["rsi14"] = (100 - (100 / (1 + rs))).to_numpy()
+
+    tail = pd.Series([np.nan if x is None else x for x in state["ret_tail"]], dtype=float)
+    rets = pd.concat([tail, pd.Series(out["ret"].to_numpy())]).reset_index(drop=True)
+    out["vol20"] = rets.rolling(VOL_WINDOW).std().iloc[-len(out) :].to_numpy()
+
+    return out, _state_from(close, out, avg_gain, avg_loss, rets, period_rsi), "incremental"
+
+
+# ---------------- persistence ----------------
+FEATURE_COLS = [
+    "ts",
+    "symbol",
+    "timeframe",
+    "open",
+    "high",
+    "low",
+    "close",
+    "tick_volume",
+    "spread",
+    "real_volume",
+    "ret",
+    "ema20",
+    "ema50",
+    "rsi14",
+    "vol20",
+]
+STATE_TABLE = "features_state"
+
+
+def write_parquet(df: pd.DataFrame, path: str, *, merge: bool = False) -> str:
     os.makedirs(os.path.dirname(path), exist_ok=True)
+    if merge and os.path.exists(path):
+        old = pd.read_parquet(path)
+        df = pd.concat([old[~old.index.isin(df.index)], df]).sort_index()
     df.to_parquet(path, index=True)
     return os.path.abspath(path)
 
 
-def write_duckdb(df: pd.DataFrame, db_path: str, table: str = "features") -> str:
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    con = duckdb.connect(db_path)
+def _ensure_tables(con, table: str) -> None:
+    con.execute(
+        f"CREATE TABLE IF NOT EXISTS {table} ("
+        "ts TIMESTAMP, "
+        "symbol TEXT, "
+        "timeframe TEXT, "
+        "open DOUBLE, high DOUBLE, low DOUBLE, close DOUBLE, "
+        "tick_volume BIGINT, spread BIGINT, real_volume BIGINT, "
+        "ret DOUBLE, ema20 DOUBLE, ema50 DOUBLE, rsi14 DOUBLE, vol20 DOUBLE)"
+    )
+    con.execute(
+        f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} ("
+        "symbol TEXT, timeframe TEXT, last_ts TIMESTAMP, last_close DOUBLE, "
+        "ema20 DOUBLE, ema50 DOUBLE, avg_gain DOUBLE, avg_loss DOUBLE, "
+        "period_rsi INTEGER, ret_tail TEXT, "
+        "PRIMARY KEY (symbol, timeframe))"
+    )
+
+
+def load_state(con, symbol: str, timeframe: str) -> Optional[dict]:
+    """Persisted indicator state for (symbol, timeframe), or None."""
+    _ensure_tables(con, "features")
+    row = con.execute(
+        f"SELECT last_ts, last_close, ema20, ema50, avg_gain, avg_loss, period_rsi, ret_tail "
+        f"FROM {STATE_TABLE} WHERE symbol = ? AND timeframe = ?",
+        [symbol, timeframe],
+    ).fetchone()
+    if row is None:
+        return None
+    keys = ["last_ts", "last_close", "ema20", "ema50", "avg_gain", "avg_loss", "period_rsi"]
+    st = dict(zip(keys, row[:7]))
+    st["last_ts"] = pd.Timestamp(st["last_ts"])
+    st["ret_tail"] = json.loads(row[7] or "[]")
+    return st
+
+
+def _write_duckdb_con(
+    con, df: pd.DataFrame, table: str = "features", state: Optional[dict] = None
+) -> None:
+    dfw = df.reset_index().rename(columns={"time": "ts"})
+    for c in FEATURE_COLS:
+        if c not in dfw.columns:
+            dfw[c] = np.nan
+    dfw = dfw[FEATURE_COLS]
+    dfw["ts"] = pd.to_datetime(dfw["ts"])
+
+    _ensure_tables(con, table)
+    con.register("df_temp", dfw)
+    con.execute("BEGIN TRANSACTION")
     try:
-        dfw = df.reset_index().rename(columns={"time": "ts"})
-        cols = [
-            "ts",
-            "symbol",
-            "timeframe",
-            "open",
-            "high",
-            "low",
-            "close",
-            "tick_volume",
-            "spread",
-            "real_volume",
-            "ret",
-            "ema20",
-            "ema50",
-            "rsi14",
-            "vol20",
-        ]
-        for c in cols:
-            if c not in dfw.columns:
-                dfw[c] = np.nan
-        dfw = dfw[cols]
-        dfw["ts"] = pd.to_datetime(dfw["ts"])
-
-        ddl = (
-            f"CREATE TABLE IF NOT EXISTS {table} ("
-            "ts TIMESTAMP, "
-            "symbol TEXT, "
-            "timeframe TEXT, "
-            "open DOUBLE, high DOUBLE, low DOUBLE, close DOUBLE, "
-            "tick_volume BIGINT, spread BIGINT, real_volume BIGINT, "
-            "ret DOUBLE, ema20 DOUBLE, ema50 DOUBLE, rsi14 DOUBLE, vol20 DOUBLE)"
+        # Keyed on (ts, symbol, timeframe): reruns replace rows instead of duplicating them.
+        con.execute(
+            f"DELETE FROM {table} USING df_temp "
+            f"WHERE {table}.ts = df_temp.ts AND {table}.symbol = df_temp.symbol "
+            f"AND {table}.timeframe = df_temp.timeframe"
         )
-        con.execute(ddl)
-        con.register("df_temp", dfw)
         con.execute(f"INSERT INTO {table} SELECT * FROM df_temp")
+        if state is not None:
+            sym, tf = str(dfw["symbol"].iloc[0]), str(dfw["timeframe"].iloc[0])
+            con.execute(
+                f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    sym,
+                    tf,
+                    state["last_ts"].to_pydatetime(),
+                    state["last_close"],
+                    state["ema20"],
+                    state["ema50"],
+                    state["avg_gain"],
+                    state["avg_loss"],
+                    state["period_rsi"],
+                    json.dumps(state["ret_tail"]),
+                ],
+            )
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    finally:
+        con.unregister("df_temp")
+
+
+def write_duckdb(
+    df: pd.DataFrame, db_path: str, table: str = "features", state: Optional[dict] = None
+) -> str:
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    con = duckdb.connect(db_path)
+    try:
+        _write_duckdb_con(con, df, table, state)
     finally:
         con.close()
     return os.path.abspath(db_path)
@@ -104,43 +280,42 @@ def run(
     out_parquet_dir: Optional[str],
     out_duckdb: Optional[str],
 ) -> dict:
+    from alpha_factory.datafeeds.mt5_feed import MT5  # needs the MetaTrader5 terminal
+
     api = MT5()
+    con = None
+    if out_duckdb:
+        os.makedirs(os.path.dirname(out_duckdb), exist_ok=True)
+        con = duckdb.connect(out_duckdb)
     results = {}
-    for sym in symbols:
-        if count is not None:
-            bars = api.copy_rates_df(sym, timeframe=timeframe, count=int(count))
-        else:
-            bars = api.copy_rates_range_df(sym, timeframe=timeframe, dt_from=dt_from, dt_to=dt_to)
-        feat = build_features(bars)
-        feat["symbol"] = sym
-        feat["timeframe"] = timeframe
-        wrote = {}
-        if out_parquet_dir:
-            p = os.path.join(out_parquet_dir, f"{sym}_{timeframe}.parquet")
-            wrote["parquet"] = write_parquet(feat, p)
-        if out_duckdb:
-            wrote["duckdb"] = write_duckdb(
-                feat[
-                    [
-                        "open",
-                        "high",
-                        "low",
-                        "close",
-                        "tick_volume",
-                        "spread",
-                        "real_volume",
-                        "ret",
-                        "ema20",
-                        "ema50",
-                        "rsi14",
-                        "vol20",
-                        "symbol",
-                        "timeframe",
-                    ]
-                ],
-                out_duckdb,
-            )
-        results[sym] = {"rows": int(len(feat)), "outputs": wrote}
+    try:
+        for sym in symbols:
+            if count is not None:
+                bars = api.copy_rates_df(sym, timeframe=timeframe, count=int(count))
+            else:
+                bars = api.copy_rates_range_df(
+                    sym, timeframe=timeframe, dt_from=dt_from, dt_to=dt_to
+                )
+            if con is not None:
+                # Indicator state lives next to the features: only bars past it are computed.
+                state = load_state(con, sym, timeframe)
+                feat, state, mode = continue_features(bars, state)
+            else:
+                feat = build_features(bars, symbol=sym, timeframe=timeframe)
+                state, mode = None, "full"
+            feat["symbol"] = sym
+            feat["timeframe"] = timeframe
+            wrote = {}
+            if out_parquet_dir and len(feat):
+                p = os.path.join(out_parquet_dir, f"{sym}_{timeframe}.parquet")
+                wrote["parquet"] = write_parquet(feat, p, merge=mode != "full")
+            if con is not None and len(feat):
+                _write_duckdb_con(con, feat, state=state)
+                wrote["duckdb"] = os.path.abspath(out_duckdb)
+            results[sym] = {"rows": int(len(feat)), "mode": mode, "outputs": wrote}
+    finally:
+        if con is not None:
+            con.close()
     return results
 
 
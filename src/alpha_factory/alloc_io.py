@@ -59,27 +59,65 @@ def load_latest_alloc(dirpath: str | Path = "artifacts/allocations") -> Allocati
     return Allocation(weights=weights)
 
 
-def apply_meta_weights(per_sleeve_signals: Mapping[str, "pd.Series"], weights: Mapping[str, float]):
+def align_signals(per_sleeve_signals: Mapping[str, "pd.Series"]):
     """
-    Combine per-sleeve signed signals (or target exposures) with allocation weights.
-    Assumes each series is already in [-1, +1] or desired units.
-    Returns a single combined series aligned to the union index.
+    Stack sleeve series onto their union index.
+    Returns (index, sleeve names, float array [time x sleeve]) with gaps as 0.0.
     """
-    import pandas as pd
+    import numpy as np
 
     if not per_sleeve_signals:
         raise ValueError("No sleeve signals provided.")
+    series = list(per_sleeve_signals.values())
+    idx = series[0].index
+    for s in series[1:]:
+        if not s.index.equals(idx):
+            idx = idx.union(s.index)
+    X = np.empty((len(idx), len(series)), dtype=float)
+    for j, s in enumerate(series):
+        col = s if s.index.equals(idx) else s.reindex(idx)
+        X[:, j] = col.to_numpy(dtype=float, na_value=np.nan)
+    X[np.isnan(X)] = 0.0
+    return idx, list(per_sleeve_signals.keys()), X
+
+
+def weights_array(weights, idx: "pd.Index", sleeves: list[str]):
+    """
+    Allocation weights as an array broadcastable against [time x sleeve] signals:
+    shape (sleeve,) for a static mapping, (time, sleeve) for a DataFrame of weights
+    indexed by rebalance time (each row applies until the next; zero before the first).
+    """
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(weights, pd.DataFrame):
+        W = weights.astype(float)
+        if W.empty:
+            raise ValueError("No allocation weights found.")
+        vals = W.to_numpy()
+        eps = 1e-6
+        if ((vals < -eps) | (vals > 1.0 + eps)).any():
+            raise ValueError("Weight out of range in allocation frame")
+        bad = np.abs(np.nansum(vals, axis=1) - 1.0) > 1e-4
+        if bad.any():
+            raise ValueError(f"Weights do not sum to 1.0 at {W.index[bad][0]}")
+        W = W.reindex(columns=sleeves).sort_index()
+        return W.reindex(idx, method="ffill").fillna(0.0).to_numpy()
     validate_alloc(weights)
+    return np.array([float(weights.get(k, 0.0)) for k in sleeves])
 
-    # Union index across series
-    idx = None
-    for s in per_sleeve_signals.values():
-        idx = s.index if idx is None else idx.union(s.index)
 
-    out = pd.Series(0.0, index=idx)
-    for k, s in per_sleeve_signals.items():
-        w = float(weights.get(k, 0.0))
-        if w == 0.0:
-            continue
-        out = out.add(s.reindex(idx).fillna(0.0) * w, fill_value=0.0)
-    return out
+def apply_meta_weights(per_sleeve_signals: Mapping[str, "pd.Series"], weights):
+    """
+    Combine per-sleeve signed signals (or target exposures) with allocation weights.
+    Assumes each series is already in [-1, +1] or desired units.
+    `weights` is a {sleeve: weight} mapping or a [time x sleeve] DataFrame of weights
+    (e.g. MetaAllocator.allocate_many output).
+    Returns a single combined series aligned to the union index.
+    """
+    import pandas as pd
+
+    idx, sleeves, X = align_signals(per_sleeve_signals)
+    w = weights_array(weights, idx, sleeves)
+    combo = X @ w if w.ndim == 1 else (X * w).sum(axis=1)
+    return pd.Series(combo, index=idx)
@@ -1,38 +1,145 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Iterable
 import json
+import uuid
 import duckdb
+import numpy as np
+import pandas as pd
+
+# Metrics stored as typed DOUBLE columns on `alphas`; any other numeric key goes to the
+# long table alpha_metrics(run_id, metric, value). The JSON text stays the full record.
+TYPED_METRICS = ("sharpe", "sortino", "cagr", "maxdd", "calmar", "vol", "ret", "hit_rate", "turnover")
+
+
+# json.dumps(..., sort_keys=True) builds a new encoder per call; reuse one
+_JSON = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
+
+@lru_cache(maxsize=4096)
+def _tags_text(tags: str) -> str:
+    # Canonical comma-joined tag set (sweeps repeat the same few tag strings)
+    return ",".join(sorted(set(t.strip() for t in tags.split(",") if t.strip())))
+
+
+def _as_float(v: Any) -> float | None:
+    if isinstance(v, bool) or v is None:
+        return None
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if np.isnan(f) else f
+
+
+def _numeric(col: pd.Series) -> pd.Series:
+    # Vectorized _as_float for a column of metric values (bools are not metrics)
+    if col.dtype == bool:
+        return pd.Series(np.nan, index=col.index)
+    if col.dtype == object:
+        col = col.where(~col.map(lambda v: isinstance(v, bool)))
+    return pd.to_numeric(col, errors="coerce").astype(float)
+
+
+def metric_value_sql(metric: str, alias: str = "a") -> tuple[str, str]:
+    """
+    (join_sql, value_expr) reading `metric` for rows of `alphas AS {alias}`:
+    a typed column when there is one, else a join on the long alpha_metrics table.
+    """
+    if metric in TYPED_METRICS:
+        return "", f"{alias}.{metric}"
+    m = metric.replace("'", "''")
+    join = (
+        f"LEFT JOIN alpha_metrics am ON am.run_id = {alias}.id AND am.metric = '{m}'"
+    )
+    return join, "am.value"
+
+
+def tag_filter_sql(
+    tag: str | Iterable[str] | None = None,
+    any_tags: Iterable[str] | None = None,
+    id_expr: str = "a.id",
+) -> tuple[str, list]:
+    """
+    ("WHERE ...", params) restricting `id_expr` through alpha_tags: every tag in `tag`
+    (AND, one semi-join grouped by run) and at least one of `any_tags` (OR). "" if no filter.
+    """
+    all_tags = [tag] if isinstance(tag, str) else list(tag or [])
+    all_tags = sorted({str(t).strip() for t in all_tags if str(t).strip()})
+    any_list = sorted({str(t).strip() for t in any_tags or [] if str(t).strip()})
+    clauses: list[str] = []
+    params: list = []
+    if all_tags:
+        marks = ", ".join("?" for _ in all_tags)
+        having = f" GROUP BY run_id HAVING COUNT(*) = {len(all_tags)}" if len(all_tags) > 1 else ""
+        clauses.append(f"{id_expr} IN (SELECT run_id FROM alpha_tags WHERE tag IN ({marks}){having})")
+        params.extend(all_tags)
+    if any_list:
+        marks = ", ".join("?" for _ in any_list)
+        clauses.append(f"{id_expr} IN (SELECT run_id FROM alpha_tags WHERE tag IN ({marks}))")
+        params.extend(any_list)
+    return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
 
 
 class AlphaRegistry:
     """
     Minimal registry for alpha runs (DuckDB).
-    Table: alphas(id BIGINT PK, ts TIMESTAMP, config_hash TEXT, metrics TEXT(JSON), tags TEXT)
+    Table: alphas(id BIGINT PK, ts TIMESTAMP, config_hash TEXT, metrics TEXT(JSON), tags TEXT,
+                  <TYPED_METRICS> DOUBLE, metrics_typed BOOLEAN, tags_indexed BOOLEAN)
+    Table: alpha_metrics(run_id, metric, value DOUBLE) for the remaining numeric keys
+    Table: alpha_tags(run_id, tag) exact tag index behind the tag filters; rows are written
+           once per run (tags are de-duplicated), so it carries no key to keep bulk inserts cheap
+
+    Holds one connection for its lifetime (opened lazily, reopened if db_path changes);
+    ids come from the alphas_id_seq sequence. Use close() or a with-block to release it.
     """
 
     def __init__(self, db_path: str | Path):
         self.db_path = str(db_path)
+        self._con: duckdb.DuckDBPyConnection | None = None
+        self._con_path: str | None = None
+        self._schema_ready = False
+
+    # ---- connection ----
+    @property
+    def con(self) -> duckdb.DuckDBPyConnection:
+        if self._con is None or self._con_path != str(self.db_path):
+            self.close()
+            path = str(self.db_path)
+            if path not in ("", ":memory:"):
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._con = duckdb.connect(path)
+            self._con_path = path
+            self._schema_ready = False
+        return self._con
+
+    def _writer(self) -> duckdb.DuckDBPyConnection:
+        # Schema + id sequence are checked once per connection, not per write
+        con = self.con
+        if not self._schema_ready:
+            self._ensure_schema(con)
+            self._schema_ready = True
+        return con
+
+    def close(self) -> None:
+        if self._con is not None:
+            try:
+                self._con.close()
+            finally:
+                self._con = None
+                self._con_path = None
+
+    def __enter__(self) -> "AlphaRegistry":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
     # Optional initializer if callers want to pre-create schema
     def init(self) -> "AlphaRegistry":
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        con = duckdb.connect(self.db_path)
-        try:
-            con.execute(
-                """
-                CREATE TABLE IF NOT EXISTS alphas (
-                  id BIGINT PRIMARY KEY,
-                  ts TIMESTAMP NOT NULL DEFAULT now(),
-                  config_hash TEXT NOT NULL,
-                  metrics TEXT NOT NULL,
-                  tags TEXT NOT NULL
-                );
-                """
-            )
-        finally:
-            con.close()
+        self._writer()
         return self
 
     # Internal helper to ensure schema *inside* transactions
@@ -48,8 +155,199 @@ class AlphaRegistry:
             );
             """
         )
+        self._ensure_generation(con)
+        self._ensure_sequence(con)
+        self._ensure_index_tables(con)
+
+    # ---- write generation ----
+    # Bumped in the same transaction as every write, so cached query results tagged
+    # with a generation (see registry_session.ResultCache) stay valid until the next write.
+    # registry_meta has no primary key on purpose: DuckDB < 1.2 rejects an UPDATE of an
+    # indexed row inside a transaction ("Duplicate key"), which every bump would be.
+    def _ensure_generation(self, con) -> None:
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS registry_meta (key TEXT NOT NULL, value BIGINT NOT NULL)"
+        )
+        # Random id drawn once per database: a recreated file restarts at generation 0,
+        # but under a new instance, so results cached for the old file never match it.
+        # 63 bits of the UUID fit the BIGINT value column.
+        for key, value in (("generation", 0), ("instance", uuid.uuid4().int >> 65)):
+            con.execute(
+                "INSERT INTO registry_meta SELECT ?, ? "
+                "WHERE NOT EXISTS (SELECT 1 FROM registry_meta WHERE key = ?)",
+                [key, value, key],
+            )
+
+    def _bump(self, con) -> int:
+        return int(
+            con.execute(
+                "UPDATE registry_meta SET value = value + 1 WHERE key = 'generation' RETURNING value"
+            ).fetchone()[0]
+        )
+
+    @property
+    def generation(self) -> int:
+        """Write generation of the registry database (read from registry_meta, so any writer counts)."""
+        con = self._writer()
+        return int(
+            con.execute("SELECT value FROM registry_meta WHERE key = 'generation'").fetchone()[0]
+        )
+
+    @property
+    def instance(self) -> int:
+        """Random id of the registry database, drawn when its registry_meta was created."""
+        con = self._writer()
+        return int(
+            con.execute("SELECT value FROM registry_meta WHERE key = 'instance'").fetchone()[0]
+        )
+
+    def bump_generation(self) -> int:
+        """Mark the registry changed after writing its tables directly with SQL."""
+        return self._bump(self._writer())
+
+    def _ensure_index_tables(self, con) -> None:
+        # Idempotent migration: older tables gain the typed columns / tag rows and are backfilled
+        for m in TYPED_METRICS:
+            con.execute(f"ALTER TABLE alphas ADD COLUMN IF NOT EXISTS {m} DOUBLE")
+        con.execute("ALTER TABLE alphas ADD COLUMN IF NOT EXISTS metrics_typed BOOLEAN")
+        con.execute("ALTER TABLE alphas ADD COLUMN IF NOT EXISTS tags_indexed BOOLEAN")
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS alpha_metrics (
+              run_id BIGINT NOT NULL,
+              metric TEXT NOT NULL,
+              value DOUBLE,
+              PRIMARY KEY (run_id, metric)
+            );
+            """
+        )
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS alpha_tags (
+              run_id BIGINT NOT NULL,
+              tag TEXT NOT NULL
+            );
+            """
+        )
+        self._sync_metrics(con)
+        self._sync_tags(con)
+
+    def sync_index(self) -> int:
+        """
+        Fill typed metric columns, alpha_metrics and alpha_tags for rows written without
+        them (legacy rows, direct inserts by other tools). Returns the number of rows indexed.
+        """
+        con = self._writer()
+        return max(self._sync_metrics(con), self._sync_tags(con))
+
+    def _sync_tags(self, con) -> int:
+        n = con.execute(
+            "SELECT COUNT(*) FROM alphas WHERE tags_indexed IS NOT TRUE AND id IS NOT NULL"
+        ).fetchone()[0]
+        if not n:
+            return 0
+        con.execute("BEGIN")
+        try:
+            con.execute(
+                """
+                INSERT INTO alpha_tags (run_id, tag)
+                SELECT DISTINCT id, tag FROM (
+                  SELECT id, trim(unnest(string_split(COALESCE(tags, ''), ','))) AS tag
+                  FROM alphas
+                  WHERE tags_indexed IS NOT TRUE AND id IS NOT NULL
+                )
+                WHERE tag <> ''
+                """
+            )
+            con.execute(
+                "UPDATE alphas SET tags_indexed = true "
+                "WHERE tags_indexed IS NOT TRUE AND id IS NOT NULL"
+            )
+            self._bump(con)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        return int(n)
+
+    def _sync_metrics(self, con) -> int:
+        n = con.execute(
+            "SELECT COUNT(*) FROM alphas WHERE metrics_typed IS NOT TRUE AND id IS NOT NULL"
+        ).fetchone()[0]
+        if not n:
+            return 0
+        # NaN -> NULL like _as_float(), so typed columns agree with alpha_metrics and
+        # NaN never sorts first in get_best()/search()
+        value = "TRY_CAST(json_extract_string(CAST(metrics AS TEXT), '$.\"{m}\"') AS DOUBLE)"
+        typed = ", ".join(
+            f"{m} = CASE WHEN isnan({value.format(m=m)}) THEN NULL ELSE {value.format(m=m)} END"
+            for m in TYPED_METRICS
+        )
+        names = ", ".join(f"'{m}'" for m in TYPED_METRICS)
+        con.execute("BEGIN")
+        try:
+            con.execute(
+                f"""
+                INSERT OR REPLACE INTO alpha_metrics (run_id, metric, value)
+                SELECT id, k, v FROM (
+                  SELECT id, k,
+                         TRY_CAST(json_extract_string(m, '$."' || k || '"') AS DOUBLE) AS v
+                  FROM (
+                    SELECT id, CAST(metrics AS TEXT) AS m,
+                           unnest(json_keys(CAST(metrics AS TEXT))) AS k
+                    FROM alphas
+                    WHERE metrics_typed IS NOT TRUE AND id IS NOT NULL
+                  )
+                )
+                WHERE k NOT IN ({names}) AND v IS NOT NULL AND NOT isnan(v)
+                """
+            )
+            con.execute(
+                f"UPDATE alphas SET {typed}, metrics_typed = true "
+                "WHERE metrics_typed IS NOT TRUE AND id IS NOT NULL"
+            )
+            self._bump(con)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        return int(n)
+
+    @staticmethod
+    def _ensure_sequence(con) -> None:
+        # Seed (or re-seed) past the highest existing id: tables may predate the
+        # sequence or have been filled by tools that insert ids themselves.
+        top = con.execute("SELECT COALESCE(MAX(id), 0) FROM alphas").fetchone()[0]
+        row = con.execute(
+            "SELECT last_value FROM duckdb_sequences() WHERE sequence_name = 'alphas_id_seq'"
+        ).fetchone()
+        if row is None or (row[0] or 0) < int(top):
+            con.execute(f"CREATE OR REPLACE SEQUENCE alphas_id_seq START {int(top) + 1}")
 
     # ---- writes ----
+    @staticmethod
+    def _encode(metrics: dict[str, Any] | str | None, tags: Iterable[str] | str | None):
+        if isinstance(metrics, str):
+            metrics = json.loads(metrics) if metrics.strip() else {}
+        if isinstance(tags, str):
+            tags_s = _tags_text(tags)
+        else:
+            tags_s = _tags_text(",".join(str(t) for t in tags or []))
+        metrics = metrics or {}
+        mjson = _JSON.encode(metrics)
+        return metrics, mjson, tags_s
+
+    @staticmethod
+    def _split_metrics(metrics: dict[str, Any]) -> tuple[list[float | None], dict[str, float]]:
+        typed = [_as_float(metrics.get(m)) for m in TYPED_METRICS]
+        extra = {}
+        for k, v in metrics.items():
+            if k not in TYPED_METRICS:
+                f = _as_float(v)
+                if f is not None:
+                    extra[str(k)] = f
+        return typed, extra
+
     def register(
         self,
         config_hash: str,
@@ -57,147 +355,210 @@ class AlphaRegistry:
         tags: Iterable[str] | None = None,
     ) -> int:
         """Insert a run; returns generated id."""
-        tags = tags or []
-        tags_s = ",".join(sorted(set(str(t).strip() for t in tags if str(t).strip())))
-        mjson = json.dumps(metrics or {}, sort_keys=True, separators=(",", ":"))
-
-        con = duckdb.connect(self.db_path)
+        metrics, mjson, tags_s = self._encode(metrics, tags)
+        typed, extra = self._split_metrics(metrics)
+        con = self._writer()
+        cols = ", ".join(TYPED_METRICS)
+        marks = ", ".join("?" for _ in TYPED_METRICS)
+        con.execute("BEGIN")
         try:
-            con.execute("BEGIN")
-            self._ensure_schema(con)  # make the table if missing
-            next_id = con.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM alphas;").fetchone()[0]
             rid = con.execute(
-                "INSERT INTO alphas (id, config_hash, metrics, tags) VALUES (?, ?, ?, ?) RETURNING id;",
-                [int(next_id), config_hash, mjson, tags_s],
+                f"INSERT INTO alphas (id, config_hash, metrics, tags, {cols}, metrics_typed, "
+                f"tags_indexed) VALUES (nextval('alphas_id_seq'), ?, ?, ?, {marks}, true, true) "
+                "RETURNING id;",
+                [config_hash, mjson, tags_s, *typed],
             ).fetchone()[0]
+            if tags_s:
+                con.executemany(
+                    "INSERT INTO alpha_tags (run_id, tag) VALUES (?, ?)",
+                    [[rid, t] for t in tags_s.split(",")],
+                )
+            if extra:
+                con.executemany(
+                    "INSERT OR REPLACE INTO alpha_metrics (run_id, metric, value) VALUES (?, ?, ?)",
+                    [[rid, k, v] for k, v in extra.items()],
+                )
+            self._bump(con)
             con.execute("COMMIT")
         except Exception:
             con.execute("ROLLBACK")
             raise
-        finally:
-            con.close()
         return int(rid)
 
-    # ---- reads ----
-    def get_best(self, metric: str, n: int = 1) -> list[tuple]:
+    def register_many(self, runs: pd.DataFrame) -> list[int]:
         """
-        Return top-n rows ordered by the JSON metric (desc), with a computed 'score' column last.
-        Row columns: (id, ts, config_hash, metrics, tags, score)
+        Insert a batch of runs in one transaction; returns the generated ids in row order.
+        `runs` needs config_hash and metrics (dict or JSON text) columns; tags is optional
+        (iterable or comma-joined string per row).
         """
-        con = duckdb.connect(self.db_path)
+        if runs is None or len(runs) == 0:
+            return []
+        tags_col = runs["tags"] if "tags" in runs.columns else [None] * len(runs)
+        enc = [self._encode(m, t) for m, t in zip(runs["metrics"], tags_col)]
+        con = self._writer()
+        con.execute("BEGIN")
         try:
-            rows = con.execute(
-                f"""
-                SELECT
-                  id, ts, config_hash, metrics, tags,
-                  CAST(json_extract(metrics, '$.{metric}') AS DOUBLE) AS score
-                FROM alphas
-                ORDER BY score DESC NULLS LAST, id ASC
-                LIMIT ?;
-                """,
-                [n],
-            ).fetchall()
+            # Reserve the ids inside the write transaction so they map onto rows in order
+            ids = np.sort(
+                con.execute(
+                    "SELECT nextval('alphas_id_seq') AS id FROM range(?)", [len(runs)]
+                ).fetchnumpy()["id"]
+            ).astype(np.int64)
+            self._insert_many(con, runs, enc, ids)
+            self._bump(con)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        return ids.tolist()
+
+    @staticmethod
+    def _insert_many(con, runs: pd.DataFrame, enc: list, ids: np.ndarray) -> None:
+        incoming = pd.DataFrame(
+            {
+                "id": ids,
+                "config_hash": runs["config_hash"].astype(str).to_numpy(),
+                "metrics": [e[1] for e in enc],
+                "tags": [e[2] for e in enc],
+            }
+        )
+        recs = pd.DataFrame.from_records([e[0] for e in enc])
+        for m in TYPED_METRICS:
+            incoming[m] = _numeric(recs[m]).to_numpy() if m in recs.columns else np.nan
+        extra = recs.drop(columns=[c for c in recs.columns if c in TYPED_METRICS])
+        extra.index = ids
+        long = (
+            extra.apply(_numeric)
+            .rename_axis("run_id")
+            .reset_index()
+            .melt(id_vars="run_id", var_name="metric", value_name="value")
+            .dropna(subset=["value"])
+        )
+        long["metric"] = long["metric"].astype(str)
+        cols = ", ".join(TYPED_METRICS)
+        con.register("_alphas_incoming", incoming)
+        con.register("_alpha_metrics_incoming", long)
+        try:
+            con.execute(
+                f"INSERT INTO alphas (id, config_hash, metrics, tags, {cols}, metrics_typed, "
+                f"tags_indexed) SELECT id, config_hash, metrics, tags, {cols}, true, true "
+                "FROM _alphas_incoming;"
+            )
+            con.execute(
+                """
+                INSERT INTO alpha_tags (run_id, tag)
+                SELECT id, tag FROM (
+                  SELECT id, unnest(string_split(tags, ',')) AS tag
+                  FROM _alphas_incoming WHERE tags <> ''
+                )
+                """
+            )
+            if len(long):
+                con.execute(
+                    "INSERT OR REPLACE INTO alpha_metrics (run_id, metric, value) "
+                    "SELECT run_id, metric, value FROM _alpha_metrics_incoming;"
+                )
         finally:
-            con.close()
+            con.unregister("_alphas_incoming")
+            con.unregister("_alpha_metrics_incoming")
+
+    # ---- reads ----
+    # Tag filters: `tag` is one tag or an iterable of tags that must all be present (AND);
+    # `any_tags` matches runs carrying at least one of them (OR). Matching is exact.
+    def get_best(
+        self,
+        metric: str,
+        n: int = 1,
+        tag: str | Iterable[str] | None = None,
+        any_tags: Iterable[str] | None = None,
+    ) -> list[tuple]:
+        """
+        Return top-n rows ordered by the metric (desc), with a computed 'score' column last.
+        Row columns: (id, ts, config_hash, metrics, tags, score)
+        """
+        join, score = metric_value_sql(metric)
+        tag_sql, params = tag_filter_sql(tag, any_tags)
+        rows = self._writer().execute(
+            f"""
+            SELECT
+              a.id, a.ts, a.config_hash, a.metrics, a.tags,
+              {score} AS score
+            FROM alphas a
+            {join}
+            {tag_sql}
+            ORDER BY score DESC NULLS LAST, a.id ASC
+            LIMIT ?;
+            """,
+            [*params, n],
+        ).fetchall()
         return list(rows)
 
-    def list_recent(self, tag: str | None = None, limit: int = 10) -> list[tuple]:
+    def list_recent(
+        self,
+        tag: str | Iterable[str] | None = None,
+        limit: int = 10,
+        any_tags: Iterable[str] | None = None,
+    ) -> list[tuple]:
         """Return recent rows (id, ts, config_hash, metrics, tags), newest first."""
-        con = duckdb.connect(self.db_path)
-        try:
-            if tag:
-                rows = con.execute(
-                    """
-                    SELECT id, ts, config_hash, metrics, tags
-                    FROM alphas
-                    WHERE position(? in tags) > 0
-                    ORDER BY ts DESC, id DESC
-                    LIMIT ?;
-                    """,
-                    [tag, limit],
-                ).fetchall()
-            else:
-                rows = con.execute(
-                    """
-                    SELECT id, ts, config_hash, metrics, tags
-                    FROM alphas
-                    ORDER BY ts DESC, id DESC
-                    LIMIT ?;
-                    """,
-                    [limit],
-                ).fetchall()
-        finally:
-            con.close()
+        tag_sql, params = tag_filter_sql(tag, any_tags)
+        rows = self._writer().execute(
+            f"""
+            SELECT a.id, a.ts, a.config_hash, a.metrics, a.tags
+            FROM alphas a
+            {tag_sql}
+            ORDER BY a.ts DESC, a.id DESC
+            LIMIT ?;
+            """,
+            [*params, limit],
+        ).fetchall()
         return list(rows)
 
-    def get_latest(self, tag: str | None = None) -> tuple | None:
+    def get_latest(
+        self,
+        tag: str | Iterable[str] | None = None,
+        any_tags: Iterable[str] | None = None,
+    ) -> tuple | None:
         """Return newest row (id, ts, config_hash, metrics, tags)."""
-        con = duckdb.connect(self.db_path)
-        try:
-            if tag:
-                q = """
-                SELECT id, ts, config_hash, metrics, tags
-                FROM alphas
-                WHERE position(? in tags) > 0
-                ORDER BY ts DESC, id DESC
-                LIMIT 1;
-                """
-                rows = con.execute(q, [tag]).fetchall()
-            else:
-                q = """
-                SELECT id, ts, config_hash, metrics, tags
-                FROM alphas
-                ORDER BY ts DESC, id DESC
-                LIMIT 1;
-                """
-                rows = con.execute(q).fetchall()
-            return rows[0] if rows else None
-        finally:
-            con.close()
+        rows = self.list_recent(tag, limit=1, any_tags=any_tags)
+        return rows[0] if rows else None
 
     def search(
         self,
         metric: str,
         min: float | None = None,
         max: float | None = None,
-        tag: str | None = None,
+        tag: str | Iterable[str] | None = None,
         limit: int = 50,
+        any_tags: Iterable[str] | None = None,
     ) -> list[tuple]:
         """
-        Return rows (id, ts, config_hash, metrics, tags, score) where
-        score = CAST(json_extract(metrics, '$.{metric}') AS DOUBLE).
-        Optional bounds: min/max. Optional tag substring filter.
+        Return rows (id, ts, config_hash, metrics, tags, score) where score is the
+        metric's typed column (or its alpha_metrics value for non-typed keys).
+        Optional bounds: min/max. Optional tag filters (see above).
         Ordered by score DESC NULLS LAST, ts DESC, id DESC.
         """
-        con = duckdb.connect(self.db_path)
-        try:
-            clauses: list[str] = []
-            params: list[object] = []
-
-            score_expr = f"CAST(json_extract(metrics, '$.{metric}') AS DOUBLE)"
-
-            if min is not None:
-                clauses.append(score_expr + " >= ?")
-                params.append(float(min))
-            if max is not None:
-                clauses.append(score_expr + " <= ?")
-                params.append(float(max))
-            if tag:
-                clauses.append("position(? in tags) > 0")
-                params.append(tag)
-
-            where_sql = (" WHERE " + " AND ".join(clauses)) if clauses else ""
-            sql = f"""
-                SELECT id, ts, config_hash, metrics, tags, {score_expr} AS score
-                FROM alphas
-                {where_sql}
-                ORDER BY score DESC NULLS LAST, ts DESC, id DESC
-                LIMIT ?
-            """
-            params.append(int(limit))
-            return con.execute(sql, params).fetchall()
-        finally:
-            con.close()
+        join, score_expr = metric_value_sql(metric)
+        tag_sql, params = tag_filter_sql(tag, any_tags)
+        clauses: list[str] = [tag_sql[len("WHERE "):]] if tag_sql else []
+
+        if min is not None:
+            clauses.append(score_expr + " >= ?")
+            params.append(float(min))
+        if max is not None:
+            clauses.append(score_expr + " <= ?")
+            params.append(float(max))
+
+        where_sql = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        sql = f"""
+            SELECT a.id, a.ts, a.config_hash, a.metrics, a.tags, {score_expr} AS score
+            FROM alphas a
+            {join}
+            {where_sql}
+            ORDER BY score DESC NULLS LAST, a.ts DESC, a.id DESC
+            LIMIT ?
+        """
+        params.append(int(limit))
+        return self._writer().execute(sql, params).fetchall()
 
 
 # --- Back-compat for older CLI/tests ---
@@ -210,15 +571,9 @@ finally:
         AlphaRegistry.ensure_schema = AlphaRegistry._ensure_schema
 
 
-# --- Back-compat: public ensure_schema() that manages its own connection
+# --- Back-compat: public ensure_schema() on the registry connection
 def _compat_ensure_schema(self):
-    import duckdb
-
-    con = duckdb.connect(str(self.db_path))
-    try:
-        self._ensure_schema(con)
-    finally:
-        con.close()
+    self._writer()
 
 
 # Expose as public method expected by older CLI/tests
@@ -1,131 +1,15 @@
 from __future__ import annotations
-import duckdb
-from alpha_factory.alpha_registry import AlphaRegistry
+from alpha_factory.alpha_registry import AlphaRegistry, metric_value_sql, tag_filter_sql
+from alpha_factory.registry_session import ensure_runs_meta, get_session
 
 
 def _ext_get_con(self):
-    con = getattr(self, "_ext_con", None)
-    if con is not None:
-        return con
-    if hasattr(self, "con") and getattr(self, "con") is not None:
-        self._ext_con = self.con
-        return self._ext_con
-    for attr in ("db_path", "path", "database"):
-        p = getattr(self, attr, None)
-        if isinstance(p, str) and p:
-            self._ext_con = duckdb.connect(p)
-            return self._ext_con
-    self._ext_con = duckdb.connect(":memory:")
-    return self._ext_con
+    # Shared per-database session: the registry's own connection when it has one
+    return get_session(self).con
 
 
 def _ensure_runs_view(self):
-    con = _ext_get_con(self)
-
-    # If a runs view exists but lacks `metrics`, drop it so we can recreate correctly.
-    try:
-        cols = [str(r[1]).lower() for r in con.execute("PRAGMA table_info(runs)").fetchall()]
-        if "metrics" not in cols:
-            con.execute("DROP VIEW IF EXISTS runs")
-        else:
-            return  # already good
-    except Exception:
-        pass  # no runs view yet
-
-    # If baseline `alphas` exists, build a compatible `runs` view from it.
-    has_alphas = False
-    try:
-        has_alphas = len(con.execute("PRAGMA table_info(alphas)").fetchall()) > 0
-    except Exception:
-        has_alphas = False
-
-    if has_alphas:
-        con.execute(
-            """
-        CREATE OR REPLACE VIEW runs AS
-        SELECT
-          CAST(config_hash AS VARCHAR) AS alpha_id,
-          CAST(id AS VARCHAR)          AS run_id,
-          COALESCE(timestamp, CURRENT_TIMESTAMP) AS timestamp,
-          tags,
-          CAST(metrics AS JSON)        AS metrics,
-          config_hash
-        FROM alphas
-        """
-        )
-        return
-
-    # Fallback: empty-compatible view
-    con.execute(
-        """
-    CREATE OR REPLACE VIEW runs AS
-    SELECT CAST(NULL AS VARCHAR) AS alpha_id,
-           CAST(NULL AS VARCHAR) AS run_id,
-           CAST(NULL AS TIMESTAMP) AS timestamp,
-           CAST(NULL AS VARCHAR) AS tags,
-           CAST(NULL AS JSON) AS metrics,
-           CAST(NULL AS VARCHAR) AS config_hash
-    WHERE 1=0
-    """
-    )
-
-    # If a runs view already exists, keep it.
-    try:
-        con.execute("SELECT 1 FROM runs LIMIT 1")
-        return
-    except Exception:
-        pass
-
-    # Prefer building from an existing baseline table.
-    has_alphas = False
-    try:
-        has_alphas = len(con.execute("PRAGMA table_info(alphas)").fetchall()) > 0
-    except Exception:
-        has_alphas = False
-
-    if has_alphas:
-        # Detect timestamp-like column in alphas
-        info = con.execute("PRAGMA table_info(alphas)").fetchall()
-        cols = {str(r[1]).lower() for r in info}
-        if "timestamp" in cols:
-            ts_expr = "timestamp"
-        elif "ts" in cols:
-            ts_expr = "ts"
-        elif "created_at" in cols:
-            ts_expr = "created_at"
-        elif "time" in cols:
-            ts_expr = "time"
-        else:
-            ts_expr = "NULL"
-
-        con.execute(
-            f"""
-        CREATE OR REPLACE VIEW runs AS
-        SELECT
-          CAST(config_hash AS VARCHAR) AS alpha_id,
-          CAST(id AS VARCHAR)          AS run_id,
-          COALESCE({ts_expr}, CURRENT_TIMESTAMP) AS timestamp,
-          tags,
-          CAST(metrics AS JSON)        AS metrics,
-          config_hash
-        FROM alphas
-        """
-        )
-        return
-
-    # Fallback: empty compatible view
-    con.execute(
-        """
-      CREATE OR REPLACE VIEW runs AS
-      SELECT CAST(NULL AS VARCHAR) AS alpha_id,
-             CAST(NULL AS VARCHAR) AS run_id,
-             CAST(NULL AS TIMESTAMP) AS timestamp,
-             CAST(NULL AS VARCHAR) AS tags,
-             CAST(NULL AS JSON) AS metrics,
-             CAST(NULL AS VARCHAR) AS config_hash
-      WHERE 1=0
-    """
-    )
+    get_session(self).ensure_runs_view()
 
 
 def _json_metric_expr(metric: str) -> str:
@@ -245,21 +129,7 @@ AlphaRegistry.get_summary = _ovr_get_summary  # --- provenance: runs_metadata +
 
 
 def _ensure_runs_meta(con):
-    con.execute(
-        """
-    CREATE TABLE IF NOT EXISTS runs_metadata (
-      run_id TEXT PRIMARY KEY,
-      alpha_id TEXT NOT NULL,
-      run_hash TEXT,
-      timestamp TIMESTAMP,
-      source_version TEXT,
-      config_hash TEXT,
-      config_diff TEXT,
-      tags TEXT,
-      notes TEXT
-    );
-    """
-    )
+    ensure_runs_meta(con)
 
 
 def _ovr_register_run(self, run_info: dict) -> str:
@@ -267,7 +137,7 @@ def _ovr_register_run(self, run_info: dict) -> str:
     import json
 
     con = _ext_get_con(self)
-    _ensure_runs_meta(con)
+    get_session(self).ensure_runs_meta()
     run_id = run_info.get("run_id") or str(uuid.uuid4())
     d = {
         "run_id": run_id,
@@ -297,7 +167,7 @@ def _ovr_register_run(self, run_info: dict) -> str:
 
 def _ovr_get_lineage(self, alpha_id: str):
     con = _ext_get_con(self)
-    _ensure_runs_meta(con)
+    get_session(self).ensure_runs_meta()
     return con.execute(
         "SELECT * FROM runs_metadata WHERE alpha_id = ? ORDER BY timestamp DESC",
         [alpha_id],
@@ -327,21 +197,37 @@ def _json_metric_expr(metric: str) -> str:
     )  # --- end patch ---
 
 
+# --- typed metrics / tag index: read from the registry's index tables, not JSON/substrings ---
+def _metric_source(self, metric: str) -> tuple[str, str]:
+    """(join_sql, value_expr) over `alphas a`; JSON fallback for registries without typed storage."""
+    if get_session(self).sync_index():
+        return metric_value_sql(metric, alias="a")
+    return "", f"TRY_CAST(json_extract(a.metrics, '$.' || '{metric}') AS DOUBLE)"
+
+
+def _tag_clause(self, tag) -> tuple[str, list]:
+    """Exact tag match (str = one tag, list = all of them) through alpha_tags when indexed."""
+    # index state comes from the _metric_source() sync made earlier in the same call
+    if get_session(self).index_ok:
+        sql, params = tag_filter_sql(tag, id_expr="TRY_CAST(run_id AS BIGINT)")
+        return sql[len("WHERE "):], params
+    tags = [tag] if isinstance(tag, str) else list(tag)
+    return " AND ".join("contains(tags, ?)" for _ in tags), tags
+
+
 # --- v0.2.7 scoped CTE patch: ensure `metrics` is in-scope before scoring ---
 
 
-def _ovr_get_summary(self, metric: str, filters: dict | None = None):
-    con = _ext_get_con(self)
-    _ensure_runs_view(self)
-    val = _json_metric_expr(metric)
+def _filter_where(self, filters: dict | None) -> tuple[list[str], list]:
     where, params = ["value IS NOT NULL"], []
     if filters:
         if filters.get("alpha_id"):
             where.append("alpha_id = ?")
             params.append(filters["alpha_id"])
         if filters.get("tag"):
-            where.append("contains(tags, ?)")
-            params.append(filters["tag"])
+            clause, tag_params = _tag_clause(self, filters["tag"])
+            where.append(clause)
+            params.extend(tag_params)
         if filters.get("since"):
             where.append("timestamp >= TIMESTAMP ?")
             params.append(filters["since"])
@@ -353,14 +239,23 @@ def _ovr_get_summary(self, metric: str, filters: dict | None = None):
             params.append(filters["config_hash"])
         if filters.get("where_sql"):
             where.append(filters["where_sql"])
-    q = f"""
-    WITH base AS (
-      SELECT alpha_id, run_id, timestamp, tags, config_hash, metrics
-      FROM runs
-    ),
-    scored AS (
-      SELECT alpha_id, run_id, timestamp, tags, config_hash, {val} AS value
-      FROM base
+    return where, params
+
+
+def _ovr_get_summary(self, metric: str, filters: dict | None = None):
+    sess = get_session(self)
+    sess.ensure_runs_view()
+    join, val = _metric_source(self, metric)
+    where, params = _filter_where(self, filters)
+    q = sess.statement(
+        ("summary", join, val, tuple(where)),
+        lambda: f"""
+    WITH scored AS (
+      SELECT r.alpha_id, r.run_id, r.timestamp, r.tags, r.config_hash, r.metrics,
+             {val} AS value
+      FROM runs r
+      LEFT JOIN alphas a ON CAST(a.id AS VARCHAR) = r.run_id
+      {join}
     )
     SELECT alpha_id,
            COUNT(*) AS n,
@@ -374,8 +269,9 @@ def _ovr_get_summary(self, metric: str, filters: dict | None = None):
     FROM scored
     WHERE {' AND '.join(where)}
     GROUP BY alpha_id
-    """
-    return con.execute(q, params).df()
+    """,
+    )
+    return sess.query_df(q, params)
 
 
 def _ovr_rank(
@@ -385,59 +281,37 @@ def _ovr_rank(
     top_n: int = 20,
     ascending: bool | None = None,
 ):
-    con = _ext_get_con(self)
-    _ensure_runs_view(self)  # ensure 'runs' exists
-    val = _json_metric_expr(metric)
-
-    where, params = ["value IS NOT NULL"], []
-    if filters:
-        if filters.get("alpha_id"):
-            where.append("alpha_id = ?")
-            params.append(filters["alpha_id"])
-        if filters.get("tag"):
-            where.append("contains(tags, ?)")
-            params.append(filters["tag"])
-        if filters.get("since"):
-            where.append("timestamp >= TIMESTAMP ?")
-            params.append(filters["since"])
-        if filters.get("until"):
-            where.append("timestamp < TIMESTAMP ?")
-            params.append(filters["until"])
-        if filters.get("config_hash"):
-            where.append("config_hash = ?")
-            params.append(filters["config_hash"])
-        if filters.get("where_sql"):
-            where.append(filters["where_sql"])
-
+    sess = get_session(self)
+    sess.ensure_runs_view()  # ensure 'runs' exists
+    join, val = _metric_source(self, metric)
+    where, params = _filter_where(self, filters)
     op = "ASC" if (ascending is True) else "DESC"
 
-    q = f"""
-    WITH base AS (
+    q = sess.statement(
+        ("rank", join, val, tuple(where), op, int(top_n)),
+        lambda: f"""
+    WITH scored AS (
       SELECT
         r.alpha_id,
         r.run_id,
         r.timestamp,
         r.tags,
         r.config_hash,
-        a.metrics AS metrics   -- <-- explicit alias from alphas
+        a.metrics AS metrics,   -- kept in scope for where_sql filters
+        {val} AS value
       FROM runs r
       LEFT JOIN alphas a
         ON CAST(a.id AS VARCHAR) = r.run_id
-    ),
-    scored AS (
-      SELECT
-        alpha_id, run_id, timestamp, tags, config_hash,
-        metrics,                       -- <-- carry metrics through
-        {val} AS value
-      FROM base
+      {join}
     )
     SELECT alpha_id, run_id, timestamp, tags, value
     FROM scored
     WHERE {' AND '.join(where)}
     ORDER BY value {op}
     LIMIT {int(top_n)}
-    """
-    return con.execute(q, params).df()
+    """,
+    )
+    return sess.query_df(q, params)
 
 
 def _ovr_compare(
@@ -452,9 +326,9 @@ def _ovr_compare(
 
     if not alpha_ids:
         return pd.DataFrame()
-    con = _ext_get_con(self)
-    _ensure_runs_view(self)
-    val = _json_metric_expr(metric)
+    sess = get_session(self)
+    sess.ensure_runs_view()
+    join, val = _metric_source(self, metric)
     ids = ",".join([f"'{x}'" for x in alpha_ids])
     where, params = [f"alpha_id IN ({ids})", "val IS NOT NULL"], []
     if since:
@@ -464,14 +338,12 @@ def _ovr_compare(
         where.append("timestamp < TIMESTAMP ?")
         params.append(until)
     q = f"""
-    WITH base AS (
-      SELECT alpha_id, run_id, timestamp, metrics
-      FROM runs
-      WHERE alpha_id IN ({ids})
-    ),
-    scored AS (
-      SELECT alpha_id, run_id, timestamp, {val} AS val
-      FROM base
+    WITH scored AS (
+      SELECT r.alpha_id, r.run_id, r.timestamp, {val} AS val
+      FROM runs r
+      LEFT JOIN alphas a ON CAST(a.id AS VARCHAR) = r.run_id
+      {join}
+      WHERE r.alpha_id IN ({ids})
     ),
     ranked AS (
       SELECT alpha_id, run_id, timestamp, val,
@@ -481,7 +353,7 @@ def _ovr_compare(
     )
     SELECT alpha_id, val FROM ranked WHERE rn=1
     """
-    df = con.execute(q, params).df()
+    df = sess.query_df(q, params)
     if df.empty:
         return pd.DataFrame()
     return df.pivot_table(index=None, columns="alpha_id", values="val", aggfunc="first")
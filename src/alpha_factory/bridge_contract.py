@@ -12,6 +12,7 @@ from alpha_factory.live_guard_config import (
     mark_breach,
     LiveConfig,
 )
+from alpha_factory.live_journal import journal_writer
 from alpha_factory.live_reconcile import build_execution_report
 
 
@@ -140,14 +141,10 @@ def tradeplan_to_contract(tp: Dict[str, Any]) -> Dict[str, Any]:
 def append_journal_line(repo_root: Path, row: Dict[str, Any]) -> None:
     """
     Append a single JSON line to artifacts/live/journal.ndjson.
+    Goes through the process-wide journal writer (open handle, group commit,
+    daily segments); returns once the line is committed.
     """
-    repo_root = Path(repo_root)
-    live_dir = repo_root / "artifacts" / "live"
-    live_dir.mkdir(parents=True, exist_ok=True)
-
-    p = _journal_path(repo_root)
-    with p.open("a", encoding="utf-8") as fh:
-        fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+    journal_writer(_journal_path(Path(repo_root))).append(row)
 
 
 def append_intent(repo_root: Path, contract: Dict[str, Any]) -> None:
@@ -244,7 +241,7 @@ def enforce_postfill_limits(repo_root: Path) -> None:
     """
     repo_root = Path(repo_root)
     cfg: LiveConfig = load_config(repo_root)
-    rep = build_execution_report(repo_root)
+    rep = build_execution_report(repo_root, stream=True)  # only new journal rows per fill
 
     # rep keys from live_reconcile.build_execution_report():
     #   "fill_ratio"
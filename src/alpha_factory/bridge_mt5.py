@@ -4,6 +4,8 @@ import json
 from datetime import datetime, timezone
 import MetaTrader5 as mt5
 
+from alpha_factory.nonce_index import NonceIndex
+
 ART_DIR = os.path.join("artifacts", "live")
 NEXT_ORDER_PATH = os.path.join(ART_DIR, "next_order.json")
 JOURNAL_PATH = os.path.join(ART_DIR, "journal.ndjson")
@@ -77,15 +79,29 @@ def _now_utc_iso():
     return datetime.now(timezone.utc).isoformat()
 
 
+_NONCE_INDEX: NonceIndex | None = None
+
+
+def _nonce_index() -> NonceIndex:
+    """
+    Process-wide FILL-nonce index for JOURNAL_PATH.
+    First use loads the snapshot and parses only the journal tail past it.
+    """
+    global _NONCE_INDEX
+    if _NONCE_INDEX is None or str(_NONCE_INDEX.journal) != JOURNAL_PATH:
+        if _NONCE_INDEX is not None:
+            _NONCE_INDEX.close()
+        _NONCE_INDEX = NonceIndex(JOURNAL_PATH)
+    return _NONCE_INDEX
+
+
 def _append_ndjson(row: dict):
     """
     Append a JSON line to journal.ndjson in artifacts/live.
-    Creates folders/files if missing.
+    Creates folders/files if missing. Written through the shared journal writer
+    (kept-open handle, daily segments); FILL nonces are indexed as part of the append.
     """
-    os.makedirs(ART_DIR, exist_ok=True)
-    with open(JOURNAL_PATH, "a", encoding="utf-8") as fh:
-        fh.write(json.dumps(row, ensure_ascii=False))
-        fh.write("\n")
+    _nonce_index().append(row)
 
 
 def _ensure_mt5():
@@ -208,26 +224,11 @@ def _nonce_already_filled(nonce: str) -> bool:
     journal.ndjson can contain:
       • valid JSON dict rows
       • operator banners, blank lines, etc.  <-- ignore
+
+    Set lookup in the nonce index; only lines appended since the last
+    check (e.g. fills recorded by the EA) are parsed.
     """
-    if not os.path.exists(JOURNAL_PATH):
-        return False
-    with open(JOURNAL_PATH, "r", encoding="utf-8") as fh:
-        for raw_line in fh:
-            raw_line = raw_line.strip()
-            if not raw_line:
-                continue
-            try:
-                row = json.loads(raw_line)
-            except Exception:
-                continue
-            if not isinstance(row, dict):
-                continue
-            if row.get("type") == "FILL":
-                fill = row.get("fill", {})
-                if isinstance(fill, dict):
-                    if fill.get("ticket_nonce") == nonce:
-                        return True
-    return False
+    return nonce in _nonce_index()
 
 # -------------------------------------------------
 # INTENT creation helper (manual stub for now)
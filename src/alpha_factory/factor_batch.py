@@ -0,0 +1,112 @@
+"""
+Batch evaluator for registry factor names with common-subexpression elimination.
+
+Names such as sma_cross_10_30, sma_slope_20_1 and rsi_thresh_14_30_70 are parsed
+into a shared DAG of primitive nodes (("sma", 20), ("rsi", 14), ("sma_diff", 20, 1)).
+Each unique node is evaluated once over the whole (time x symbol) close panel, then
+every factor's signal rule is applied to the shared arrays. Screening many variants
+costs roughly the number of unique windows, not the number of factors.
+
+    plan = FactorPlan.from_names(["sma_cross_10_30", "sma_slope_30_1", "rsi_thresh_14_30_70"])
+    signals = plan.evaluate(close_panel)   # {name: DataFrame[time x symbol]}
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .registry import _rsi, _sma, _RsiThresh, _SmaCross, _SmaSlope, make
+
+NodeKey = Tuple
+
+
+@dataclass
+class FactorPlan:
+    factors: Dict[str, object]
+    nodes: Dict[NodeKey, Tuple[NodeKey, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "FactorPlan":
+        plan = cls(factors={})
+        for name in names:
+            if name in plan.factors:
+                continue
+            f = make(name)
+            plan.factors[name] = f
+            for key in _requires(f):
+                plan._add(key)
+        return plan
+
+    def _add(self, key: NodeKey) -> None:
+        if key in self.nodes:
+            return
+        deps: Tuple[NodeKey, ...] = ()
+        if key[0] == "sma_diff":
+            deps = (("sma", key[1]),)
+        for d in deps:
+            self._add(d)
+        self.nodes[key] = deps  # insertion order is a valid topological order
+
+    def evaluate(self, panel: "pd.DataFrame | pd.Series") -> Dict[str, pd.DataFrame]:
+        """Evaluate all factors over a close panel (index=time, columns=symbols)."""
+        if isinstance(panel, pd.Series):
+            panel = panel.to_frame()
+        px = panel.apply(pd.to_numeric, errors="coerce").astype(float)
+        vals: Dict[NodeKey, pd.DataFrame] = {}
+        for key in self.nodes:
+            vals[key] = _eval_node(key, px, vals)
+        return {name: _signal(f, px, vals) for name, f in self.factors.items()}
+
+    def unique_windows(self) -> List[NodeKey]:
+        return list(self.nodes)
+
+
+def evaluate_many(names: Iterable[str], panel) -> Dict[str, pd.DataFrame]:
+    """One-shot helper: FactorPlan.from_names(names).evaluate(panel)."""
+    return FactorPlan.from_names(names).evaluate(panel)
+
+
+# ---------- internals ----------
+def _requires(f) -> List[NodeKey]:
+    if isinstance(f, _SmaCross):
+        return [("sma", f.fast), ("sma", f.slow)]
+    if isinstance(f, _SmaSlope):
+        return [("sma_diff", f.window, f.lookback)]
+    if isinstance(f, _RsiThresh):
+        return [("rsi", f.n)]
+    raise ValueError(f"batch evaluation not supported for {type(f).__name__}")
+
+
+def _eval_node(key: NodeKey, px: pd.DataFrame, vals) -> pd.DataFrame:
+    kind = key[0]
+    if kind == "sma":
+        return _sma(px, key[1])
+    if kind == "rsi":
+        return _rsi(px, key[1])
+    if kind == "sma_diff":
+        return vals[("sma", key[1])].diff(key[2])
+    raise KeyError(kind)
+
+
+def _signal(f, px: pd.DataFrame, vals) -> pd.DataFrame:
+    # Same rules (and warm-up handling) as the per-series compute() methods
+    if isinstance(f, _SmaCross):
+        fast, slow = vals[("sma", f.fast)].to_numpy(), vals[("sma", f.slow)].to_numpy()
+        sig = np.where(fast > slow, 1.0, -1.0)
+        sig[: max(f.fast, f.slow) - 1] = 0.0
+    elif isinstance(f, _SmaSlope):
+        sig = np.nan_to_num(np.sign(vals[("sma_diff", f.window, f.lookback)].to_numpy()))
+        warm = max(f.window, f.lookback + 1) - 1
+        if warm > 0:
+            sig[:warm] = 0.0
+    else:
+        r = vals[("rsi", f.n)].to_numpy()
+        sig = np.zeros(r.shape, dtype=float)
+        with np.errstate(invalid="ignore"):
+            sig[r < f.lo] = 1.0
+            sig[r > f.hi] = -1.0
+    return pd.DataFrame(sig, index=px.index, columns=px.columns)
@@ -0,0 +1,684 @@
+# src/alpha_factory/live_journal.py
+"""
+Live journal (artifacts/live/journal.ndjson): group-commit writer + segment reader.
+
+Writer
+  One JournalWriter per journal file and process keeps the file handle open.
+  append(row) returns once the row is on disk. Appends racing from several threads
+  share one write + fsync (group commit). append(row, wait=False) only queues the
+  row; a background flusher commits it within `group_delay` seconds.
+  fsync="commit" fsyncs every group, "interval" at most every `fsync_interval`
+  seconds, "off" leaves it to the OS.
+
+Segments
+  The active file is always journal.ndjson. When a row's UTC day (its ts, else the
+  writer clock) moves past the active file's day, or the file passes max_bytes, the
+  file is sealed into journal/<YYYY-MM-DD>[.N].ndjson next to it.
+  Each sealed segment gets a <name>.idx.json sidecar: [offset, min_ts, max_ts] per
+  block of rows, so readers only parse the blocks that overlap a time range.
+  A writer that still held the old handle can append a few late rows to a segment
+  right after it was sealed; incremental readers (SealedOffsets) keep re-checking a
+  segment until it has been quiet for SEGMENT_SETTLE_SEC.
+
+    w = journal_writer("artifacts/live/journal.ndjson")
+    w.append({"ts": ..., "type": "FILL", "fill": {...}})
+    rows = list(iter_rows("artifacts/live/journal.ndjson", since="2025-10-01", until="2025-11-01"))
+
+Several processes may append to the same journal (bridge_mt5, the EA fill recorder).
+Rotation takes a lock file, and the other writers reopen the new active file at
+their next commit.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+
+SEGMENT_DIR = "journal"
+BLOCK_ROWS = 256
+_HEAD_BYTES = 256
+_TS_KEYS = ("ts", "ts_utc", "as_of")
+_LOCK_STALE_SEC = 60.0
+SEGMENT_SETTLE_SEC = 60.0
+
+
+# ---------------------------------------------------------------------------------
+# timestamps / fingerprints
+# ---------------------------------------------------------------------------------
+
+
+def to_ms(ts: Any) -> Optional[int]:
+    """Epoch milliseconds for an ISO string or datetime (naive = UTC); ints pass through."""
+    if isinstance(ts, bool):
+        return None
+    if isinstance(ts, (int, float)):
+        return int(ts)
+    if isinstance(ts, str):
+        s = ts.strip()
+        if not s:
+            return None
+        if s.endswith("Z"):
+            s = s[:-1] + "+00:00"
+        try:
+            ts = datetime.fromisoformat(s)
+        except ValueError:
+            return None
+    if isinstance(ts, date) and not isinstance(ts, datetime):
+        ts = datetime(ts.year, ts.month, ts.day)
+    if not isinstance(ts, datetime):
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp() * 1000)
+
+
+def row_ms(row: Dict[str, Any]) -> Optional[int]:
+    """Row timestamp (first of ts / ts_utc / as_of that parses) in epoch ms."""
+    for k in _TS_KEYS:
+        ms = to_ms(row.get(k))
+        if ms is not None:
+            return ms
+    return None
+
+
+def _row_day(row: Dict[str, Any]) -> Optional[date]:
+    """UTC day of a row; UTC / naive ISO strings take a no-parse fast path."""
+    for k in _TS_KEYS:
+        ts = row.get(k)
+        if isinstance(ts, str) and len(ts) >= 10:
+            tail = ts[10:]
+            if ts.endswith(("+00:00", "Z")) or ("+" not in tail and "-" not in tail):
+                try:
+                    return date.fromisoformat(ts[:10])
+                except ValueError:
+                    pass
+        ms = to_ms(ts)
+        if ms is not None:
+            return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).date()
+    return None
+
+
+def head_fingerprint(path: str | Path) -> str:
+    """sha1 of the file's first line (capped): fixed once written, differs between files."""
+    with open(path, "rb") as fh:
+        head = fh.read(_HEAD_BYTES).split(b"\n", 1)[0]
+    return hashlib.sha1(head).hexdigest()
+
+
+def _parse(raw: bytes) -> Optional[Dict[str, Any]]:
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        row = json.loads(raw)
+    except Exception:
+        return None  # operator banners, torn lines
+    return row if isinstance(row, dict) else None
+
+
+def _file_day(path: Path) -> Optional[date]:
+    """UTC day of the first timestamped row in the file's head; mtime day as fallback."""
+    try:
+        with path.open("rb") as fh:
+            for _ in range(16):
+                raw = fh.readline()
+                if not raw:
+                    break
+                row = _parse(raw)
+                ms = row_ms(row) if row else None
+                if ms is not None:
+                    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc).date()
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    if st.st_size == 0:
+        return None
+    return datetime.fromtimestamp(st.st_mtime, tz=timezone.utc).date()
+
+
+# ---------------------------------------------------------------------------------
+# segments
+# ---------------------------------------------------------------------------------
+
+
+def segment_dir(journal_path: str | Path) -> Path:
+    return Path(journal_path).parent / SEGMENT_DIR
+
+
+def _seg_key(p: Path) -> Tuple[str, int]:
+    day, _, n = p.name[: -len(".ndjson")].partition(".")
+    return day, int(n) if n.isdigit() else 0
+
+
+def sealed_segments(journal_path: str | Path) -> List[Path]:
+    """Sealed segments of a journal, oldest first."""
+    d = segment_dir(journal_path)
+    if not d.is_dir():
+        return []
+    return sorted(d.glob("*.ndjson"), key=_seg_key)
+
+
+class SealedOffsets:
+    """
+    Read position per sealed segment for incremental readers. A segment stays open
+    (its size re-checked by grown()) until it was read to the end and has not been
+    modified for settle_sec; then its offset becomes None (final). `offsets` is plain
+    JSON, so readers can persist it with their own state.
+    """
+
+    def __init__(
+        self,
+        journal_path: str | Path,
+        offsets: Optional[Dict[str, Optional[int]]] = None,
+        settle_sec: float = SEGMENT_SETTLE_SEC,
+    ):
+        self.journal = Path(journal_path)
+        self.offsets: Dict[str, Optional[int]] = dict(offsets or {})
+        self.settle_sec = float(settle_sec)
+
+    def discover(self, head: str = "", offset: int = 0) -> Tuple[List[Tuple[Path, int]], bool]:
+        """
+        (segment, start) for every sealed segment not seen before, oldest first, and
+        whether one of them is the file read up to `offset` whose first line hashes to
+        `head` (it is resumed at `offset`; all others start at 0).
+        """
+        out: List[Tuple[Path, int]] = []
+        found = False
+        for seg in sealed_segments(self.journal):
+            if seg.name in self.offsets:
+                continue
+            start = 0
+            if head and not found and head_fingerprint(seg) == head:
+                start, found = offset, True
+            self.offsets[seg.name] = start
+            out.append((seg, start))
+        return out, found
+
+    def grown(self) -> List[Tuple[Path, int]]:
+        """(segment, start) for open segments with unread bytes; settled ones become final."""
+        out: List[Tuple[Path, int]] = []
+        d = segment_dir(self.journal)
+        now = time.time()
+        for name, off in list(self.offsets.items()):
+            if off is None:
+                continue
+            seg = d / name
+            try:
+                st = seg.stat()
+            except FileNotFoundError:
+                self.offsets[name] = None  # pruned by an operator
+                continue
+            if st.st_size > off:
+                out.append((seg, off))
+            if now - st.st_mtime >= self.settle_sec:
+                self.offsets[name] = None  # returned above one last time if it grew
+        return out
+
+    def advance(self, seg: Path, offset: int) -> None:
+        """Record how far `seg` was read (no-op once the segment is final)."""
+        if self.offsets.get(seg.name, 0) is not None:
+            self.offsets[seg.name] = offset
+
+
+def _index_path(seg: Path) -> Path:
+    return seg.with_name(seg.name[: -len(".ndjson")] + ".idx.json")
+
+
+def build_segment_index(seg: Path, block_rows: int = BLOCK_ROWS) -> Dict[str, Any]:
+    """Scan a sealed segment once: per block of rows its byte offset and ts range."""
+    blocks: List[List[Any]] = []
+    n = off = 0
+    with seg.open("rb") as fh:
+        for raw in fh:
+            if not raw.endswith(b"\n"):
+                break  # torn tail: readers always read past idx["bytes"]
+            if n % block_rows == 0:
+                blocks.append([off, None, None])
+            row = _parse(raw)
+            ms = row_ms(row) if row else None
+            if ms is not None:
+                b = blocks[-1]
+                b[1] = ms if b[1] is None else min(b[1], ms)
+                b[2] = ms if b[2] is None else max(b[2], ms)
+            off += len(raw)
+            n += 1
+    lo = [b[1] for b in blocks if b[1] is not None]
+    hi = [b[2] for b in blocks if b[2] is not None]
+    return {
+        "bytes": off,
+        "rows": n,
+        "head": head_fingerprint(seg) if off else "",
+        "min_ts": min(lo) if lo else None,
+        "max_ts": max(hi) if hi else None,
+        "blocks": blocks,
+    }
+
+
+def segment_index(seg: Path) -> Dict[str, Any]:
+    """Sidecar index of a sealed segment, (re)built when missing or unreadable."""
+    p = _index_path(seg)
+    try:
+        with p.open("r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        idx = build_segment_index(seg)
+        _atomic_json(p, idx)
+        return idx
+
+
+def _atomic_json(dst: Path, payload: Any) -> None:
+    tmp = dst.with_name(dst.name + ".tmp." + os.urandom(4).hex())
+    try:
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump(payload, fh, separators=(",", ":"))
+        os.replace(tmp, dst)
+    except Exception:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+
+
+# ---------------------------------------------------------------------------------
+# reading
+# ---------------------------------------------------------------------------------
+
+
+def _read_span(
+    path: Path, start: int, end: Optional[int], lo: Optional[int], hi: Optional[int]
+) -> Iterator[Dict[str, Any]]:
+    ranged = lo is not None or hi is not None
+    try:
+        fh = path.open("rb")
+    except FileNotFoundError:
+        return
+    with fh:
+        fh.seek(start)
+        pos = start
+        for raw in fh:
+            if end is not None and pos >= end:
+                break
+            pos += len(raw)
+            row = _parse(raw)
+            if row is None:
+                continue
+            if ranged:
+                ms = row_ms(row)
+                if ms is None or (lo is not None and ms < lo) or (hi is not None and ms >= hi):
+                    continue
+            yield row
+
+
+def _spans(idx: Dict[str, Any], lo: Optional[int], hi: Optional[int]) -> List[Tuple[int, int]]:
+    """Byte spans of the blocks whose ts range overlaps [lo, hi), adjacent ones merged."""
+    blocks = idx["blocks"]
+    out: List[Tuple[int, int]] = []
+    for i, (off, b_lo, b_hi) in enumerate(blocks):
+        if b_lo is None:
+            continue  # no timestamped rows in the block
+        if (lo is not None and b_hi < lo) or (hi is not None and b_lo >= hi):
+            continue
+        end = blocks[i + 1][0] if i + 1 < len(blocks) else idx["bytes"]
+        if out and out[-1][1] == off:
+            out[-1] = (out[-1][0], end)
+        else:
+            out.append((off, end))
+    return out
+
+
+def iter_rows(
+    journal_path: str | Path, since: Any = None, until: Any = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Journal rows (dicts; malformed lines skipped) across sealed segments and the
+    active file, oldest segment first. With since/until only rows whose timestamp is
+    in [since, until) are returned, and sealed segments are read through their index.
+    """
+    path = Path(journal_path)
+    lo, hi = to_ms(since), to_ms(until)
+    ranged = lo is not None or hi is not None
+    for seg in sealed_segments(path):
+        if not ranged:
+            yield from _read_span(seg, 0, None, None, None)
+            continue
+        idx = segment_index(seg)
+        for start, end in _spans(idx, lo, hi):
+            yield from _read_span(seg, start, end, lo, hi)
+        # rows a late writer appended after the index was built
+        yield from _read_span(seg, int(idx["bytes"]), None, lo, hi)
+    yield from _read_span(path, 0, None, lo, hi)
+
+
+def _read_complete(path: Path, start: int) -> Tuple[List[Dict[str, Any]], int]:
+    """Rows of the complete lines from `start`; returns (rows, offset after the last one)."""
+    try:
+        with path.open("rb") as fh:
+            fh.seek(start)
+            data = fh.read()
+    except FileNotFoundError:
+        return [], start
+    stop = data.rfind(b"\n") + 1  # a half-written last line waits for the next read
+    rows = [r for r in map(_parse, data[:stop].splitlines()) if r is not None]
+    return rows, start + stop
+
+
+class JournalCursor:
+    """
+    Incremental reader: each read_new() returns only rows appended since the last
+    call, following the active file into its sealed segment when it is rotated and
+    picking up late rows appended to recently sealed segments (SealedOffsets).
+    """
+
+    def __init__(self, journal_path: str | Path):
+        self.journal = Path(journal_path)
+        self.sealed = SealedOffsets(self.journal)
+        self.offset = 0
+        self._head = ""
+        self._ino: Optional[int] = None
+
+    def _read_sealed(self, segs: List[Tuple[Path, int]], rows: List[Dict[str, Any]]) -> None:
+        for seg, start in segs:
+            new, end = _read_complete(seg, start)
+            rows.extend(new)
+            self.sealed.advance(seg, end)
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        self._read_sealed(self.sealed.grown(), rows)
+        try:
+            st = self.journal.stat()
+            size, ino = st.st_size, st.st_ino
+        except FileNotFoundError:
+            size, ino = 0, None
+        rotated = bool(self.offset) and (
+            size < self.offset
+            or (ino != self._ino and head_fingerprint(self.journal) != self._head)
+        )
+        if rotated:
+            # the file we were reading resumes at our offset inside its segment
+            self._read_sealed(self.sealed.discover(self._head, self.offset)[0], rows)
+            self.offset, self._head = 0, ""
+        elif not self.offset:
+            self._read_sealed(self.sealed.discover()[0], rows)
+        if size > self.offset:
+            new, self.offset = _read_complete(self.journal, self.offset)
+            rows.extend(new)
+            if self.offset and not self._head:
+                self._head = head_fingerprint(self.journal)
+        self._ino = ino if self.offset else None
+        return rows
+
+
+# ---------------------------------------------------------------------------------
+# writing
+# ---------------------------------------------------------------------------------
+
+
+class JournalWriter:
+    def __init__(
+        self,
+        path: str | Path,
+        fsync: str = "commit",
+        fsync_interval: float = 1.0,
+        group_delay: float = 0.02,
+        rotate: str | None = "daily",
+        max_bytes: int | None = None,
+        block_rows: int = BLOCK_ROWS,
+        clock: Callable[[], datetime] | None = None,
+    ):
+        if fsync not in ("commit", "interval", "off"):
+            raise ValueError("fsync must be 'commit', 'interval' or 'off'")
+        if rotate not in ("daily", None):
+            raise ValueError("rotate must be 'daily' or None")
+        self.path = Path(path)
+        self.fsync = fsync
+        self.fsync_interval = float(fsync_interval)
+        self.group_delay = float(group_delay)
+        self.rotate = rotate
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.block_rows = int(block_rows)
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._cond = threading.Condition(threading.Lock())
+        self._buf: List[Tuple[date, bytes]] = []
+        self._seq = 0
+        self._committed = 0
+        self._flushing = False
+        self._closed = False
+        self._flusher: threading.Thread | None = None
+        self._fh = None
+        self._ino = None
+        self._day: date | None = None
+        self._last_fsync = 0.0
+        self.stats = {"rows": 0, "commits": 0, "fsyncs": 0, "rotations": 0}
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    # ---------- public ----------
+    def append(self, row: Dict[str, Any], wait: bool = True) -> int:
+        """Queue one row; with wait=True return once it is committed. Returns its sequence no."""
+        line = (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+        day = _row_day(row) or self._clock().date()
+        with self._cond:
+            if self._closed:
+                raise ValueError(f"journal writer for {self.path} is closed")
+            self._buf.append((day, line))
+            self._seq += 1
+            seq = self._seq
+            if not wait:
+                self._start_flusher()
+                if len(self._buf) == 1:
+                    self._cond.notify_all()  # wake the flusher; it then waits group_delay
+                return seq
+        self._commit_upto(seq)
+        return seq
+
+    def flush(self) -> None:
+        """Commit everything queued so far."""
+        with self._cond:
+            seq = self._seq
+        self._commit_upto(seq)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def __enter__(self) -> "JournalWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- group commit ----------
+    def _commit_upto(self, seq: int) -> None:
+        # leader/follower: the first waiter writes every queued row, later ones wait for it
+        self._cond.acquire()
+        try:
+            while self._committed < seq:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                batch, upto = self._buf, self._seq
+                self._buf, self._flushing = [], True
+                self._cond.release()
+                try:
+                    self._write(batch)
+                except BaseException:
+                    self._cond.acquire()
+                    self._buf[:0] = batch  # requeue; the next leader retries
+                    self._flushing = False
+                    self._cond.notify_all()
+                    raise
+                self._cond.acquire()
+                self._flushing = False
+                self._committed = upto
+                self._cond.notify_all()
+        finally:
+            self._cond.release()
+
+    def _start_flusher(self) -> None:
+        if self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="journal-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._buf and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._buf:
+                    return
+            time.sleep(self.group_delay)  # let the group fill up
+            try:
+                self.flush()
+            except Exception:
+                time.sleep(self.group_delay)  # rows stay queued; append/flush surface the error
+
+    # ---------- file handling (leader only) ----------
+    def _open(self):
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "ab")
+            st = os.fstat(self._fh.fileno())
+            self._ino = st.st_ino
+            self._day = _file_day(self.path) if st.st_size else None
+        return self._fh
+
+    def _close_fh(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def _check_rotated(self) -> None:
+        # another process sealed the file we hold: switch to the new active file
+        if self._fh is None:
+            return
+        try:
+            ino = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            ino = None
+        if ino != self._ino:
+            self._close_fh()
+
+    def _due(self, day: date) -> bool:
+        if self.rotate == "daily" and self._day is not None and day > self._day:
+            return True
+        if self.max_bytes and self._fh is not None:
+            return os.fstat(self._fh.fileno()).st_size >= self.max_bytes
+        return False
+
+    def _write(self, batch: List[Tuple[date, bytes]]) -> None:
+        if not batch:
+            return
+        self._check_rotated()
+        i = 0
+        while i < len(batch):
+            # run of rows for one day; a day change seals the active file first
+            day, j = batch[i][0], i + 1
+            while j < len(batch) and batch[j][0] == day:
+                j += 1
+            self._open()
+            if self._due(day):
+                self._seal()
+            fh = self._open()
+            fh.write(b"".join(line for _, line in batch[i:j]))
+            fh.flush()
+            if self._day is None:
+                self._day = day
+            i = j
+        now = time.monotonic()
+        if self.fsync == "commit" or (
+            self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval
+        ):
+            os.fsync(fh.fileno())
+            self._last_fsync = now
+            self.stats["fsyncs"] += 1
+        self.stats["commits"] += 1
+        self.stats["rows"] += len(batch)
+
+    def _seal(self) -> None:
+        """Move the active file into the segment directory and index it."""
+        lock = self.path.with_name(self.path.name + ".rotate.lock")
+        if not _try_lock(lock):
+            return  # another writer is sealing; _check_rotated() picks up the new file
+        try:
+            day = self._day
+            if self._fh is not None and self.fsync != "off":
+                os.fsync(self._fh.fileno())  # rows of the closing day are durable before sealing
+            self._close_fh()
+            st = os.stat(self.path) if self.path.exists() else None
+            if st is None or st.st_ino != self._ino or st.st_size == 0:
+                return  # already sealed by someone else
+            d = segment_dir(self.path)
+            d.mkdir(parents=True, exist_ok=True)
+            stem = (day or datetime.fromtimestamp(st.st_mtime, tz=timezone.utc).date()).isoformat()
+            dst, n = d / f"{stem}.ndjson", 0
+            while dst.exists():
+                n += 1
+                dst = d / f"{stem}.{n}.ndjson"
+            try:
+                os.rename(self.path, dst)
+            except OSError:
+                return  # still open elsewhere (Windows): retry at the next commit
+            _atomic_json(_index_path(dst), build_segment_index(dst, self.block_rows))
+            self.stats["rotations"] += 1
+        finally:
+            try:
+                os.unlink(lock)
+            except OSError:
+                pass
+
+
+def _try_lock(lock: Path) -> bool:
+    for _ in range(2):
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime > _LOCK_STALE_SEC:
+                    os.unlink(lock)  # left behind by a crashed writer
+                    continue
+            except OSError:
+                continue
+            return False
+    return False
+
+
+_WRITERS: Dict[str, JournalWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def journal_writer(path: str | Path, **kw) -> JournalWriter:
+    """Process-wide writer for a journal file (created with **kw on first use)."""
+    key = str(Path(path).absolute())
+    with _WRITERS_LOCK:
+        w = _WRITERS.get(key)
+        if w is None or w.closed:
+            w = _WRITERS[key] = JournalWriter(path, **kw)
+        return w
+
+
+@atexit.register
+def _close_writers() -> None:
+    for w in list(_WRITERS.values()):
+        try:
+            w.close()
+        except Exception:
+            pass
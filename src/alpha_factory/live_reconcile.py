@@ -1,78 +1,159 @@
 from __future__ import annotations
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any
-import json
-from datetime import datetime
-
-
-def _read_journal(journal_path: Path) -> List[Dict[str, Any]]:
-    if not journal_path.exists():
-        return []
-    lines = journal_path.read_text(encoding="utf-8").splitlines()
-    out: List[Dict[str, Any]] = []
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            out.append(json.loads(line))
-        except Exception:
-            # ignore malformed
-            continue
-    return out
+from typing import List, Dict, Any, Optional, Tuple
+import threading
+
+import numpy as np
+import pandas as pd
+
+from alpha_factory.live_journal import JournalCursor, iter_rows
+
+_NAT = np.iinfo(np.int64).min  # missing / unparseable timestamp
+_PIP = 0.0001  # extremely naive pips math, assume 1 pip = 0.0001
+_RETAIN_SEC = 24 * 3600.0  # streaming: intents older than this (vs. the newest row) settle
+_MAX_RECONCILERS = 8
+
+
+def _read_journal(journal_path: Path, since=None, until=None) -> List[Dict[str, Any]]:
+    # sealed daily segments + the active file; with since/until only the
+    # segment blocks overlapping the range are parsed (see live_journal)
+    return list(iter_rows(journal_path, since=since, until=until))
+
+
+def _parse_ns(values: List[Any]) -> np.ndarray:
+    # journal timestamps are iso-ish UTC like "2025-10-31T10:22:55Z"; parsed once per
+    # batch into int64 ns, _NAT where missing or unparseable
+    if not values:
+        return np.empty(0, dtype=np.int64)
+    ts = pd.to_datetime(
+        pd.Series(values, dtype=object), utc=True, errors="coerce", format="ISO8601"
+    )
+    return ts.dt.tz_convert(None).to_numpy().astype(np.int64)
+
+
+def _num(x: Any) -> float:
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+_SYMBOL, _SIDE, _TS = ("symbol",), ("side",), ("ts_utc", "ts", "as_of")
+
+
+def _pick(srcs: Tuple[Dict[str, Any], ...], keys: Tuple[str, ...]) -> Any:
+    for src in srcs:
+        for k in keys:
+            v = src.get(k)
+            if v is not None:
+                return v
+    return None
+
+
+class _Legs:
+    """Columnar INTENT or FILL rows. Flat rows win; journal rows nest under contract / fill."""
+
+    def __init__(self, nested: str, size_keys: Tuple[str, ...], price_keys: Tuple[str, ...]):
+        self.nested = nested
+        self.size_keys = size_keys
+        self.price_keys = price_keys
+        self.symbol: List[Any] = []
+        self.side: List[Any] = []
+        self.ts: List[Any] = []
+        self.size: List[float] = []
+        self.price: List[float] = []
+        self.t_ns = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def extend(self, rows: List[Dict[str, Any]]) -> None:
+        new_ts = []
+        for row in rows:
+            inner = row.get(self.nested)
+            srcs = (row, inner) if isinstance(inner, dict) else (row,)
+            self.symbol.append(_pick(srcs, _SYMBOL))
+            self.side.append(_pick(srcs, _SIDE))
+            new_ts.append(_pick(srcs, _TS))
+            self.size.append(_num(_pick(srcs, self.size_keys)))
+            self.price.append(_num(_pick(srcs, self.price_keys)))
+        self.ts.extend(new_ts)
+        self.t_ns = np.concatenate([self.t_ns, _parse_ns(new_ts)])
 
+    def keep(self, mask: np.ndarray) -> None:
+        """Drop the rows where mask is False."""
+        idx = np.flatnonzero(mask).tolist()
+        for name in ("symbol", "side", "ts", "size", "price"):
+            col = getattr(self, name)
+            setattr(self, name, [col[i] for i in idx])
+        self.t_ns = self.t_ns[mask]
 
-def _parse_iso(ts: str) -> datetime:
-    # journal timestamps are iso-ish UTC like "2025-10-31T10:22:55Z"
-    if ts.endswith("Z"):
-        ts = ts[:-1] + "+00:00"
-    return datetime.fromisoformat(ts)
 
+def _intent_legs() -> _Legs:
+    return _Legs("contract", ("size",), ("price_request", "price"))
 
-def pair_intents_and_fills(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+
+def _fill_legs() -> _Legs:
+    return _Legs("fill", ("size", "size_exec"), ("price_exec", "price"))
+
+
+def _split(rows: List[Dict[str, Any]], intents: _Legs, fills: _Legs) -> None:
+    intents.extend([r for r in rows if r.get("type") == "INTENT"])
+    fills.extend([r for r in rows if r.get("type") == "FILL"])
+
+
+def _match(
+    intents: _Legs, fills: _Legs, tolerance_sec: float, max_wait_sec: Optional[float]
+) -> np.ndarray:
     """
-    Returns list of dicts like:
-    {
-      "symbol": "EURUSD",
-      "intent_time": "...",
-      "fill_time": "... or None",
-      "intent_size": 0.35,
-      "fill_size": 0.32,
-      "latency_sec": 1.8,
-      "slippage_pips": 0.7,
-      "status": "FILLED" / "NOFILL" / "PARTIAL"
-    }
-    Matching rule (simple for now):
-    - For each INTENT, take the first FILL with same symbol and side
-      that occurs after it.
+    Fill index per intent (-1 = none). Sort-merge inside each (symbol, side)
+    partition: intents in time order take the earliest unused fill with
+    t_intent - tolerance <= t_fill <= t_intent + max_wait. Rows without a
+    timestamp sort first and match without a time check.
     """
-    intents = [r for r in rows if r.get("type") == "INTENT"]
-    fills = [r for r in rows if r.get("type") == "FILL"]
+    n_i, n_f = len(intents), len(fills)
+    match = np.full(n_i, -1, dtype=np.int64)
+    if not n_i or not n_f:
+        return match
+    keys = [f"{a}\x1f{b}" for a, b in zip(intents.symbol + fills.symbol, intents.side + fills.side)]
+    codes, _ = pd.factorize(pd.Series(keys, dtype=object))
+    ik, fk = codes[:n_i], codes[n_i:]
+    it, ft = intents.t_ns, fills.t_ns
+    io = np.lexsort((np.arange(n_i), it, ik))
+    fo = np.lexsort((np.arange(n_f), ft, fk))
 
-    results: List[Dict[str, Any]] = []
+    tol = int(tolerance_sec * 1e9)
+    wait = None if max_wait_sec is None else int(max_wait_sec * 1e9)
+    fk_s, ft_s, fo_l = fk[fo].tolist(), ft[fo].tolist(), fo.tolist()
+    j = 0
+    for i, k, t in zip(io.tolist(), ik[io].tolist(), it[io].tolist()):
+        while j < n_f and fk_s[j] < k:
+            j += 1  # fills of partitions without (remaining) intents
+        if t != _NAT:
+            while j < n_f and fk_s[j] == k and ft_s[j] != _NAT and ft_s[j] < t - tol:
+                j += 1  # before this intent's window, so before every later one's too
+        if j >= n_f or fk_s[j] != k:
+            continue
+        if t != _NAT and wait is not None and ft_s[j] != _NAT and ft_s[j] > t + wait:
+            continue  # next fill is too late for this intent; later intents may take it
+        match[i] = fo_l[j]
+        j += 1
+    return match
+
+
+def _pairs(
+    intents: _Legs, fills: _Legs, tolerance_sec: float = 0.0, max_wait_sec: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    return _pair_rows(intents, fills, _match(intents, fills, tolerance_sec, max_wait_sec))
 
-    for intent in intents:
-        sym = intent.get("symbol")
-        side = intent.get("side")
-        intent_ts = intent.get("ts_utc")
-        intent_size = float(intent.get("size", 0.0))
-        intent_price = float(intent.get("price_request", 0.0))
-
-        # find first compatible fill after intent time
-        t_intent = _parse_iso(intent_ts) if intent_ts else None
-        chosen = None
-        for f in fills:
-            if f.get("symbol") != sym:
-                continue
-            if f.get("side") != side:
-                continue
-            f_ts = f.get("ts_utc")
-            if f_ts and t_intent and _parse_iso(f_ts) < t_intent:
-                continue  # fill before intent? skip
-            chosen = f
-            break
-
-        if chosen is None:
+
+def _pair_rows(intents: _Legs, fills: _Legs, match: np.ndarray) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for i, m in enumerate(match.tolist()):
+        sym, side = intents.symbol[i], intents.side[i]
+        intent_ts, intent_size = intents.ts[i], intents.size[i]
+        if m < 0:
             results.append(
                 {
                     "symbol": sym,
@@ -87,20 +168,14 @@ def pair_intents_and_fills(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             )
             continue
 
-        fill_ts = chosen.get("ts_utc")
-        fill_size = float(chosen.get("size", 0.0))
-        fill_price = float(chosen.get("price_exec", 0.0))
-
-        latency_sec = None
-        if intent_ts and fill_ts:
-            latency_sec = (_parse_iso(fill_ts) - _parse_iso(intent_ts)).total_seconds()
+        fill_ts, fill_size = fills.ts[m], fills.size[m]
+        t_i, t_f = int(intents.t_ns[i]), int(fills.t_ns[m])
+        latency_sec = (t_f - t_i) / 1e9 if (t_i != _NAT and t_f != _NAT) else None
 
-        # extremely naive pips math, assume 1 pip = 0.0001
-        pip = 0.0001
         if side == "BUY":
-            slippage_pips = (fill_price - intent_price) / pip
+            slippage_pips = (fills.price[m] - intents.price[i]) / _PIP
         else:
-            slippage_pips = (intent_price - fill_price) / pip
+            slippage_pips = (intents.price[i] - fills.price[m]) / _PIP
 
         status = "FILLED"
         if 0.0 < fill_size < intent_size:
@@ -120,56 +195,175 @@ def pair_intents_and_fills(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
                 "status": status,
             }
         )
-
     return results
 
 
-def summarize_execution_quality(pairs: List[Dict[str, Any]]) -> Dict[str, Any]:
+def pair_intents_and_fills(
+    rows: List[Dict[str, Any]],
+    tolerance_sec: float = 0.0,
+    max_wait_sec: Optional[float] = None,
+) -> List[Dict[str, Any]]:
     """
-    Produce rollup stats for dashboard / risk:
-    - avg latency
-    - avg slippage
-    - fill ratio (fills / intents)
+    Returns list of dicts like:
+    {
+      "symbol": "EURUSD",
+      "intent_time": "...",
+      "fill_time": "... or None",
+      "intent_size": 0.35,
+      "fill_size": 0.32,
+      "latency_sec": 1.8,
+      "slippage_pips": 0.7,
+      "status": "FILLED" / "NOFILL" / "PARTIAL"
+    }
+    one per INTENT, in journal order.
+    Matching rule:
+    - Within each (symbol, side), intents in time order take the first unused
+      FILL no earlier than intent time - tolerance_sec (and, when max_wait_sec
+      is set, no later than intent time + max_wait_sec). Each fill pairs once.
     """
-    if not pairs:
+    intents, fills = _intent_legs(), _fill_legs()
+    _split(rows, intents, fills)
+    return _pairs(intents, fills, tolerance_sec, max_wait_sec)
+
+
+class ExecutionReconciler:
+    """
+    Streaming reconcile: update() parses only journal rows appended since the last
+    call (across segment rotation) and pairs the rows still in its window.
+
+    Intents more than retain_sec older than the newest journal row are settled: their
+    pair is folded into running totals and dropped together with the fill it took;
+    unused fills too old for any later intent are dropped as well. For journals
+    written in time order this gives the same summary as pairing the whole history,
+    except that a fill arriving more than retain_sec after its intent no longer pairs.
+    update()["pairs"] lists only the intents still in the window.
+    """
+
+    def __init__(
+        self,
+        journal_path: str | Path,
+        tolerance_sec: float = 0.0,
+        max_wait_sec: Optional[float] = None,
+        retain_sec: float = _RETAIN_SEC,
+    ):
+        self.cursor = JournalCursor(journal_path)
+        self.tolerance_sec = float(tolerance_sec)
+        self.max_wait_sec = max_wait_sec
+        self.retain_sec = max(float(retain_sec), float(max_wait_sec or 0.0) + self.tolerance_sec)
+        self.intents, self.fills = _intent_legs(), _fill_legs()
+        self.settled = _tally([])
+        self._lock = threading.Lock()
+
+    def update(self) -> Dict[str, Any]:
+        with self._lock:
+            _split(self.cursor.read_new(), self.intents, self.fills)
+            match = _match(self.intents, self.fills, self.tolerance_sec, self.max_wait_sec)
+            pairs = _pair_rows(self.intents, self.fills, match)
+            pairs = self._settle(match, pairs)
+            summary = _summary(_tally(pairs, self.settled))
         return {
-            "n_intents": 0,
-            "n_fills": 0,
-            "fill_ratio": 0.0,
-            "avg_latency_sec": None,
-            "avg_slippage_pips": None,
+            "summary": summary,
+            "pairs": pairs,
         }
 
-    latencies = [p["latency_sec"] for p in pairs if p["latency_sec"] is not None]
-    slippages = [p["slippage_pips"] for p in pairs if p["slippage_pips"] is not None]
+    def _settle(self, match: np.ndarray, pairs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        it, ft = self.intents.t_ns, self.fills.t_ns
+        if not len(it) and not len(ft):
+            return pairs
+        newest = max(it.max(initial=_NAT), ft.max(initial=_NAT))
+        if newest == _NAT:
+            return pairs
+        horizon = newest - int(self.retain_sec * 1e9)
+        done = it < horizon  # rows without a timestamp (_NAT) settle right away
+        if not done.any():
+            return pairs
+        self.settled = _tally([p for p, d in zip(pairs, done.tolist()) if d], self.settled)
+        used = np.zeros(len(ft), dtype=bool)
+        used[match[match >= 0]] = True
+        taken = np.zeros(len(ft), dtype=bool)
+        taken[match[done & (match >= 0)]] = True
+        # unused fills before every remaining intent's window can never pair again
+        dead = ~used & (ft < horizon - int(self.tolerance_sec * 1e9))
+        self.intents.keep(~done)
+        self.fills.keep(~(taken | dead))
+        return [p for p, d in zip(pairs, done.tolist()) if not d]
+
+
+_RECONCILERS: "OrderedDict[Tuple[str, float, Optional[float]], ExecutionReconciler]" = OrderedDict()
+_RECONCILERS_LOCK = threading.Lock()
+
 
-    n_intents = len(pairs)
-    n_fills = sum(1 for p in pairs if p["status"] in ("FILLED", "PARTIAL"))
-    fill_ratio = n_fills / n_intents if n_intents else 0.0
+def _tally(pairs: List[Dict[str, Any]], into: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Running counts / sums behind summarize_execution_quality()."""
+    t = dict(into) if into else {"n": 0, "fills": 0, "lat": [0.0, 0], "slip": [0.0, 0]}
+    lat, slip = list(t["lat"]), list(t["slip"])
+    for p in pairs:
+        t["n"] += 1
+        t["fills"] += p["status"] in ("FILLED", "PARTIAL")
+        if p["latency_sec"] is not None:
+            lat[0] += p["latency_sec"]
+            lat[1] += 1
+        if p["slippage_pips"] is not None:
+            slip[0] += p["slippage_pips"]
+            slip[1] += 1
+    t["lat"], t["slip"] = lat, slip
+    return t
 
-    avg_latency = sum(latencies) / len(latencies) if latencies else None
-    avg_slip = sum(slippages) / len(slippages) if slippages else None
 
+def _summary(t: Dict[str, Any]) -> Dict[str, Any]:
+    n_intents, n_fills = t["n"], t["fills"]
     return {
         "n_intents": n_intents,
         "n_fills": n_fills,
-        "fill_ratio": fill_ratio,
-        "avg_latency_sec": avg_latency,
-        "avg_slippage_pips": avg_slip,
+        "fill_ratio": n_fills / n_intents if n_intents else 0.0,
+        "avg_latency_sec": t["lat"][0] / t["lat"][1] if t["lat"][1] else None,
+        "avg_slippage_pips": t["slip"][0] / t["slip"][1] if t["slip"][1] else None,
     }
 
 
-def build_execution_report(repo_root: str | Path) -> Dict[str, Any]:
+def summarize_execution_quality(pairs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Produce rollup stats for dashboard / risk:
+    - avg latency
+    - avg slippage
+    - fill ratio (fills / intents)
+    """
+    return _summary(_tally(pairs))
+
+
+def build_execution_report(
+    repo_root: str | Path,
+    since=None,
+    until=None,
+    stream: bool = False,
+    tolerance_sec: float = 0.0,
+    max_wait_sec: Optional[float] = None,
+) -> Dict[str, Any]:
     """
     High-level helper:
-    - read journal
+    - read journal (optionally only rows with since <= ts < until)
     - pair INTENT/FILL
     - summarize
+    stream=True keeps one ExecutionReconciler per journal in the process (the
+    _MAX_RECONCILERS most recently used), so repeated reports only parse new entries
+    (since/until do not apply; pairs covers the reconciler's window, see there).
     """
     root = Path(repo_root)
     journal_path = root / "artifacts" / "live" / "journal.ndjson"
-    rows = _read_journal(journal_path)
-    pairs = pair_intents_and_fills(rows)
+    if stream:
+        key = (str(journal_path.absolute()), float(tolerance_sec), max_wait_sec)
+        with _RECONCILERS_LOCK:
+            rec = _RECONCILERS.get(key)
+            if rec is None:
+                rec = _RECONCILERS[key] = ExecutionReconciler(
+                    journal_path, tolerance_sec, max_wait_sec
+                )
+            _RECONCILERS.move_to_end(key)
+            while len(_RECONCILERS) > _MAX_RECONCILERS:
+                _RECONCILERS.popitem(last=False)
+        return rec.update()
+    rows = _read_journal(journal_path, since=since, until=until)
+    pairs = pair_intents_and_fills(rows, tolerance_sec, max_wait_sec)
     summary = summarize_execution_quality(pairs)
     return {
         "summary": summary,
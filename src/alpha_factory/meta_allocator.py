@@ -1,8 +1,13 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Mapping
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
 
 Metrics = Mapping[str, Mapping[str, float]]
+# {(a, b): rho}, an N x N matrix/DataFrame over the sleeves, or (allocate_many) D x N x N
+Corr = Any
 
 
 @dataclass
@@ -19,46 +24,6 @@ class MetaAllocator:
     def __init__(self, cfg: AllocatorConfig | None = None):
         self.cfg = cfg or AllocatorConfig()
 
-    def _score(self, m: Mapping[str, float]) -> float:
-        # Higher Sharpe, lower DD -> higher score
-        s = float(m.get("sharpe", 0.0))
-        dd = float(m.get("dd", 0.0))
-        inv_dd = 1.0 / (dd + self.cfg.eps)
-        return self.cfg.sharpe_weight * s + self.cfg.dd_weight * inv_dd
-
-    def _normalize(self, raw: Dict[str, float]) -> Dict[str, float]:
-        # clip + renormalize
-        clipped = {k: min(max(v, self.cfg.min_weight), self.cfg.max_weight) for k, v in raw.items()}
-        tot = sum(max(v, 0.0) for v in clipped.values())
-        if tot <= self.cfg.eps:
-            n = len(clipped) or 1
-            return {k: 1.0 / n for k in clipped}
-        return {k: v / tot for k, v in clipped.items()}
-
-    def _equal(self, metrics: Metrics) -> Dict[str, float]:
-        keys = list(metrics.keys())
-        if not keys:
-            return {}
-        w = 1.0 / len(keys)
-        return {k: w for k in keys}
-
-    def _ewma(self, metrics: Metrics) -> Dict[str, float]:
-        # Single-shot scoring; “ewma” name reserved for later time decay extension
-        raw = {k: max(self._score(v), 0.0) for k, v in metrics.items()}
-        return self._normalize(raw)
-
-    def _bayes(self, metrics: Metrics) -> Dict[str, float]:
-        # Bayes-lite: positive evidence ~ Sharpe+, negative ~ DD (as pseudo counts)
-        raw: Dict[str, float] = {}
-        for k, v in metrics.items():
-            s = max(float(v.get("sharpe", 0.0)), 0.0)
-            dd = max(float(v.get("dd", 0.0)), 0.0)
-            alpha = 1.0 + s  # prior + “success”
-            beta = 1.0 + 10.0 * dd  # prior + “failures” scaled by DD
-            p = alpha / (alpha + beta)
-            raw[k] = max(p, 0.0)
-        return self._normalize(raw)
-
     def allocate(
         self,
         metrics: Metrics,
@@ -84,37 +49,207 @@ class MetaAllocator:
         if not metrics:
             return {}
 
+        keys = list(metrics.keys())
+        keys += [k for k in (prev_weights or {}) if k not in metrics]
+        n = len(metrics)
+        w = self._base_weights(metrics, keys)[None, :]
+        mask = np.zeros((1, len(keys)), dtype=bool)
+        mask[0, :n] = True
+
+        # --- Optional smoothing toward previous weights
+        if prev_weights and smooth > 0.0:
+            prev = np.array([max(float(prev_weights.get(k, 0.0)), 0.0) for k in keys])[None, :]
+            w, mask = self._smooth(w, mask, prev, np.ones_like(mask), smooth)
+        else:
+            w, mask = w[:, :n], mask[:, :n]
+            keys = keys[:n]
+
+        # --- Optional correlation penalty (reduce exposure where peers highly correlated)
+        if corr is not None and len(corr) and corr_penalty > 0.0:
+            R = self._corr_matrix(corr, keys)
+            w = self._penalize(w, mask, R, corr_penalty)
+
+        w = self._normalize_rows(w, mask)[0]
+        return {k: float(v) for k, v in zip(keys, w)}
+
+    def allocate_many(
+        self,
+        metrics: pd.DataFrame | Mapping[Any, Metrics],
+        *,
+        prev_weights: Mapping[str, float] | None = None,
+        corr: Corr | None = None,
+        smooth: float = 0.10,
+        corr_penalty: float = 0.25,
+    ) -> pd.DataFrame:
+        """
+        allocate() for a whole sequence of rebalance dates in one call.
+
+        Args:
+            metrics: stacked metrics, either a DataFrame indexed by (date, sleeve) with
+                "sharpe"/"dd" columns, or {date: {sleeve: {"sharpe": .., "dd": ..}}}.
+            prev_weights: weights before the first date; each later date is smoothed
+                toward the previous date's result, as a rebalance loop would.
+            corr: pair dict or N x N matrix applied to every date, or a D x N x N
+                array (one matrix per date, sleeves in the output column order).
+            smooth, corr_penalty: as in allocate().
+
+        Returns:
+            DataFrame (index=date, columns=sleeves); sleeves absent on a date get 0.
+        """
+        sharpe, dd, mask, dates, keys = self._stack(metrics)
+        if not keys:
+            return pd.DataFrame(index=dates, dtype=float)
+        extra = [k for k in (prev_weights or {}) if k not in keys]
+        keys = keys + extra
+        if extra:
+            pad = np.zeros((len(dates), len(extra)))
+            sharpe, dd = np.hstack([sharpe, pad]), np.hstack([dd, pad])
+            mask = np.hstack([mask, pad.astype(bool)])
+
+        w = self._normalize_rows(self._raw(sharpe, dd, mask), mask)
+
+        R = None
+        if corr is not None and len(corr) and corr_penalty > 0.0:
+            if isinstance(corr, np.ndarray) and corr.ndim == 3:
+                R = self._pad_corr(corr, len(keys))
+            else:
+                R = self._corr_matrix(corr, keys)
+
+        if smooth > 0.0 and (prev_weights or len(dates) > 1):
+            # Dates chain through smoothing: one O(N) (O(N^2) with corr) step per date
+            out = np.zeros_like(w)
+            if prev_weights:
+                prev = np.array([max(float(prev_weights.get(k, 0.0)), 0.0) for k in keys])
+                prev_mask = np.ones(len(keys), dtype=bool)
+            else:
+                prev, prev_mask = None, None
+            for t in range(len(dates)):
+                wt, mt = w[t : t + 1], mask[t : t + 1]
+                if prev is not None:
+                    wt, mt = self._smooth(wt, mt, prev[None, :], prev_mask[None, :], smooth)
+                if R is not None:
+                    wt = self._penalize(wt, mt, R[t] if R.ndim == 3 else R, corr_penalty)
+                out[t] = self._normalize_rows(wt, mt)[0]
+                prev, prev_mask = out[t], mt[0]
+            w = out
+        else:
+            if R is not None:
+                w = self._penalize(w, mask, R, corr_penalty)
+            w = self._normalize_rows(w, mask)
+        return pd.DataFrame(w, index=dates, columns=keys)
+
+    # ---------- array kernels (rows = dates, columns = sleeves) ----------
+    def _base_weights(self, metrics: Metrics, keys: Sequence[str]) -> np.ndarray:
+        n = len(metrics)
+        mask = np.zeros((1, len(keys)), dtype=bool)
+        mask[0, :n] = True
         mode = (self.cfg.mode or "ewma").lower()
         try:
             if mode == "equal":
-                w = self._equal(metrics)
-            elif mode == "bayes":
-                w = self._bayes(metrics)
+                w = self._normalize_rows(mask.astype(float), mask)
             else:
-                w = self._ewma(metrics)
+                sharpe = np.zeros((1, len(keys)))
+                dd = np.zeros((1, len(keys)))
+                for j, v in enumerate(metrics.values()):
+                    sharpe[0, j] = float(v.get("sharpe", 0.0))
+                    dd[0, j] = float(v.get("dd", 0.0))
+                w = self._normalize_rows(self._raw(sharpe, dd, mask), mask)
         except Exception:
-            w = self._equal(metrics)
-
-        # --- Optional smoothing toward previous weights
-        if prev_weights and smooth > 0.0:
-            # ensure same keyset; missing keys -> 0
-            keys = set(w) | set(prev_weights)
-            prev = {k: max(float(prev_weights.get(k, 0.0)), 0.0) for k in keys}
-            prev = self._normalize(prev)
-            w = {k: (1.0 - smooth) * float(w.get(k, 0.0)) + smooth * prev.get(k, 0.0) for k in keys}
-            w = self._normalize(w)
+            w = self._normalize_rows(mask.astype(float), mask)
+        return w[0]
 
-        # --- Optional correlation penalty (reduce exposure where peers highly correlated)
-        if corr and corr_penalty > 0.0 and w:
-            keys = list(w.keys())
-            # aggregate correlation pressure per name as sum_j rho(i,j)*w_j (rho<0 ignored)
-            press = {k: 0.0 for k in keys}
+    def _raw(self, sharpe: np.ndarray, dd: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        mode = (self.cfg.mode or "ewma").lower()
+        if mode == "equal":
+            return mask.astype(float)
+        if mode == "bayes":
+            # Bayes-lite: positive evidence ~ Sharpe+, negative ~ DD (as pseudo counts)
+            alpha = 1.0 + np.maximum(sharpe, 0.0)  # prior + “success”
+            beta = 1.0 + 10.0 * np.maximum(dd, 0.0)  # prior + “failures” scaled by DD
+            raw = alpha / (alpha + beta)
+        else:
+            # Single-shot scoring (higher Sharpe, lower DD -> higher score);
+            # “ewma” name reserved for later time decay extension
+            raw = self.cfg.sharpe_weight * sharpe + self.cfg.dd_weight / (dd + self.cfg.eps)
+        return np.where(mask, np.maximum(raw, 0.0), 0.0)
+
+    def _normalize_rows(self, raw: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        # clip + renormalize each row over its sleeves (mask); absent sleeves stay at 0
+        clipped = np.where(mask, np.clip(raw, self.cfg.min_weight, self.cfg.max_weight), 0.0)
+        tot = np.maximum(clipped, 0.0).sum(axis=1, keepdims=True)
+        n = np.maximum(mask.sum(axis=1, keepdims=True), 1)
+        return np.where(tot <= self.cfg.eps, mask / n, clipped / np.where(tot > 0, tot, 1.0))
+
+    def _smooth(self, w, mask, prev, prev_mask, smooth: float):
+        mask = mask | prev_mask
+        prev = self._normalize_rows(np.where(prev_mask, prev, 0.0), prev_mask)
+        return self._normalize_rows((1.0 - smooth) * w + smooth * prev, mask), mask
+
+    def _penalize(self, w, mask, R: np.ndarray, corr_penalty: float) -> np.ndarray:
+        # correlation pressure per sleeve = sum_j rho(i,j)+ * w_j, for all dates at once
+        press = w @ R.T if R.ndim == 2 else np.einsum("dij,dj->di", R, w)
+        shrunk = np.maximum(w * (1.0 - corr_penalty * press), 0.0)
+        return self._normalize_rows(shrunk, mask)
+
+    @staticmethod
+    def _corr_matrix(corr: Corr, keys: Sequence[str]) -> np.ndarray:
+        """Positive-correlation matrix over keys; pair dicts add rho to both (a,b) and (b,a)."""
+        n = len(keys)
+        R = np.zeros((n, n))
+        if isinstance(corr, Mapping):
+            pos = {k: i for i, k in enumerate(keys)}
             for (a, b), rho in corr.items():
-                if a in press and b in press and rho is not None and rho > 0.0:
-                    press[a] += rho * w.get(b, 0.0)
-                    press[b] += rho * w.get(a, 0.0)
-            # shrink by (1 - corr_penalty * pressure), floor at 0
-            shrunk = {k: max(w[k] * (1.0 - corr_penalty * press[k]), 0.0) for k in keys}
-            w = self._normalize(shrunk)
-
-        return self._normalize(w)
+                if a in pos and b in pos and rho is not None and rho > 0.0:
+                    R[pos[a], pos[b]] += rho
+                    R[pos[b], pos[a]] += rho
+            return R
+        if isinstance(corr, pd.DataFrame):
+            R = corr.reindex(index=list(keys), columns=list(keys)).to_numpy(dtype=float)
+        else:
+            M = np.asarray(corr, dtype=float)
+            m = min(M.shape[0], n)
+            R[:m, :m] = M[:m, :m]
+        # matrices count each pair once; negative correlations are ignored
+        R = np.nan_to_num(np.maximum(R, 0.0))
+        np.fill_diagonal(R, 0.0)
+        return R
+
+    @staticmethod
+    def _pad_corr(corr: np.ndarray, n: int) -> np.ndarray:
+        m = min(corr.shape[1], n)
+        R = np.zeros((corr.shape[0], n, n))
+        R[:, :m, :m] = np.nan_to_num(np.maximum(corr[:, :m, :m], 0.0))
+        idx = np.arange(n)
+        R[:, idx, idx] = 0.0
+        return R
+
+    @staticmethod
+    def _stack(metrics) -> tuple[np.ndarray, np.ndarray, np.ndarray, pd.Index, List[str]]:
+        """Stacked metrics -> (sharpe, dd, present) D x N arrays, dates, sleeves."""
+        if isinstance(metrics, pd.DataFrame):
+            df = metrics
+        else:
+            df = pd.DataFrame.from_records(
+                [
+                    {"date": d, "sleeve": k, **dict(v)}
+                    for d, per in metrics.items()
+                    for k, v in per.items()
+                ],
+                columns=["date", "sleeve", "sharpe", "dd"],
+            ).set_index(["date", "sleeve"])
+        if df.empty:
+            return np.zeros((0, 0)), np.zeros((0, 0)), np.zeros((0, 0), bool), pd.Index([]), []
+        dates = df.index.get_level_values(0).unique()
+        keys = list(df.index.get_level_values(1).unique())
+        full = pd.MultiIndex.from_product([dates, keys])
+        present = pd.Series(True, index=df.index).reindex(full, fill_value=False)
+        shape = (len(dates), len(keys))
+
+        def col(name: str) -> np.ndarray:
+            if name not in df.columns:
+                return np.zeros(shape)
+            v = pd.to_numeric(df[name], errors="coerce").reindex(full)
+            return v.fillna(0.0).to_numpy(dtype=float).reshape(shape)
+
+        mask = present.to_numpy(dtype=bool).reshape(shape)
+        return col("sharpe"), col("dd"), mask, dates, keys
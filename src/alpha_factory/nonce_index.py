@@ -0,0 +1,247 @@
+# src/alpha_factory/nonce_index.py
+"""
+Anti-replay index over the live journal (artifacts/live/journal.ndjson).
+
+The set of ticket nonces that already have a FILL row lives in memory, so the
+pre-trade duplicate check is a set lookup instead of a scan of the whole journal.
+A JSON snapshot next to the journal stores the nonces plus the byte offset they
+cover; on startup only the journal tail past that offset is parsed.
+
+Other processes (the EA fill recorder in bridge_contract) append to the same
+journal, so every lookup first reads whatever was appended since the last one:
+a stat() when nothing changed, a few lines otherwise. When the active file is
+sealed into a dated segment (live_journal), the rest of that segment and any other
+segment sealed since the last lookup are read, and the index carries on at offset 0
+of the new file; a fresh index without snapshot covers all sealed segments. Recently
+sealed segments keep a byte offset (live_journal.SealedOffsets) and are re-checked
+for late rows until they settle.
+
+The snapshot is rewritten after `save_every` new nonces or `save_interval` seconds,
+whichever comes first, and on close() / interpreter exit, not on every FILL. It is
+only a shortcut: after a crash the journal past the last saved offset is re-read.
+
+    idx = NonceIndex("artifacts/live/journal.ndjson")
+    if nonce in idx: ...              # REPLAY_BLOCKED
+    idx.append({"ts": ..., "type": "FILL", "fill": {...}})
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+
+from alpha_factory.live_journal import (
+    JournalWriter,
+    SealedOffsets,
+    head_fingerprint,
+    journal_writer,
+)
+
+
+def _fill_nonce(raw: bytes) -> Optional[str]:
+    """ticket_nonce of a FILL row, None for any other line (banners, blanks, INTENT, ...)."""
+    raw = raw.strip()
+    if not raw or b"FILL" not in raw:
+        return None
+    try:
+        row = json.loads(raw)
+    except Exception:
+        return None
+    if not isinstance(row, dict) or row.get("type") != "FILL":
+        return None
+    fill = row.get("fill")
+    if not isinstance(fill, dict):
+        return None
+    nonce = fill.get("ticket_nonce")
+    return nonce if isinstance(nonce, str) else None
+
+
+def _scan(path: Path, start: int, nonces: Set[str]) -> int:
+    """Add FILL nonces of the complete lines from `start`; returns the new offset."""
+    with path.open("rb") as fh:
+        fh.seek(start)
+        data = fh.read()
+    stop = data.rfind(b"\n") + 1  # a half-written last line waits for the next call
+    for raw in data[:stop].splitlines():
+        nonce = _fill_nonce(raw)
+        if nonce is not None:
+            nonces.add(nonce)
+    return start + stop
+
+
+_OPEN: "weakref.WeakSet[NonceIndex]" = weakref.WeakSet()
+
+
+class NonceIndex:
+    def __init__(
+        self,
+        journal_path: str | Path,
+        snapshot_path: str | Path | None = None,
+        writer: JournalWriter | None = None,
+        save_every: int = 256,
+        save_interval: float = 30.0,
+    ):
+        self.journal = Path(journal_path)
+        if snapshot_path:
+            self.snapshot = Path(snapshot_path)
+        else:
+            self.snapshot = self.journal.with_name(self.journal.name + ".nonces.json")
+        self.writer = writer
+        self.save_every = max(1, int(save_every))
+        self.save_interval = float(save_interval)
+        self.nonces: Set[str] = set()
+        self.offset = 0
+        self._head = ""
+        self._ino: Optional[int] = None  # file identity verified against _head
+        self.sealed = SealedOffsets(self.journal)
+        self._lock = threading.RLock()
+        self._dirty = 0  # new nonces since the last save (a moved/rebuilt index counts too)
+        self._last_save = time.monotonic()
+        if not self._load():
+            self._scan_sealed()
+        start = self.offset
+        self.refresh()
+        if self.offset != start:
+            self.save()  # persist the covered offset even when the tail had no fills
+        _OPEN.add(self)
+
+    # ---------- snapshot ----------
+    def _load(self) -> bool:
+        try:
+            with self.snapshot.open("r", encoding="utf-8") as fh:
+                snap = json.load(fh)
+            nonces, offset, head = snap["nonces"], int(snap["offset"]), str(snap["head"])
+            segments = snap.get("segments")
+            if segments is None:
+                # snapshot without segment offsets: it covered every segment sealed so far
+                segments = {p.name: None for p in SealedOffsets(self.journal).discover()[0]}
+            self.sealed = SealedOffsets(self.journal, segments)
+        except Exception:
+            return False  # missing / torn / foreign snapshot: rebuild from the journal
+        self.nonces, self.offset, self._head = set(nonces), offset, head
+        return True
+
+    def save(self) -> None:
+        """Atomically persist nonces + covered offset (tmp file + os.replace)."""
+        with self._lock:
+            payload = {
+                "offset": self.offset,
+                "head": self._head,
+                "segments": dict(self.sealed.offsets),
+                "nonces": sorted(self.nonces),
+            }
+            self._dirty, self._last_save = 0, time.monotonic()
+        self.snapshot.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot.with_name(self.snapshot.name + ".tmp." + os.urandom(4).hex())
+        try:
+            with tmp.open("w", encoding="utf-8") as fh:
+                json.dump(payload, fh, separators=(",", ":"))
+            os.replace(tmp, self.snapshot)
+        except Exception:
+            if tmp.exists():
+                tmp.unlink()
+            raise
+
+    # ---------- segments ----------
+    def _scan_segments(self, segs) -> None:
+        for seg, start in segs:
+            self.sealed.advance(seg, _scan(seg, start, self.nonces))
+
+    def _scan_sealed(self) -> None:
+        self._scan_segments(self.sealed.discover()[0])
+
+    def _finish_sealed(self) -> bool:
+        """
+        The file we were reading got sealed: index its remainder and every other segment
+        sealed since. False if none of them is that file (the journal was replaced).
+        """
+        segs, found = self.sealed.discover(self._head, self.offset)
+        if found:
+            self._scan_segments(segs)
+        return found
+
+    # ---------- tail ----------
+    def refresh(self) -> int:
+        """Index lines appended since the last call; returns the number of new nonces."""
+        with self._lock:
+            before = len(self.nonces)
+            self._scan_segments(self.sealed.grown())  # late rows in recently sealed segments
+            try:
+                st = self.journal.stat()
+                size, ino = st.st_size, st.st_ino
+            except FileNotFoundError:
+                size, ino = 0, None
+            if size == self.offset and ino == self._ino:
+                return self._added(before, False)
+            moved = False
+            if self.offset and (size < self.offset or ino != self._ino):
+                # a different file than the one the offset refers to?
+                moved = size < self.offset or head_fingerprint(self.journal) != self._head
+            if moved:
+                # sealed into a segment (keep nonces) or replaced by an unrelated file (rebuild)
+                if not self._finish_sealed():
+                    self.nonces = set()
+                    self.sealed = SealedOffsets(self.journal)
+                    self._scan_sealed()
+                self.offset, self._head = 0, ""
+            elif not self.offset:
+                self._scan_sealed()  # segments sealed while there was nothing to read
+            if size:
+                self.offset = _scan(self.journal, self.offset, self.nonces)
+                if self.offset and not self._head:
+                    self._head = head_fingerprint(self.journal)
+            self._ino = ino if self.offset else None
+            return self._added(before, moved)
+
+    def _added(self, before: int, moved: bool) -> int:
+        added = len(self.nonces) - before
+        if added > 0 or moved:
+            self._dirty += max(added, 1)
+        if self._dirty and (
+            self._dirty >= self.save_every
+            or time.monotonic() - self._last_save >= self.save_interval
+        ):
+            self.save()
+        return max(added, 0)
+
+    # ---------- public ----------
+    def __contains__(self, nonce: object) -> bool:
+        self.refresh()
+        return nonce in self.nonces
+
+    def __len__(self) -> int:
+        return len(self.nonces)
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """Append one journal row through the journal writer and index it right away."""
+        with self._lock:
+            (self.writer or journal_writer(self.journal)).append(row)
+            self.refresh()
+
+    def close(self) -> None:
+        """Save the snapshot if nonces were added since the last save."""
+        with self._lock:
+            if self._dirty:
+                self.save()
+        _OPEN.discard(self)
+
+    def __enter__(self) -> "NonceIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@atexit.register
+def _close_indexes() -> None:
+    for idx in list(_OPEN):
+        try:
+            idx.close()
+        except Exception:
+            pass
@@ -1,21 +1,34 @@
 from __future__ import annotations
 from typing import Mapping, TYPE_CHECKING, Sequence
 
+import numpy as np
+
 if TYPE_CHECKING:
     import pandas as pd
 
-from .alloc_io import apply_meta_weights
+from .alloc_io import align_signals, weights_array
 
 
-def clip_exposure(x: "pd.Series", cap: float = 1.0) -> "pd.Series":
-    """Clip combined sleeve exposure into [-cap, cap]."""
+def clip_exposure(x, cap: float = 1.0):
+    """Clip combined sleeve exposure (Series or array) into [-cap, cap]."""
 
     cap = float(cap)
     if cap <= 0:
         raise ValueError("cap must be > 0")
+    if isinstance(x, np.ndarray):
+        return np.clip(x, -cap, cap)
     return x.clip(lower=-cap, upper=cap)
 
 
+def _split(x: np.ndarray, n_assets: int, per_asset_cap: float) -> np.ndarray:
+    # [time] exposure -> [time x asset]: equal split, per-asset cap, gross <= 1.0
+    row = np.clip(x / float(n_assets), -per_asset_cap, per_asset_cap)
+    gross = np.abs(row) * n_assets
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(gross > 1.0, 1.0 / gross, 1.0)
+    return np.repeat((row * scale)[:, None], n_assets, axis=1)
+
+
 def distribute_across_assets(
     exposure: "pd.Series",
     assets: Sequence[str],
@@ -29,29 +42,20 @@ def distribute_across_assets(
 
     if not assets:
         raise ValueError("No assets provided.")
-    df = pd.DataFrame(index=exposure.index, columns=list(assets), dtype=float)
-    n = float(len(assets))
     per_asset_cap = float(per_asset_cap)
     if per_asset_cap <= 0:
         raise ValueError("per_asset_cap must be > 0")
 
     # Equal split, then per-asset cap, then (soft) renormalize if gross > 1
-    for ts, v in exposure.items():
-        row = [float(v) / n for _ in assets]
-        # per-asset cap
-        row = [max(min(x, per_asset_cap), -per_asset_cap) for x in row]
-        gross = sum(abs(x) for x in row)
-        if gross > 1.0 and gross > 0:
-            # scale down to keep gross at 1.0
-            scale = 1.0 / gross
-            row = [x * scale for x in row]
-        df.loc[ts] = row
-    return df
+    x = exposure.to_numpy(dtype=float, na_value=np.nan)
+    return pd.DataFrame(
+        _split(x, len(assets), per_asset_cap), index=exposure.index, columns=list(assets)
+    )
 
 
 def to_targets(
     per_sleeve_signals: Mapping[str, "pd.Series"],
-    alloc_weights: Mapping[str, float],
+    alloc_weights: "Mapping[str, float] | pd.DataFrame",
     assets: Sequence[str],
     cap_exposure: float = 1.0,
     per_asset_cap: float = 0.5,
@@ -60,11 +64,22 @@ def to_targets(
     Combine sleeve signals with allocation weights, clip to cap_exposure,
     and distribute across assets with per-asset cap. Returns DataFrame
     indexed by time, columns = assets, values in [-per_asset_cap, +per_asset_cap].
+    alloc_weights may be a [time x sleeve] DataFrame for time-varying allocations.
     """
+    import pandas as pd
 
-    combo = apply_meta_weights(per_sleeve_signals, alloc_weights)
+    if not assets:
+        raise ValueError("No assets provided.")
+    if float(per_asset_cap) <= 0:
+        raise ValueError("per_asset_cap must be > 0")
+    # [time x sleeve] signals -> [time] combo -> [time x asset] targets, all on arrays
+    idx, sleeves, X = align_signals(per_sleeve_signals)
+    w = weights_array(alloc_weights, idx, sleeves)
+    combo = X @ w if w.ndim == 1 else (X * w).sum(axis=1)
     combo = clip_exposure(combo, cap=cap_exposure)
-    return distribute_across_assets(combo, assets=assets, per_asset_cap=per_asset_cap)
+    return pd.DataFrame(
+        _split(combo, len(assets), float(per_asset_cap)), index=idx, columns=list(assets)
+    )
 
 
 __all__ = ["clip_exposure", "distribute_across_assets", "to_targets"]
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 import numpy as np
 import pandas as pd
 
+if TYPE_CHECKING:
+    from core.feature_graph import FeatureGraph
+
 
 # ---------- helpers ----------
 def _sma(s: pd.Series, n: int) -> pd.Series:
@@ -22,6 +26,18 @@ def _rsi(s: pd.Series, n: int) -> pd.Series:
     return rsi
 
 
+def _primitive(graph: FeatureGraph | None, s: pd.Series, fn: str, **params) -> pd.Series:
+    # Route through a shared FeatureGraph when given so identical windows are computed once
+    if graph is None:
+        if fn == "sma":
+            return _sma(s, params["n"])
+        return _rsi(s, params["n"])
+    src = graph.source(s, field="close")
+    if fn == "rsi":
+        params.setdefault("min_periods", params["n"])
+    return graph.compute(fn, src, **params)
+
+
 # ---------- factor objects ----------
 @dataclass
 class _SmaCross:
@@ -32,9 +48,9 @@ class _SmaCross:
     def name(self) -> str:
         return f"sma_cross_{self.fast}_{self.slow}"
 
-    def compute(self, s: pd.Series) -> pd.Series:
-        f = _sma(s, self.fast)
-        slow_ma = _sma(s, self.slow)
+    def compute(self, s: pd.Series, graph: FeatureGraph | None = None) -> pd.Series:
+        f = _primitive(graph, s, "sma", n=self.fast)
+        slow_ma = _primitive(graph, s, "sma", n=self.slow)
         sig = np.where(f > slow_ma, 1.0, -1.0).astype(float)
         out = pd.Series(sig, index=s.index, name=self.name)
         out.iloc[: max(self.fast, self.slow) - 1] = 0.0  # no warm-up NaN
@@ -51,8 +67,8 @@ class _RsiThresh:
     def name(self) -> str:
         return f"rsi_thresh_{self.n}_{int(self.lo)}_{int(self.hi)}"
 
-    def compute(self, s: pd.Series) -> pd.Series:
-        r = _rsi(s, self.n)
+    def compute(self, s: pd.Series, graph: FeatureGraph | None = None) -> pd.Series:
+        r = _primitive(graph, s, "rsi", n=self.n)
         sig = np.full(len(s), 0.0, dtype=float)
         sig[r < self.lo] = 1.0
         sig[r > self.hi] = -1.0
@@ -69,8 +85,8 @@ class _SmaSlope:
     def name(self) -> str:
         return f"sma_slope_{self.window}_{self.lookback}"
 
-    def compute(self, s: pd.Series) -> pd.Series:
-        m = _sma(s, self.window)
+    def compute(self, s: pd.Series, graph: FeatureGraph | None = None) -> pd.Series:
+        m = _primitive(graph, s, "sma", n=self.window)
         slope = m.diff(self.lookback)
         sig = np.sign(slope).fillna(0.0).astype(float)
         out = pd.Series(sig, index=s.index, name=self.name)
@@ -7,6 +7,7 @@ import duckdb
 # Keep schema helpers import (side-effect OK)
 import alpha_factory.alpha_registry_schema_v025  # noqa: F401
 from alpha_factory.alpha_registry import AlphaRegistry
+from alpha_factory.registry_session import RegistrySession, get_session
 
 
 def _wrap_summary_html(html_table: str, theme: str = "light") -> str:
@@ -92,6 +93,15 @@ SELECT CAST(config_hash AS VARCHAR) AS alpha_id,
     )
 
 
+def _session(reg: AlphaRegistry, cache_dir: str | None) -> RegistrySession:
+    # Read commands share the registry's connection and its generation-tagged result cache
+    sess = get_session(reg)
+    if cache_dir:
+        sess.set_cache_dir(cache_dir)
+    _ensure_runs_view(sess.con)
+    return sess
+
+
 def _json_metric_expr(metric: str) -> str:
     # Works for numeric or quoted JSON values
     return (
@@ -105,6 +115,11 @@ def _json_metric_expr(metric: str) -> str:
 def main(argv=None) -> int:
     p = argparse.ArgumentParser("alpha-registry")
     p.add_argument("--db", default="data/registry.duckdb")
+    p.add_argument(
+        "--cache-dir",
+        default=os.environ.get("ALPHA_REGISTRY_CACHE"),
+        help="persist query results here; reused until the registry is written again",
+    )
     sub = p.add_subparsers(dest="cmd", required=True)
 
     sub.add_parser("init")
@@ -163,14 +178,12 @@ def main(argv=None) -> int:
         return 0
 
     if a.cmd == "refresh-runs":
-        con = duckdb.connect(a.db)
-        _ensure_runs_view(con)
+        _ensure_runs_view(get_session(reg).con)
         print("OK: runs view refreshed")
         return 0
 
     if a.cmd == "best":
-        con = duckdb.connect(a.db)
-        _ensure_runs_view(con)
+        sess = _session(reg, a.cache_dir)
         val = _json_metric_expr(a.metric)
         q = f"""
         WITH base AS (
@@ -183,13 +196,12 @@ def main(argv=None) -> int:
         ORDER BY value DESC
         LIMIT {int(a.top)}
         """
-        df = con.execute(q).df()
+        df = sess.query_df(q)
         print(df.to_string(index=False))
         return 0
 
     if a.cmd == "summary":
-        con = duckdb.connect(a.db)
-        _ensure_runs_view(con)
+        sess = _session(reg, a.cache_dir)
         val = _json_metric_expr(a.metric)
         q = f"""
         WITH base AS (
@@ -210,13 +222,12 @@ def main(argv=None) -> int:
         GROUP BY alpha_id
         ORDER BY mean DESC
         """
-        df = con.execute(q).df()
+        df = sess.query_df(q)
         print(df.to_string(index=False))
         return 0
 
     if a.cmd == "search":
-        con = duckdb.connect(a.db)
-        _ensure_runs_view(con)
+        sess = _session(reg, a.cache_dir)
         val = _json_metric_expr(a.metric)
         where = ["value IS NOT NULL"]
         params: list[object] = []
@@ -240,7 +251,7 @@ def main(argv=None) -> int:
         ORDER BY value DESC, timestamp DESC
         LIMIT {int(a.limit)}
         """
-        print(duckdb.connect(a.db).execute(q, params).df().to_string(index=False))
+        print(sess.query_df(q, params).to_string(index=False))
         return 0
 
     if a.cmd == "lineage":
@@ -254,8 +265,7 @@ def main(argv=None) -> int:
         return 0
 
     if a.cmd == "export":
-        con = duckdb.connect(a.db)
-        _ensure_runs_view(con)
+        sess = _session(reg, a.cache_dir)
         val = _json_metric_expr(a.metric)
         if a.what == "best":
             q = f"""
@@ -289,7 +299,7 @@ def main(argv=None) -> int:
             GROUP BY alpha_id
             ORDER BY mean DESC
             """
-        df = con.execute(q).df()
+        df = sess.query_df(q)
         os.makedirs(os.path.dirname(a.out) or ".", exist_ok=True)
         if a.format == "csv":
             df.to_csv(a.out, index=False)
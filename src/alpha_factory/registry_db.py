@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import sqlite3
 from dataclasses import dataclass
-from typing import Optional, Sequence, Tuple
+from typing import Iterable, Optional, Sequence, Tuple
 
 DEFAULT_DB = os.path.join(os.getcwd(), ".data", "alpha_registry.db")
 
@@ -14,6 +15,25 @@ class DBConfig:
     path: str = DEFAULT_DB
 
 
+@dataclass(frozen=True)
+class SyncStats:
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.skipped
+
+
+def _params_json(params: dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def _spec_hash(params_json: str) -> str:
+    return hashlib.sha1(params_json.encode("utf-8")).hexdigest()
+
+
 def get_connection(path: Optional[str] = None) -> sqlite3.Connection:
     db = path or DEFAULT_DB
     os.makedirs(os.path.dirname(db), exist_ok=True)
@@ -34,10 +54,15 @@ def init_db(conn: sqlite3.Connection) -> None:
         );
         """
     )
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(factors)").fetchall()}
+    if "spec_hash" not in cols:
+        conn.execute("ALTER TABLE factors ADD COLUMN spec_hash TEXT")
+        # updated_at tracks spec changes only, not spec_hash backfills
+        conn.execute("DROP TRIGGER IF EXISTS factors_updated_at")
     conn.execute(
         """
         CREATE TRIGGER IF NOT EXISTS factors_updated_at
-        AFTER UPDATE ON factors
+        AFTER UPDATE OF params_json ON factors
         BEGIN
             UPDATE factors
             SET updated_at = strftime('%Y-%m-%dT%H:%M:%fZ','now')
@@ -49,18 +74,66 @@ def init_db(conn: sqlite3.Connection) -> None:
 
 
 def upsert_factor(conn: sqlite3.Connection, name: str, params: dict) -> None:
-    params_json = json.dumps(params, sort_keys=True)
+    params_json = _params_json(params)
     conn.execute(
         """
-        INSERT INTO factors(name, params_json)
-        VALUES (?, ?)
-        ON CONFLICT(name) DO UPDATE SET params_json=excluded.params_json;
+        INSERT INTO factors(name, params_json, spec_hash)
+        VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET params_json=excluded.params_json,
+                                        spec_hash=excluded.spec_hash;
         """,
-        (name, params_json),
+        (name, params_json, _spec_hash(params_json)),
     )
     conn.commit()
 
 
+def upsert_factors(conn: sqlite3.Connection, items: Iterable[Tuple[str, dict]]) -> SyncStats:
+    """
+    Batch upsert in a single transaction. Rows whose spec hash is unchanged are skipped
+    (not rewritten, updated_at untouched). Later duplicates of a name win.
+    """
+    incoming: dict[str, Tuple[str, str]] = {}
+    for name, params in items:
+        pj = _params_json(params)
+        incoming[str(name)] = (pj, _spec_hash(pj))
+    if not incoming:
+        return SyncStats()
+
+    # name -> (current hash, hash column still empty on a pre-spec_hash row)
+    existing = {
+        name: (spec_hash or _spec_hash(pj), spec_hash is None)
+        for name, pj, spec_hash in conn.execute(
+            "SELECT name, params_json, spec_hash FROM factors"
+        ).fetchall()
+    }
+    inserts, updates, backfill = [], [], []
+    for name, (pj, h) in incoming.items():
+        old = existing.get(name)
+        if old is None:
+            inserts.append((name, pj, h))
+        elif old[0] != h:
+            updates.append((pj, h, name))
+        elif old[1]:
+            backfill.append((h, name))
+
+    with conn:
+        if inserts:
+            conn.executemany(
+                "INSERT INTO factors(name, params_json, spec_hash) VALUES (?, ?, ?)", inserts
+            )
+        if updates:
+            conn.executemany(
+                "UPDATE factors SET params_json = ?, spec_hash = ? WHERE name = ?", updates
+            )
+        if backfill:
+            conn.executemany("UPDATE factors SET spec_hash = ? WHERE name = ?", backfill)
+    return SyncStats(
+        inserted=len(inserts),
+        updated=len(updates),
+        skipped=len(incoming) - len(inserts) - len(updates),
+    )
+
+
 def list_factors(conn: sqlite3.Connection) -> Sequence[Tuple[str, dict]]:
     rows = conn.execute("SELECT name, params_json FROM factors ORDER BY name").fetchall()
     return [(name, json.loads(pj)) for (name, pj) in rows]
@@ -77,35 +150,44 @@ def clear_all(conn: sqlite3.Connection) -> None:
     conn.commit()
 
 
-def sync_from_registry(registry, conn: sqlite3.Connection) -> int:
+def _factor_params(fac) -> dict:
+    params = {}
+    # Collect simple public attributes to help observability
+    for a in (
+        "__class__",
+        "name",
+        "fast",
+        "slow",
+        "n",
+        "lookback",
+        "lower",
+        "upper",
+    ):
+        if hasattr(fac, a) and not a.startswith("__"):
+            try:
+                v = getattr(fac, a)
+                if not callable(v):
+                    params[a] = v
+            except Exception:
+                pass
+    params["__classname__"] = fac.__class__.__name__
+    return params
+
+
+def sync_registry(registry, conn: sqlite3.Connection) -> SyncStats:
     """
-    Registry → DB mirror. Returns number of upserts performed.
+    Registry → DB mirror in one transaction; returns inserted/updated/skipped counts.
     `registry` is the module object with `names()` and `make()`.
     """
     init_db(conn)
-    count = 0
-    for name in registry.names():
-        fac = registry.make(name)
-        params = {}
-        # Collect simple public attributes to help observability
-        for a in (
-            "__class__",
-            "name",
-            "fast",
-            "slow",
-            "n",
-            "lookback",
-            "lower",
-            "upper",
-        ):
-            if hasattr(fac, a) and not a.startswith("__"):
-                try:
-                    v = getattr(fac, a)
-                    if not callable(v):
-                        params[a] = v
-                except Exception:
-                    pass
-        params["__classname__"] = fac.__class__.__name__
-        upsert_factor(conn, name, params)
-        count += 1
-    return count
+    return upsert_factors(
+        conn, ((name, _factor_params(registry.make(name))) for name in registry.names())
+    )
+
+
+def sync_from_registry(registry, conn: sqlite3.Connection) -> int:
+    """
+    Registry → DB mirror. Returns number of factors synced (see sync_registry for counts).
+    `registry` is the module object with `names()` and `make()`.
+    """
+    return sync_registry(registry, conn).total
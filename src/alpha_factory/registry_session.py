@@ -0,0 +1,367 @@
+"""
+Per-database registry session shared by the ext overrides and tooling helpers.
+
+One session per registry database holds the connection (the registry's own when it
+has one), runs one-time DDL (runs view, runs_metadata) once instead of on every
+call, and caches generated statement text keyed by query shape. DuckDB's Python API
+has no prepared-statement handle, so the cache stores the SQL text and callers bind
+parameters per execution.
+
+Query results go through a ResultCache keyed by (database, instance, SQL, params) and
+tagged with (instance, write generation) from registry_meta; every registry write
+bumps the generation, and the instance is a random id drawn when the database is
+created, so a deleted and recreated file does not serve the old file's results. A
+hit is returned until the generation moves on; with a cache_dir (or the
+ALPHA_REGISTRY_CACHE env var) results also persist across processes, e.g. CLI runs.
+
+    sess = get_session(reg)
+    sess.ensure_runs_view()
+    sql = sess.statement(("rank", metric, ...), lambda: build_sql(...))
+    df = sess.query_df(sql, params)
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+import hashlib
+import os
+import pickle
+import threading
+
+import duckdb
+import pandas as pd
+
+_SESSIONS: Dict[str, "RegistrySession"] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+_EMPTY_RUNS_VIEW = """
+CREATE OR REPLACE VIEW runs AS
+SELECT CAST(NULL AS VARCHAR) AS alpha_id,
+       CAST(NULL AS VARCHAR) AS run_id,
+       CAST(NULL AS TIMESTAMP) AS timestamp,
+       CAST(NULL AS VARCHAR) AS tags,
+       CAST(NULL AS JSON) AS metrics,
+       CAST(NULL AS VARCHAR) AS config_hash
+WHERE 1=0
+"""
+
+
+def _table_cols(con, name: str) -> Set[str]:
+    try:
+        return {str(r[1]).lower() for r in con.execute(f"PRAGMA table_info({name})").fetchall()}
+    except Exception:
+        return set()
+
+
+def _is_placeholder(con) -> bool:
+    row = con.execute(
+        "SELECT sql FROM duckdb_views() WHERE view_name = 'runs' AND NOT internal"
+    ).fetchone()
+    return bool(row) and "1=0" in (row[0] or "").replace(" ", "")
+
+
+def build_runs_view(con) -> bool:
+    """
+    Create the `runs` view over `alphas`. An existing runs view/table that already
+    exposes `metrics` is kept. Returns False when only the empty placeholder could be
+    built (no alphas table yet), so callers retry later.
+    """
+    cols = _table_cols(con, "alphas")
+    runs_cols = _table_cols(con, "runs")
+    if "metrics" in runs_cols and not (cols and _is_placeholder(con)):
+        return True
+    if runs_cols:
+        con.execute("DROP VIEW IF EXISTS runs")
+    if not cols:
+        con.execute(_EMPTY_RUNS_VIEW)
+        return False
+    # Registry-created tables use `ts`; tool-created ones use `timestamp`
+    ts_expr = next((c for c in ("timestamp", "ts", "created_at", "time") if c in cols), "NULL")
+    con.execute(f"""
+    CREATE OR REPLACE VIEW runs AS
+    SELECT
+      CAST(config_hash AS VARCHAR) AS alpha_id,
+      CAST(id AS VARCHAR)          AS run_id,
+      COALESCE({ts_expr}, CURRENT_TIMESTAMP) AS timestamp,
+      tags,
+      CAST(metrics AS JSON)        AS metrics,
+      config_hash
+    FROM alphas
+    """)
+    return True
+
+
+def ensure_runs_meta(con) -> bool:
+    con.execute("""
+    CREATE TABLE IF NOT EXISTS runs_metadata (
+      run_id TEXT PRIMARY KEY,
+      alpha_id TEXT NOT NULL,
+      run_hash TEXT,
+      timestamp TIMESTAMP,
+      source_version TEXT,
+      config_hash TEXT,
+      config_diff TEXT,
+      tags TEXT,
+      notes TEXT
+    );
+    """)
+    return True
+
+
+class ResultCache:
+    """
+    Generation-tagged query results: in-memory LRU plus an optional pickle directory.
+    An entry is a hit only while its tag equals the registry's current one; sessions
+    tag with (instance, generation).
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None, max_items: int = 256):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_items = int(max_items)
+        self._mem: "OrderedDict[str, Tuple[Hashable, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def key(db: str | None, sql: str, params, instance: int | None = None) -> str:
+        return hashlib.sha1(repr((db, instance, sql, list(params or []))).encode()).hexdigest()
+
+    def get(self, key: str, generation: Hashable, disk: bool = True) -> Optional[Any]:
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None and hit[0] == generation:
+                self._mem.move_to_end(key)
+                self.stats["hits"] += 1
+                return hit[1]
+        hit = self._disk_get(key) if disk else None
+        if hit is not None and hit[0] == generation:
+            self.stats["disk_hits"] += 1
+            self._remember(key, hit)
+            return hit[1]
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, generation: Hashable, value: Any, disk: bool = True) -> None:
+        self._remember(key, (generation, value))
+        if disk:
+            self._disk_put(key, (generation, value))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+
+    def _remember(self, key: str, entry: Tuple[Hashable, Any]) -> None:
+        with self._lock:
+            self._mem[key] = entry
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_items:
+                self._mem.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[Tuple[Hashable, Any]]:
+        if self.cache_dir is None:
+            return None
+        p = self.cache_dir / f"{key}.pkl"
+        if not p.exists():
+            return None
+        try:
+            with p.open("rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None  # torn/foreign file: treat as a miss, put() overwrites it
+
+    def _disk_put(self, key: str, entry: Tuple[Hashable, Any]) -> None:
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        dst = self.cache_dir / f"{key}.pkl"
+        tmp = dst.with_suffix(".tmp." + os.urandom(4).hex())
+        try:
+            with tmp.open("wb") as f:
+                pickle.dump(entry, f, protocol=4)
+            os.replace(tmp, dst)
+        except Exception:
+            if tmp.exists():
+                tmp.unlink()
+            raise
+
+
+class RegistrySession:
+    """Shared connection + once-per-database DDL + statement-text and result caches."""
+
+    def __init__(
+        self,
+        connect: Callable[[], duckdb.DuckDBPyConnection],
+        registry=None,
+        db: str | None = None,
+    ):
+        self._connect = connect
+        self.registry = registry
+        self.db = db
+        self._con = None
+        self._done: Set[str] = set()
+        self._statements: Dict[Hashable, str] = {}
+        self._lock = threading.RLock()
+        self.index_ok = False
+        self._synced_gen: int | None = None
+        self.cache = ResultCache(os.environ.get("ALPHA_REGISTRY_CACHE") or None)
+
+    @property
+    def con(self) -> duckdb.DuckDBPyConnection:
+        con = self._connect()
+        if con is not self._con:
+            # New/reopened connection (e.g. registry db_path changed): redo the DDL checks
+            self._con = con
+            self._done.clear()
+            self._synced_gen = None
+        return con
+
+    def once(self, key: str, fn: Callable[[duckdb.DuckDBPyConnection], bool]) -> None:
+        """Run fn(con) until it reports success once for this database."""
+        con = self.con
+        if key in self._done:
+            return
+        with self._lock:
+            if key not in self._done and fn(con) is not False:
+                self._done.add(key)
+
+    def reset(self, key: str | None = None) -> None:
+        """Forget one-time setup (e.g. after a tool recreated tables)."""
+        if key is None:
+            self._done.clear()
+        else:
+            self._done.discard(key)
+
+    def ensure_runs_view(self) -> None:
+        self.once("runs_view", build_runs_view)
+
+    def ensure_runs_meta(self) -> None:
+        self.once("runs_metadata", ensure_runs_meta)
+
+    def statement(self, key: Hashable, build: Callable[[], str]) -> str:
+        sql = self._statements.get(key)
+        if sql is None:
+            sql = self._statements[key] = build()
+        return sql
+
+    @property
+    def indexed(self) -> bool:
+        """True when the registry keeps typed metric / tag index tables."""
+        return hasattr(self.registry, "sync_index")
+
+    def sync_index(self) -> bool:
+        """
+        Index rows written behind the registry's back; False if the registry has no index.
+        Skipped while the write generation is unchanged since the last sync, so direct
+        SQL writers should call registry.bump_generation() afterwards.
+        """
+        ok = False
+        if self.indexed:
+            try:
+                gen = self.generation()
+                if gen is None or gen != self._synced_gen:
+                    self.registry.sync_index()
+                    self._synced_gen = self.generation()  # the sync itself may bump it
+                ok = True
+            except Exception:
+                ok = False
+        self.index_ok = ok
+        return ok
+
+    # ---- result cache ----
+    def set_cache_dir(self, cache_dir: str | Path | None) -> None:
+        self.cache.cache_dir = Path(cache_dir) if cache_dir else None
+
+    def generation(self) -> int | None:
+        """Current write generation, or None when the database has no registry_meta."""
+        if isinstance(getattr(type(self.registry), "generation", None), property):
+            return int(self.registry.generation)
+        try:
+            row = self.con.execute(
+                "SELECT value FROM registry_meta WHERE key = 'generation'"
+            ).fetchone()
+        except duckdb.Error:
+            return None
+        return int(row[0]) if row else None
+
+    def instance(self) -> int | None:
+        """Random id of the database (registry_meta), or None when it has none."""
+        if isinstance(getattr(type(self.registry), "instance", None), property):
+            return int(self.registry.instance)
+        try:
+            row = self.con.execute(
+                "SELECT value FROM registry_meta WHERE key = 'instance'"
+            ).fetchone()
+        except duckdb.Error:
+            return None
+        return int(row[0]) if row else None
+
+    def query_df(self, sql: str, params=None) -> pd.DataFrame:
+        """con.execute(sql, params).df(), served from the result cache until the next write."""
+        params = list(params or [])
+        gen = self.generation()
+        if gen is None:
+            return self.con.execute(sql, params).df()
+        db = _db_path(self.registry) if self.registry is not None else self.db
+        # in-memory databases have no identity outside this process: memory layer only
+        disk = db not in (None, ":memory:")
+        inst = self.instance()
+        tag = (inst, gen)
+        key = ResultCache.key(db if disk else f"mem:{id(self)}", sql, params, inst)
+        hit = self.cache.get(key, tag, disk=disk)
+        if hit is not None:
+            return hit.copy()
+        df = self.con.execute(sql, params).df()
+        self.cache.put(key, tag, df.copy(), disk=disk)
+        return df
+
+
+def _db_path(target) -> str | None:
+    for attr in ("db_path", "path", "database"):
+        p = getattr(target, attr, None)
+        if isinstance(p, (str, Path)) and str(p):
+            return str(p)
+    if isinstance(target, (str, Path)) and str(target):
+        return str(target)
+    return None
+
+
+def get_session(target) -> RegistrySession:
+    """
+    Session for a registry object or a database path. Registries carry their own
+    session (bound to their connection); plain paths share one per database file.
+    """
+    if not isinstance(target, (str, Path)):
+        sess = getattr(target, "_registry_session", None)
+        if sess is None:
+            if hasattr(type(target), "con") or getattr(target, "con", None) is not None:
+                sess = RegistrySession(lambda: target.con, registry=target)
+            else:
+                path = _db_path(target)
+                if path is None or path == ":memory:":
+                    con = duckdb.connect(":memory:")
+                    sess = RegistrySession(lambda: con, registry=target)
+                else:
+                    sess = _path_session(path)
+            try:
+                target._registry_session = sess
+            except Exception:
+                pass
+        return sess
+    return _path_session(str(target))
+
+
+def _path_session(path: str) -> RegistrySession:
+    with _SESSIONS_LOCK:
+        sess = _SESSIONS.get(path)
+        if sess is None:
+            state: Dict[str, duckdb.DuckDBPyConnection] = {}
+
+            def connect() -> duckdb.DuckDBPyConnection:
+                if "con" not in state:
+                    state["con"] = duckdb.connect(path)
+                return state["con"]
+
+            sess = _SESSIONS[path] = RegistrySession(connect, db=path)
+        return sess
@@ -0,0 +1,334 @@
+"""
+Write-behind registration for parallel research workers.
+
+DuckDB allows one writer per database file, so sweep / walk-forward workers do not
+open the registry at all. They append runs to a spool directory (one small JSON file
+per batch, written atomically), and a single SpoolWriter owns the registry and turns
+pending batches into bulk register_many() inserts. Each drained batch gets an ack
+file with the assigned ids, which is what flush()/wait() block on.
+
+    # worker processes
+    spool = RegistrySpool("data/registry_spool")
+    t = spool.submit("h1", {"sharpe": 1.2}, ["sweep"])
+    spool.flush()                  # write buffered runs; spool.flush(wait=True) blocks for ids
+    rid = spool.wait(t)            # id in the registry once the writer committed it
+
+    # one writer (thread, or process: python -m alpha_factory.registry_spool --db ... --spool ...)
+    with AlphaRegistry("data/registry.duckdb") as reg:
+        SpoolWriter(reg, "data/registry_spool").run(stop_event)
+
+Delivery is at-least-once: a writer killed between the commit and the ack re-inserts
+that batch on restart. Within a running writer a committed batch is never inserted
+again; if its ack cannot be written, only the ack is retried on the next pass. A batch that cannot be parsed, or whose insert keeps failing,
+is moved to the quarantine directory and acked with {"error": ...}, so waiters raise
+SpoolError instead of blocking forever.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+from alpha_factory.alpha_registry import AlphaRegistry
+
+PENDING = "pending"
+ACKS = "acks"
+QUARANTINE = "quarantine"
+
+
+class SpoolError(RuntimeError):
+    """The writer gave up on a batch (see the spool's quarantine directory)."""
+
+
+def _atomic_write(dst: Path, payload: Any) -> None:
+    tmp = dst.with_suffix(".tmp." + os.urandom(4).hex())
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"), default=float)
+        os.replace(tmp, dst)
+    except Exception:
+        if tmp.exists():
+            tmp.unlink()
+        raise
+
+
+class RegistrySpool:
+    """Worker side: buffer runs, spill them as batch files, wait for the writer's acks."""
+
+    def __init__(self, spool_dir: str | Path, batch_size: int = 64):
+        self.root = Path(spool_dir)
+        self.batch_size = max(1, int(batch_size))
+        (self.root / PENDING).mkdir(parents=True, exist_ok=True)
+        (self.root / ACKS).mkdir(parents=True, exist_ok=True)
+        self._buf: List[Dict[str, Any]] = []
+        self._batch = self._new_batch()
+        self._unacked: List[str] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_batch() -> str:
+        # time-prefixed so the writer drains batches roughly in submission order
+        return f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def submit(
+        self,
+        config_hash: str,
+        metrics: Dict[str, Any],
+        tags: Iterable[str] | str | None = None,
+    ) -> str:
+        """Queue one run; returns a ticket for wait(). Spills a batch file every batch_size runs."""
+        if tags is not None and not isinstance(tags, str):
+            tags = [str(t) for t in tags]
+        with self._lock:
+            ticket = f"{self._batch}:{len(self._buf)}"
+            self._buf.append({"config_hash": str(config_hash), "metrics": metrics, "tags": tags})
+            if len(self._buf) >= self.batch_size:
+                self._spill()
+        return ticket
+
+    def _spill(self) -> None:
+        if not self._buf:
+            return
+        _atomic_write(self.root / PENDING / f"{self._batch}.json", self._buf)
+        self._unacked.append(self._batch)
+        self._buf = []
+        self._batch = self._new_batch()
+
+    def flush(self, wait: bool = False, timeout: float | None = None) -> None:
+        """Write buffered runs to the spool; with wait=True also block until all are committed."""
+        with self._lock:
+            self._spill()
+            batches = list(self._unacked)
+        if wait:
+            for b in batches:
+                self._wait_batch(b, timeout)
+            with self._lock:
+                self._unacked = [b for b in self._unacked if b not in batches]
+
+    def wait(self, ticket: str, timeout: float | None = None) -> int:
+        """Registry id for a ticket from submit(); flushes the ticket's batch if still buffered."""
+        batch, _, idx = ticket.rpartition(":")
+        with self._lock:
+            if batch == self._batch:
+                self._spill()
+        return self._wait_batch(batch, timeout)[int(idx)]
+
+    def acked(self, ticket: str) -> bool:
+        return (self.root / ACKS / f"{ticket.rpartition(':')[0]}.json").exists()
+
+    def _wait_batch(self, batch: str, timeout: float | None) -> List[int]:
+        ack = self.root / ACKS / f"{batch}.json"
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = 0.005
+        while not ack.exists():
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"registry spool batch {batch} not committed within {timeout}s")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+        with ack.open("r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if isinstance(payload, dict):
+            raise SpoolError(f"registry spool batch {batch} quarantined: {payload.get('error')}")
+        return [int(i) for i in payload]
+
+
+class SpoolWriter:
+    """Single writer: drains pending batch files into the registry with register_many()."""
+
+    def __init__(
+        self,
+        registry: AlphaRegistry,
+        spool_dir: str | Path,
+        max_rows: int = 50_000,
+        ack_ttl: float = 24 * 3600.0,
+        max_attempts: int = 3,
+    ):
+        self.registry = registry
+        self.root = Path(spool_dir)
+        self.max_rows = int(max_rows)
+        self.ack_ttl = float(ack_ttl)
+        self.max_attempts = max(1, int(max_attempts))
+        for sub in (PENDING, ACKS, QUARANTINE):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+        self.stats = {"batches": 0, "runs": 0, "inserts": 0, "quarantined": 0}
+        self._failures: Dict[str, int] = {}  # batch file name -> failed passes
+        self._unacked: Dict[str, tuple] = {}  # committed, ack pending: name -> (path, ids)
+
+    def pending(self) -> List[Path]:
+        return sorted((self.root / PENDING).glob("*.json"))
+
+    def drain(self) -> int:
+        """One pass over the spool: bulk-insert everything pending; returns runs written."""
+        total = 0
+        for p, ids in list(self._unacked.values()):
+            self._ack_one(p, ids)
+        files = [p for p in self.pending() if p.name not in self._unacked]
+        i = 0
+        while i < len(files):
+            chunk: List[tuple] = []
+            n_rows = 0
+            while i < len(files) and n_rows < self.max_rows:
+                p = files[i]
+                i += 1
+                try:
+                    with p.open("r", encoding="utf-8") as f:
+                        recs = json.load(f)
+                    if not isinstance(recs, list) or not all(isinstance(r, dict) for r in recs):
+                        raise ValueError("batch is not a list of run records")
+                except FileNotFoundError:
+                    continue  # taken by another writer
+                except (OSError, ValueError) as ex:
+                    # half-visible on a non-atomic filesystem: retried, up to max_attempts
+                    self._failed(p, ex)
+                    continue
+                chunk.append((p, recs))
+                n_rows += len(recs)
+            if not chunk:
+                continue
+            try:
+                ids = self._insert(chunk)
+            except Exception:
+                # isolate the batch that breaks the bulk insert; the others still go in
+                for p, recs in chunk:
+                    try:
+                        ids = self._insert([(p, recs)])
+                    except Exception as ex:
+                        self._failed(p, ex)
+                        continue
+                    total += self._ack([(p, recs)], ids)
+                continue
+            total += self._ack(chunk, ids)
+        return total
+
+    def _insert(self, chunk: List[tuple]) -> List[int]:
+        rows = [r for _, recs in chunk for r in recs]
+        ids = self.registry.register_many(pd.DataFrame.from_records(rows)) if rows else []
+        self.stats["inserts"] += 1
+        return ids
+
+    def _ack(self, chunk: List[tuple], ids: List[int]) -> int:
+        """Ack the batches of a committed insert; never raises, so nothing is re-inserted."""
+        pos = 0
+        for p, recs in chunk:
+            self._unacked[p.name] = (p, ids[pos : pos + len(recs)])
+            self._ack_one(*self._unacked[p.name])
+            pos += len(recs)
+        self.stats["batches"] += len(chunk)
+        self.stats["runs"] += pos
+        return pos
+
+    def _ack_one(self, p: Path, ids: List[int]) -> None:
+        # ack before removing the pending file: a crash in between only re-inserts
+        try:
+            _atomic_write(self.root / ACKS / p.name, ids)
+            p.unlink(missing_ok=True)
+        except OSError as ex:
+            print(f"WARN: registry spool ack {p.name} failed, retrying: {ex!r}", file=sys.stderr)
+            return
+        self._unacked.pop(p.name, None)
+        self._failures.pop(p.name, None)
+
+    def _failed(self, p: Path, ex: BaseException) -> None:
+        n = self._failures[p.name] = self._failures.get(p.name, 0) + 1
+        if n < self.max_attempts:
+            return
+        self.quarantine(p, f"{type(ex).__name__}: {ex}")
+
+    def quarantine(self, p: Path, error: str) -> None:
+        """Move a batch file aside and ack it with the error, releasing its waiters."""
+        self._failures.pop(p.name, None)
+        try:
+            os.replace(p, self.root / QUARANTINE / p.name)
+        except FileNotFoundError:
+            return
+        _atomic_write(self.root / ACKS / p.name, {"error": error})
+        self.stats["quarantined"] += 1
+        print(f"WARN: registry spool batch {p.name} quarantined: {error}", file=sys.stderr)
+
+    def prune_acks(self) -> int:
+        """Delete ack files older than ack_ttl (workers that never waited)."""
+        cutoff = time.time() - self.ack_ttl
+        n = 0
+        for p in (self.root / ACKS).glob("*.json"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+                    n += 1
+            except OSError:
+                pass
+        return n
+
+    def _pass(self, fn) -> None:
+        try:
+            fn()
+        except Exception as ex:  # e.g. registry locked/unavailable: keep the loop alive
+            print(f"WARN: registry spool {fn.__name__} failed: {ex!r}", file=sys.stderr)
+
+    def run(self, stop: Optional[threading.Event] = None, interval: float = 0.5) -> None:
+        """Drain every `interval` seconds until `stop` is set; one final drain on exit."""
+        stop = stop or threading.Event()
+        last_prune = 0.0
+        while not stop.is_set():
+            self._pass(self.drain)
+            if time.monotonic() - last_prune > 600:
+                self._pass(self.prune_acks)
+                last_prune = time.monotonic()
+            stop.wait(interval)
+        self._pass(self.drain)
+
+    def start(self, interval: float = 0.5) -> "WriterThread":
+        """Run in a daemon thread; stop() it (after a last drain) and join."""
+        t = WriterThread(self, interval)
+        t.start()
+        return t
+
+
+class WriterThread(threading.Thread):
+    """Daemon thread running SpoolWriter.run(); stop() sets the event and joins."""
+
+    def __init__(self, writer: SpoolWriter, interval: float):
+        self.stop_event = threading.Event()
+        super().__init__(
+            target=writer.run,
+            args=(self.stop_event, interval),
+            name="registry-spool-writer",
+            daemon=True,
+        )
+
+    def stop(self, timeout: float | None = None) -> bool:
+        """Signal the writer and wait for its final drain; True once the thread exited."""
+        self.stop_event.set()
+        self.join(timeout)
+        return not self.is_alive()
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser("alpha-registry-spool")
+    p.add_argument("--db", default="data/registry.duckdb")
+    p.add_argument("--spool", default="data/registry_spool")
+    p.add_argument("--interval", type=float, default=0.5)
+    p.add_argument("--once", action="store_true", help="drain once and exit")
+    a = p.parse_args(argv)
+    with AlphaRegistry(a.db) as reg:
+        writer = SpoolWriter(reg, a.spool)
+        if a.once:
+            print(writer.drain())
+            return 0
+        try:
+            writer.run(interval=a.interval)
+        except KeyboardInterrupt:
+            writer.drain()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,77 +1,21 @@
 from __future__ import annotations
 from pathlib import Path
-import duckdb
 import pandas as pd
 
+from alpha_factory.registry_session import get_session
+
 # Ensure overrides are active (rank/get_summary/compare/lineage)
 import alpha_factory.alpha_registry_ext_overrides_024  # noqa: F401
 
 
 def _con_for(reg):
-    # same pattern used in overrides
-    if getattr(reg, "con", None) is not None:
-        return reg.con
-    for attr in ("db_path", "path", "database"):
-        p = getattr(reg, attr, None)
-        if isinstance(p, str) and p:
-            return duckdb.connect(p)
-    return duckdb.connect(":memory:")
+    # Shared per-database session (same connection the overrides use)
+    return get_session(reg).con
 
 
 def refresh_runs_view(reg) -> None:
-    # Idempotent: create a 'runs' view from whatever table exists (alphas baseline)
-    con = _con_for(reg)
-    # Prefer existing view from overrides; create a compatible one if missing
-    try:
-        con.execute("SELECT 1 FROM runs LIMIT 1")
-        return
-    except Exception:
-        pass
-    # Fallback view built off 'alphas' if present
-    try:
-        con.execute("SELECT 1 FROM alphas LIMIT 1")
-    except Exception:
-        # Empty placeholder view
-        con.execute(
-            """
-        CREATE OR REPLACE VIEW runs AS
-        SELECT CAST(NULL AS VARCHAR) AS alpha_id,
-               CAST(NULL AS VARCHAR) AS run_id,
-               CAST(NULL AS TIMESTAMP) AS timestamp,
-               CAST(NULL AS VARCHAR) AS tags,
-               CAST(NULL AS JSON) AS metrics,
-               CAST(NULL AS VARCHAR) AS config_hash
-        WHERE 1=0
-        """
-        )
-        return
-
-    # Detect a timestamp-like column
-    cols = {str(r[1]).lower() for r in con.execute("PRAGMA table_info(alphas)").fetchall()}
-    if "timestamp" in cols:
-        ts_expr = "timestamp"
-    elif "ts" in cols:
-        ts_expr = "ts"
-    elif "created_at" in cols:
-        ts_expr = "created_at"
-    elif "time" in cols:
-        ts_expr = "time"
-    else:
-        ts_expr = "NULL"
-
-    con.execute(
-        f"""
-    CREATE OR REPLACE VIEW runs AS
-    SELECT
-      CAST(config_hash AS VARCHAR) AS alpha_id,
-      CAST(id AS VARCHAR)          AS run_id,
-      COALESCE({ts_expr}, CURRENT_TIMESTAMP) AS timestamp,
-      tags,
-      CAST(metrics AS JSON)        AS metrics,
-      config_hash
-    FROM alphas
-    """
-    )
+    # Idempotent and once per database: create a 'runs' view over alphas if missing
+    get_session(reg).ensure_runs_view()
 
 
 def alerts(
@@ -88,7 +32,7 @@ def alerts(
 
     # Use rank() with a where_sql guard (DuckDB-safe, params via overrides)
     filters = {
-        "where_sql": f"TRY_CAST(json_extract(metrics, '$.' || '{metric}') AS DOUBLE) >= {float(min_value)}"
+        "where_sql": f"value >= {float(min_value)}"
     }
     if tag:
         filters["tag"] = tag
@@ -137,6 +81,9 @@ def import_csv_to_alphas(reg, csv_path: str) -> int:
     )
     n = con.execute("SELECT COUNT(*) FROM _csv").fetchone()[0]
     con.execute("DROP TABLE _csv")
+    # Rows inserted directly bypass register(); index their metrics and tags now
+    if hasattr(reg, "sync_index"):
+        reg.sync_index()
     return int(n)
 
 
@@ -23,11 +23,30 @@ def _pairs_to_corr(pairs) -> Dict[Tuple[str, str], float]:
     return out
 
 
+def _load_corr(corr_path: str | Path, cov_state: str | Path = ""):
+    """
+    Correlations for allocate(): the EWMA snapshot's pairs if given, else the --corr list.
+    Both go through _pairs_to_corr, so a snapshot penalizes exactly like the same pairs
+    written to a --corr file.
+    """
+    if cov_state:
+        from analytics.ewma_cov import EWMACovariance
+
+        pairs = EWMACovariance.load(cov_state).corr_pairs()
+        return _pairs_to_corr((a, b, rho) for (a, b), rho in pairs.items())
+    return _pairs_to_corr(_load_json(corr_path))
+
+
 def main(argv: list[str] | None = None) -> int:
     ap = argparse.ArgumentParser("meta-allocator")
     ap.add_argument("--metrics", default="tools/_demo_metrics.json")
     ap.add_argument("--prev", default="tools/_demo_prev.json")
     ap.add_argument("--corr", default="tools/_demo_corr.json")
+    ap.add_argument(
+        "--cov-state",
+        default="",
+        help="EWMACovariance snapshot (.npz); its live correlations replace --corr",
+    )
     ap.add_argument("--config", default="configs/meta_allocator.json")
     ap.add_argument("--outcsv", default="")
     args = ap.parse_args(argv)
@@ -47,8 +66,7 @@ def main(argv: list[str] | None = None) -> int:
 
     metrics: Mapping[str, Mapping[str, float]] = _load_json(args.metrics)
     prev: Mapping[str, float] = _load_json(args.prev)
-    pairs = _load_json(args.corr)
-    corr = _pairs_to_corr(pairs)
+    corr = _load_corr(args.corr, args.cov_state)
 
     alloc = MetaAllocator(cfg)
     w = alloc.allocate(metrics, prev_weights=prev, corr=corr)
@@ -0,0 +1,221 @@
+# src/analytics/ewma_cov.py
+"""
+Streaming EWMA mean / covariance for sleeve or asset returns.
+
+RiskMetrics-style recursion, one O(k^2) rank-1 update per bar (k = number of series):
+
+    mean_t = lam * mean_{t-1} + (1 - lam) * x_t
+    cov_t  = lam * (cov_{t-1} + (1 - lam) * d d^T),   d = x_t - mean_{t-1}
+
+Missing values (NaN) leave that series' mean/cov untouched for the bar. State is a
+few arrays, so it snapshots to a .npz and resumes exactly. Shrinkage (identity,
+diagonal or constant-correlation target) is applied on read, with the OAS intensity
+from the EWMA effective sample size when none is given.
+
+    est = EWMACovariance(["TF", "MR", "VOL"], halflife=60)
+    est.update_many(sleeve_returns)        # or est.update(row) per bar
+    est.save("artifacts/risk/sleeve_cov.npz")
+    corr = EWMACovariance.load("artifacts/risk/sleeve_cov.npz").corr()
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class EWMACovariance:
+    def __init__(
+        self,
+        columns: Iterable[str],
+        decay: Optional[float] = None,
+        halflife: Optional[float] = None,
+        min_periods: int = 2,
+    ):
+        if decay is None:
+            decay = 0.5 ** (1.0 / float(halflife)) if halflife else 0.94
+        if not 0.0 < decay < 1.0:
+            raise ValueError("decay must be in (0, 1)")
+        self.columns = [str(c) for c in columns]
+        self.decay = float(decay)
+        self.min_periods = int(min_periods)
+        k = len(self.columns)
+        self.mean = np.zeros(k)
+        self.cov_ = np.zeros((k, k))
+        self.nobs = np.zeros(k, dtype=np.int64)
+        self.t = 0
+        # weight sums for the effective sample size (sum w)^2 / sum w^2
+        self._sw = 0.0
+        self._sw2 = 0.0
+
+    @classmethod
+    def from_frame(cls, returns: pd.DataFrame, **kw) -> "EWMACovariance":
+        est = cls(returns.columns, **kw)
+        est.update_many(returns)
+        return est
+
+    # ---------- updates ----------
+    def update(self, x) -> "EWMACovariance":
+        """Consume one bar: Series/mapping by column name, or an array in column order."""
+        if isinstance(x, (pd.Series, Mapping)):
+            x = pd.Series(x, dtype=float).reindex(self.columns).to_numpy()
+        else:
+            x = np.asarray(x, dtype=float).reshape(-1)
+        if x.shape[0] != len(self.columns):
+            raise ValueError(f"expected {len(self.columns)} values, got {x.shape[0]}")
+        lam = self.decay
+        obs = ~np.isnan(x)
+        first = obs & (self.nobs == 0)
+        if first.any():
+            self.mean[first] = x[first]
+        if obs.all():
+            d = x - self.mean
+            self.mean += (1.0 - lam) * d
+            self.cov_ += (1.0 - lam) * np.outer(d, d)
+            self.cov_ *= lam
+        elif obs.any():
+            ix = np.flatnonzero(obs)
+            d = x[ix] - self.mean[ix]
+            self.mean[ix] += (1.0 - lam) * d
+            sub = np.ix_(ix, ix)
+            self.cov_[sub] = lam * (self.cov_[sub] + (1.0 - lam) * np.outer(d, d))
+        self.nobs += obs
+        self.t += 1
+        self._sw = lam * self._sw + 1.0
+        self._sw2 = lam * lam * self._sw2 + 1.0
+        return self
+
+    def update_many(self, returns: pd.DataFrame | np.ndarray) -> "EWMACovariance":
+        if isinstance(returns, pd.DataFrame):
+            returns = returns.reindex(columns=self.columns).to_numpy(dtype=float)
+        for row in np.asarray(returns, dtype=float):
+            self.update(row)
+        return self
+
+    # ---------- reads ----------
+    @property
+    def n_eff(self) -> float:
+        """Effective number of observations behind the EWMA weights."""
+        return self._sw**2 / self._sw2 if self._sw2 > 0 else 0.0
+
+    def _ready(self) -> np.ndarray:
+        return self.nobs >= self.min_periods
+
+    def _frame(self, m: np.ndarray) -> pd.DataFrame:
+        ok = self._ready()
+        m = m.copy()
+        m[~ok, :] = np.nan
+        m[:, ~ok] = np.nan
+        return pd.DataFrame(m, index=self.columns, columns=self.columns)
+
+    def cov(self) -> pd.DataFrame:
+        return self._frame(self.cov_)
+
+    def std(self) -> pd.Series:
+        s = np.sqrt(np.clip(np.diag(self.cov_), 0.0, None))
+        return pd.Series(np.where(self._ready(), s, np.nan), index=self.columns)
+
+    @staticmethod
+    def _to_corr(c: np.ndarray) -> np.ndarray:
+        s = np.sqrt(np.clip(np.diag(c), 0.0, None))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = c / np.outer(s, s)
+        r = np.clip(r, -1.0, 1.0)
+        np.fill_diagonal(r, np.where(s > 0, 1.0, np.nan))
+        return r
+
+    def corr(self) -> pd.DataFrame:
+        return self._frame(self._to_corr(self.cov_))
+
+    def corr_pairs(self, min_abs: float = 0.0) -> Dict[Tuple[str, str], float]:
+        """Upper-triangle {(a, b): rho} in the pair format MetaAllocator.allocate() takes."""
+        r = self.corr().to_numpy()
+        out: Dict[Tuple[str, str], float] = {}
+        for i, j in zip(*np.triu_indices(len(self.columns), k=1)):
+            rho = r[i, j]
+            if np.isfinite(rho) and abs(rho) >= min_abs:
+                out[(self.columns[i], self.columns[j])] = float(rho)
+        return out
+
+    # ---------- shrinkage ----------
+    def oas_intensity(self) -> float:
+        """Oracle Approximating Shrinkage intensity toward the scaled identity, n = n_eff."""
+        S = self.cov_[np.ix_(self._ready(), self._ready())]
+        p = S.shape[0]
+        if p == 0:
+            return 1.0
+        mu = np.trace(S) / p
+        alpha = np.mean(S**2)
+        num = alpha + mu**2
+        den = (self.n_eff + 1.0) * (alpha - mu**2 / p)
+        return 1.0 if den <= 0 else float(min(num / den, 1.0))
+
+    def shrunk_cov(
+        self, target: str = "identity", intensity: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        (1 - a) * S + a * T with T the scaled identity ("identity"), diag(S) ("diagonal") or
+        the constant-correlation matrix ("constant_corr"). a defaults to oas_intensity().
+        """
+        S = self.cov_
+        a = self.oas_intensity() if intensity is None else float(np.clip(intensity, 0.0, 1.0))
+        var = np.diag(S)
+        ok = self._ready()
+        if target == "identity":
+            T = np.eye(len(var)) * (var[ok].mean() if ok.any() else 0.0)
+        elif target == "diagonal":
+            T = np.diag(var)
+        elif target == "constant_corr":
+            r = self._to_corr(S)[np.ix_(ok, ok)]
+            iu = np.triu_indices(r.shape[0], k=1)
+            rbar = float(np.nanmean(r[iu])) if len(iu[0]) else 0.0
+            s = np.sqrt(np.clip(var, 0.0, None))
+            T = rbar * np.outer(s, s)
+            np.fill_diagonal(T, var)
+        else:
+            raise ValueError(f"unknown shrinkage target '{target}'")
+        return self._frame((1.0 - a) * S + a * T)
+
+    def shrunk_corr(
+        self, target: str = "identity", intensity: Optional[float] = None
+    ) -> pd.DataFrame:
+        c = self.shrunk_cov(target, intensity).to_numpy()
+        return self._frame(self._to_corr(np.nan_to_num(c)))
+
+    # ---------- snapshots ----------
+    def save(self, path: str | Path) -> Path:
+        """Atomic .npz snapshot; load() resumes with identical state."""
+        dst = Path(path)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(dst.name + ".tmp." + os.urandom(4).hex())
+        try:
+            with tmp.open("wb") as f:
+                np.savez(
+                    f,
+                    columns=np.array(self.columns, dtype=str),
+                    mean=self.mean,
+                    cov=self.cov_,
+                    nobs=self.nobs,
+                    scalars=np.array([self.decay, self.min_periods, self.t, self._sw, self._sw2]),
+                )
+            os.replace(tmp, dst)
+        except Exception:
+            if tmp.exists():
+                tmp.unlink()
+            raise
+        return dst
+
+    @classmethod
+    def load(cls, path: str | Path) -> "EWMACovariance":
+        with np.load(Path(path), allow_pickle=False) as z:
+            decay, min_periods, t, sw, sw2 = z["scalars"].tolist()
+            est = cls(z["columns"].tolist(), decay=decay, min_periods=int(min_periods))
+            est.mean = z["mean"].astype(float)
+            est.cov_ = z["cov"].astype(float)
+            est.nobs = z["nobs"].astype(np.int64)
+        est.t, est._sw, est._sw2 = int(t), float(sw), float(sw2)
+        return est
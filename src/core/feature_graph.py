@@ -0,0 +1,225 @@
+"""
+Memoized feature computation graph.
+
+Every node is identified by (symbol, timeframe, function, params, upstream fingerprint).
+Source nodes fingerprint the raw data itself; derived nodes fingerprint their inputs'
+digests, so identical requests from different callers (research loop, factors, metrics)
+resolve to the same node and are computed once per session. Results are cached in
+memory (LRU) and, when cache_dir is given, on disk across sessions.
+
+    g = FeatureGraph(cache_dir="data/feature_cache")
+    close = g.source(df["close"], symbol="EURUSD", timeframe="H1")
+    ema20 = g.compute("ema", close, span=20)
+    rsi14 = g.compute("rsi", close, n=14)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# ---------- primitives ----------
+PRIMITIVES: Dict[str, Callable[..., pd.Series]] = {}
+
+
+def primitive(name: str):
+    """Register fn(*series, **params) -> Series as a graph primitive."""
+
+    def deco(fn):
+        PRIMITIVES[name] = fn
+        return fn
+
+    return deco
+
+
+@primitive("logret")
+def _logret(s: pd.Series) -> pd.Series:
+    return np.log(s).diff()
+
+
+@primitive("pct_change")
+def _pct_change(s: pd.Series) -> pd.Series:
+    return s.pct_change()
+
+
+@primitive("diff")
+def _diff(s: pd.Series, periods: int = 1) -> pd.Series:
+    return s.diff(periods)
+
+
+@primitive("sma")
+def _sma(s: pd.Series, n: int, min_periods: Optional[int] = None) -> pd.Series:
+    return s.rolling(n, min_periods=n if min_periods is None else min_periods).mean()
+
+
+@primitive("rolling_std")
+def _rolling_std(s: pd.Series, n: int, min_periods: Optional[int] = None) -> pd.Series:
+    return s.rolling(n, min_periods=min_periods).std()
+
+
+@primitive("ema")
+def _ema(s: pd.Series, span: int) -> pd.Series:
+    return s.ewm(span=span, adjust=False).mean()
+
+
+@primitive("rsi")
+def _rsi(s: pd.Series, n: int = 14, min_periods: int = 0) -> pd.Series:
+    # Wilder RSI; min_periods=n reproduces the warm-up NaNs of the factor variants
+    delta = s.diff()
+    up = delta.clip(lower=0.0)
+    dn = -delta.clip(upper=0.0)
+    roll_up = up.ewm(alpha=1 / n, min_periods=min_periods, adjust=False).mean()
+    roll_dn = dn.ewm(alpha=1 / n, min_periods=min_periods, adjust=False).mean()
+    rs = roll_up / roll_dn.replace(0, np.nan)
+    return 100 - (100 / (1 + rs))
+
+
+# ---------- fingerprints ----------
+def fingerprint(obj) -> str:
+    """Content hash of a Series/DataFrame (values + index + names/dtypes)."""
+    h = hashlib.sha1()
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        if isinstance(obj, pd.Series):
+            h.update(repr((obj.name, str(obj.dtype))).encode("utf-8"))
+        else:
+            h.update(repr([(str(c), str(t)) for c, t in obj.dtypes.items()]).encode("utf-8"))
+    else:
+        h.update(pickle.dumps(obj, protocol=4))
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class Node:
+    symbol: str
+    timeframe: str
+    fn: str
+    params: tuple = ()
+    upstream: tuple = ()
+    digest: str = field(init=False, compare=False)
+
+    def __post_init__(self):
+        payload = json.dumps(
+            [self.symbol, self.timeframe, self.fn, list(self.params), list(self.upstream)],
+            sort_keys=True,
+            default=str,
+        )
+        object.__setattr__(self, "digest", hashlib.sha1(payload.encode("utf-8")).hexdigest())
+
+
+# ---------- graph ----------
+class FeatureGraph:
+    """Node factory + two-level (memory LRU, optional disk) result cache."""
+
+    def __init__(self, cache_dir: Optional[str | os.PathLike] = None, max_items: int = 4096):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_items = int(max_items)
+        self._mem: "OrderedDict[str, pd.Series]" = OrderedDict()
+        self._sources: Dict[str, pd.Series] = {}
+        self._nodes: Dict[str, Node] = {}
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    def source(
+        self, data: pd.Series, symbol: str = "", timeframe: str = "", field: str = ""
+    ) -> Node:
+        """Register raw input data; its identity is the content fingerprint."""
+        node = Node(symbol, timeframe, "source", (("field", field),), (fingerprint(data),))
+        self._sources[node.digest] = data
+        return node
+
+    def node(self, fn: str, *inputs: Node, **params) -> Node:
+        if fn not in PRIMITIVES:
+            raise KeyError(f"unknown feature primitive '{fn}'")
+        if not inputs:
+            raise ValueError("node() needs at least one upstream node")
+        first = inputs[0]
+        node = Node(
+            first.symbol,
+            first.timeframe,
+            fn,
+            tuple(sorted(params.items())),
+            tuple(n.digest for n in inputs),
+        )
+        self._nodes.setdefault(node.digest, node)
+        return node
+
+    def get(self, node: Node) -> pd.Series:
+        key = node.digest
+        if key in self._sources:
+            return self._sources[key]
+        hit = self._mem.get(key)
+        if hit is not None:
+            self._mem.move_to_end(key)
+            self.stats["hits"] += 1
+            return hit
+        val = self._disk_get(key)
+        if val is not None:
+            self.stats["disk_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            val = self._evaluate(node)
+            self._disk_put(key, val)
+        self._remember(key, val)
+        return val
+
+    def compute(self, fn: str, *inputs: Node, **params) -> pd.Series:
+        """Shorthand for get(node(fn, *inputs, **params))."""
+        return self.get(self.node(fn, *inputs, **params))
+
+    def clear(self) -> None:
+        self._mem.clear()
+        self._sources.clear()
+        self._nodes.clear()
+
+    # --------- internals ---------
+    def _evaluate(self, node: Node) -> pd.Series:
+        args = [self._resolve(d) for d in node.upstream]
+        return PRIMITIVES[node.fn](*args, **dict(node.params))
+
+    def _resolve(self, digest: str) -> pd.Series:
+        if digest in self._sources:
+            return self._sources[digest]
+        node = self._nodes.get(digest)
+        if node is None:
+            raise KeyError(f"upstream node {digest[:10]} is unknown to this graph")
+        return self.get(node)
+
+    def _remember(self, key: str, val: pd.Series) -> None:
+        self._mem[key] = val
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[pd.Series]:
+        if self.cache_dir is None:
+            return None
+        p = self.cache_dir / f"{key}.pkl"
+        if not p.exists():
+            return None
+        with p.open("rb") as f:
+            return pickle.load(f)
+
+    def _disk_put(self, key: str, val: pd.Series) -> None:
+        if self.cache_dir is None:
+            return
+        dst = self.cache_dir / f"{key}.pkl"
+        tmp = dst.with_suffix(".tmp." + os.urandom(4).hex())
+        try:
+            with tmp.open("wb") as f:
+                pickle.dump(val, f, protocol=4)
+            os.replace(tmp, dst)
+        except Exception:
+            if tmp.exists():
+                tmp.unlink()
+            raise
@@ -2,8 +2,13 @@ import pandas as pd
 import numpy as np
 
 
-def realized_vol(close: pd.Series, lookback=20, annualize_on="1d") -> pd.Series:
-    r = close.pct_change().rolling(lookback).std()
+def realized_vol(close: pd.Series, lookback=20, annualize_on="1d", graph=None) -> pd.Series:
+    if graph is None:
+        r = close.pct_change().rolling(lookback).std()
+    else:
+        # shared FeatureGraph: pct_change/rolling_std nodes are reused across callers
+        rets = graph.node("pct_change", graph.source(close, field="close"))
+        r = graph.compute("rolling_std", rets, n=lookback)
     ann = {
         "1d": np.sqrt(252),
         "1h": np.sqrt(252 * 24),
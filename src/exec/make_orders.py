@@ -12,8 +12,10 @@ Input:
       fallback defaults:
         px_mult = 1
         contract_size = 100_000 for FX (6-letter pairs), else 1
-  - prices_folder: folder with daily price CSVs named <symbol>.csv
-      each file should have a 'close' (or 'px') column; last row used
+  - prices_folder: folder with daily prices named <symbol>.csv (or <symbol>.parquet)
+      each file should have a 'close' (or 'px') column; last row used.
+      Only the tail is read: CSVs are scanned backwards from EOF, parquet files
+      read just their final row group, so cost does not grow with history length.
   - nav: account NAV in USD
   - gross_cap: informational only (we do NOT rescale positions here).
   - max_price_age_days: warn if price is stale
@@ -31,11 +33,14 @@ Notes:
 from __future__ import annotations
 
 import argparse
+import csv
+import os
 import sys
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
+import numpy as np
 import pandas as pd
 
 # Optional MT5 price sanity (if terminal is running)
@@ -78,41 +83,117 @@ def _read_contracts(path: Optional[Path]) -> pd.DataFrame:
     return c[["symbol", "px_mult", "contract_size"]]
 
 
-def _infer_contract_size(symbol: str, contract_row: Optional[pd.Series]) -> float:
-    if contract_row is not None and pd.notna(contract_row.get("contract_size", pd.NA)):
-        try:
-            return float(contract_row["contract_size"])
-        except Exception:
-            pass
-    # heuristic defaults
-    sym = symbol.upper()
-    if len(sym) == 6 and sym[:3].isalpha() and sym[3:].isalpha():
-        return 100_000.0  # FX 1 lot = 100k base
-    if sym.startswith("XA"):  # XAUUSD, XAGUSD etc.
-        return 100.0
-    return 1.0
-
-
-def _load_last_price(prices_folder: Path, symbol: str) -> tuple[float, Optional[datetime]]:
-    f = prices_folder / f"{symbol}.csv"
-    if not f.exists():
-        print(f"ERR: price file missing for {symbol}: {f}", file=sys.stderr)
-        sys.exit(1)
-    df = pd.read_csv(f)
-    df.columns = [c.lower() for c in df.columns]
-    price_col = "close" if "close" in df.columns else ("px" if "px" in df.columns else None)
+def _infer_contract_sizes(symbols: pd.Series, contract_size: pd.Series) -> np.ndarray:
+    """contract_size from contracts.csv when given, else heuristic defaults per symbol."""
+    sym = symbols.astype(str).str.upper()
+    # FX 1 lot = 100k base; XAUUSD, XAGUSD etc. = 100
+    fx = (sym.str.len() == 6) & sym.str[:3].str.isalpha() & sym.str[3:].str.isalpha()
+    default = np.where(fx, 100_000.0, np.where(sym.str.startswith("XA"), 100.0, 1.0))
+    given = pd.to_numeric(contract_size, errors="coerce").to_numpy(dtype=float)
+    return np.where(np.isnan(given), default, given)
+
+
+def _die(msg: str) -> None:
+    print(f"ERR: {msg}", file=sys.stderr)
+    sys.exit(1)
+
+
+def _csv_header_and_tail(f: Path, block: int = 8192) -> tuple[list[str], Optional[list[str]]]:
+    """Header row and last non-empty row of a CSV, reading backwards from EOF."""
+    with f.open("rb") as fh:
+        header = fh.readline().decode("utf-8-sig")
+        start = fh.tell()
+        pos = fh.seek(0, os.SEEK_END)
+        buf = b""
+        while pos > start:
+            step = min(block, pos - start)
+            pos -= step
+            fh.seek(pos)
+            buf = fh.read(step) + buf
+            lines = buf.splitlines()
+            # the first line in buf may be cut off until the scan reaches the data start
+            for line in reversed(lines if pos == start else lines[1:]):
+                if line.strip():
+                    return next(csv.reader([header])), next(csv.reader([line.decode("utf-8")]))
+    return (next(csv.reader([header])) if header.strip() else []), None
+
+
+def _last_row_csv(f: Path) -> tuple[float, object]:
+    cols, last = _csv_header_and_tail(f)
+    cols = [c.strip().lower() for c in cols]
+    price_col = "close" if "close" in cols else ("px" if "px" in cols else None)
     if not price_col:
-        print(f"ERR: {f} must contain 'close' or 'px' column", file=sys.stderr)
-        sys.exit(1)
-    last = df.iloc[-1]
-    px = float(last[price_col])
-    ts = None
-    if "ts" in df.columns:
-        try:
-            ts = pd.to_datetime(last["ts"], utc=True, errors="coerce").to_pydatetime()
-        except Exception:
-            ts = None
-    return px, ts
+        _die(f"{f} must contain 'close' or 'px' column")
+    if last is None:
+        _die(f"{f} has no price rows")
+    row = dict(zip(cols, last))
+    return float(row[price_col]), row.get("ts")
+
+
+def _last_row_parquet(f: Path) -> tuple[float, object]:
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(f)
+    names = {n.lower(): n for n in pf.schema_arrow.names}
+    price_col = names.get("close") or names.get("px")
+    if not price_col:
+        _die(f"{f} must contain 'close' or 'px' column")
+    for i in range(pf.num_row_groups - 1, -1, -1):
+        cols = [price_col] + ([names["ts"]] if "ts" in names else [])
+        df = pf.read_row_group(i, columns=cols, use_pandas_metadata=True).to_pandas()
+        if len(df):
+            # a stored pandas index named ts comes back as the index, not a column
+            ts = df[names["ts"]].iloc[-1] if names.get("ts") in df.columns else None
+            if ts is None and isinstance(df.index, pd.DatetimeIndex):
+                ts = df.index[-1]
+            return float(df[price_col].iloc[-1]), ts
+    _die(f"{f} has no price rows")
+
+
+def _ts_utc(value: object) -> pd.Timestamp:
+    """One price timestamp as UTC (NaT if missing/unparseable), format inferred per value."""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return pd.NaT
+    return pd.to_datetime(value, utc=True, errors="coerce")
+
+
+class LastPriceProvider:
+    """
+    Last close/px (and ts) per symbol from a prices folder, cached for the run.
+    snapshot() returns the whole universe as one DataFrame [symbol, px_raw, ts].
+    """
+
+    def __init__(self, prices_folder: Path):
+        self.prices_folder = Path(prices_folder)
+        self._cache: Dict[str, tuple[float, object]] = {}
+
+    def _path(self, symbol: str) -> Path:
+        for ext in (".csv", ".parquet"):
+            f = self.prices_folder / f"{symbol}{ext}"
+            if f.exists():
+                return f
+        _die(f"price file missing for {symbol}: {self.prices_folder / f'{symbol}.csv'}")
+
+    def last(self, symbol: str) -> tuple[float, object]:
+        hit = self._cache.get(symbol)
+        if hit is None:
+            f = self._path(symbol)
+            px, ts = _last_row_parquet(f) if f.suffix == ".parquet" else _last_row_csv(f)
+            # parsed per file: files in one folder may use different timestamp formats
+            hit = self._cache[symbol] = (px, _ts_utc(ts))
+        return hit
+
+    def snapshot(self, symbols: Iterable[str]) -> pd.DataFrame:
+        syms = list(dict.fromkeys(str(s) for s in symbols))
+        rows = [self.last(s) for s in syms]
+        return pd.DataFrame(
+            {
+                # explicit dtypes: an empty universe (flat book) must still merge on symbol
+                "symbol": pd.Series(syms, dtype=object),
+                "px_raw": pd.Series([r[0] for r in rows], dtype=float),
+                "ts": pd.DatetimeIndex([r[1] for r in rows], tz="UTC"),
+            }
+        )
 
 
 def _try_mt5_tick(symbol: str) -> Optional[float]:
@@ -144,6 +225,7 @@ def build_orders(
     max_price_age_days: int,
     max_dev_bps: int,
     skip_stale: bool,
+    prices: Optional[LastPriceProvider] = None,
 ) -> pd.DataFrame:
 
     pos = _read_positions(positions_csv)
@@ -153,53 +235,56 @@ def build_orders(
     merged = pos.merge(contracts, on="symbol", how="left", suffixes=("", "_c"))
     merged["px_mult"] = pd.to_numeric(merged["px_mult"], errors="coerce").fillna(1.0)
 
-    rows = []
+    merged["symbol"] = merged["symbol"].astype(str)
+    snap = (prices or LastPriceProvider(prices_folder)).snapshot(merged["symbol"])
+    merged = merged.merge(snap, on="symbol", how="left")
+
+    # staleness on the whole snapshot at once
     now_utc = datetime.now(timezone.utc)
-    stale_syms = []
-
-    for _, r in merged.iterrows():
-        sym = str(r["symbol"])
-        px_raw, ts = _load_last_price(prices_folder, sym)
-        if ts is not None:
-            age_days = (now_utc - ts).days
-            if age_days > max_price_age_days:
-                msg = f"{sym} price is stale by {age_days}d (> {max_price_age_days})"
-                if skip_stale:
-                    print(f"SKIP: {msg}")
-                    continue
-                else:
-                    stale_syms.append(msg)
-
-        px = px_raw * float(r["px_mult"])
-        cs = _infer_contract_size(sym, r)
-        target = float(r["target_position"])
-        notional = target * float(nav)
-        lots = 0.0 if px <= 0 or cs <= 0 else (notional / (cs * px))
-
-        rows.append(
-            {
-                "symbol": sym,
-                "target_position": target,
-                "px": round(px, 6),
-                "notional_usd": notional,
-                "lots": lots,
-            }
-        )
+    age_days = (pd.Timestamp(now_utc) - merged["ts"]).dt.days
+    stale = (age_days > max_price_age_days).fillna(False).to_numpy(dtype=bool)
+    stale_syms = [
+        f"{sym} price is stale by {int(age)}d (> {max_price_age_days})"
+        for sym, age in zip(merged["symbol"][stale], age_days[stale])
+    ]
+    if skip_stale:
+        for msg in stale_syms:
+            print(f"SKIP: {msg}")
+        stale_syms = []
+        merged = merged.loc[~stale].reset_index(drop=True)
+
+    px = merged["px_raw"].to_numpy(dtype=float) * merged["px_mult"].to_numpy(dtype=float)
+    cs = _infer_contract_sizes(merged["symbol"], merged["contract_size"])
+    target = merged["target_position"].astype(float).to_numpy()
+    notional = target * float(nav)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lots = np.where((px <= 0) | (cs <= 0), 0.0, notional / (cs * px))
+
+    out_df = pd.DataFrame(
+        {
+            "symbol": merged["symbol"].to_numpy(),
+            "target_position": target,
+            "px": np.round(px, 6),
+            "notional_usd": notional,
+            "lots": lots,
+        }
+    )
 
-        # optional MT5 sanity
-        mt5_px = _try_mt5_tick(sym)
-        if mt5_px is not None and px > 0:
-            dev_bps = abs((mt5_px / px) - 1.0) * 10_000
-            if dev_bps > max_dev_bps:
-                print("MT5 price sanity WARN (bps deviation > %.1f):" % max_dev_bps)
-                print("symbol dev_bps px_ref_scaled px_mt5")
-                print(f"{sym:6s} {dev_bps:8.2f} {px:12.6f} {mt5_px:12.6f}")
+    # optional MT5 sanity (live ticks are per-symbol calls; skipped without a terminal)
+    if _HAVE_MT5:
+        for sym, p in zip(out_df["symbol"], px):
+            mt5_px = _try_mt5_tick(sym)
+            if mt5_px is not None and p > 0:
+                dev_bps = abs((mt5_px / p) - 1.0) * 10_000
+                if dev_bps > max_dev_bps:
+                    print("MT5 price sanity WARN (bps deviation > %.1f):" % max_dev_bps)
+                    print("symbol dev_bps px_ref_scaled px_mt5")
+                    print(f"{sym:6s} {dev_bps:8.2f} {p:12.6f} {mt5_px:12.6f}")
 
     if stale_syms:
         for msg in stale_syms:
             print(f"WARN: {msg}")
 
-    out_df = pd.DataFrame(rows)
     out_df.to_csv(out_csv, index=False)
 
     # Gross diagnostics (informational)
@@ -9,6 +9,12 @@ Publish orders to MetaTrader 5.
 - Rounds/normalizes order sizes to lot_step, skips anything < lot_min after rounding, caps at lot_max.
 - Chooses fill modes intelligently (IOC for FX/metals, RETURN for indices), but honors CSV fill_mode when set.
 - Dry run prints an accurate post-rounding preview table (what would be sent).
+- Live sends go through a bounded worker pool (--workers): one task per symbol, so
+  orders for the same symbol keep their CSV order. The MetaTrader5 package does not
+  document its terminal IPC as thread-safe, so calls into it are serialized by a lock
+  unless --parallel_api is given (for terminals where concurrent calls were verified);
+  only then do different symbols overlap their broker round-trips. Per-order send
+  latency is written next to the reconcile.
 """
 
 from __future__ import annotations
@@ -16,18 +22,22 @@ from __future__ import annotations
 import os
 import sys
 import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from decimal import Decimal, ROUND_FLOOR
 from typing import List, Dict, Any, Optional
 
+import numpy as np
 import pandas as pd
 
 try:
     import MetaTrader5 as mt5
 except Exception as ex:  # pragma: no cover
-    print(f"ERROR: failed to import MetaTrader5: {ex}", file=sys.stderr)
-    sys.exit(2)
+    mt5 = None
+    _MT5_IMPORT_ERROR = ex
 
 
 # -----------------------------
@@ -59,6 +69,23 @@ def normalize_volume(vol: float, lot_step: float, lot_min: float, lot_max: float
     return float(round(dv, decs))
 
 
+def normalize_volumes(vol, lot_step, lot_min, lot_max) -> np.ndarray:
+    """
+    Vectorized normalize_volume(): same rounding, on arrays (or broadcastable scalars).
+    """
+    vol, step, vmin, vmax = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (vol, lot_step, lot_min, lot_max))
+    )
+    decs = pd.Series(step.ravel()).map(_step_decimals).to_numpy().reshape(step.shape)
+    scale = 10.0**decs
+    # round the quotient first so 0.3 / 0.1 floors to 3 units, as the Decimal path does
+    units = np.floor(np.round(vol / step, 9))
+    out = np.round(units * step * scale) / scale
+    out = np.minimum(out, vmax)
+    out = np.round(out * scale) / scale
+    return np.where((vol <= 0.0) | (out < vmin), 0.0, out)
+
+
 def infer_fill_pref(symbol: str, csv_fill_mode: Optional[int]) -> List[Optional[int]]:
     """
     Return a list of fill modes to try, ordered by likelihood for your broker.
@@ -162,8 +189,9 @@ def mt5_init_or_die() -> None:
 
 
 def build_preview_and_requests(
-    orders: pd.DataFrame, contracts: pd.DataFrame, cli_dev: int
+    orders: pd.DataFrame, contracts: pd.DataFrame, cli_dev: int, api=None
 ) -> tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    api = api or mt5
     merged = orders.copy()
     # Join on symbol if contracts present, prefer mt5_symbol when given
     if not contracts.empty:
@@ -183,49 +211,44 @@ def build_preview_and_requests(
     merged["deviation"] = merged["deviation"].fillna(cli_dev)
 
     # Side from lots sign, use abs value for normalization
-    merged["side"] = merged["lots"].apply(
-        lambda x: "SELL" if float(x) < 0 else ("BUY" if float(x) > 0 else "FLAT")
+    lots = pd.to_numeric(merged["lots"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    merged["side"] = np.where(lots < 0, "SELL", np.where(lots > 0, "BUY", "FLAT"))
+    merged["lots_abs"] = np.abs(lots)
+
+    # Normalize volumes (one vectorized pass over the whole basket)
+    vol = normalize_volumes(
+        merged["lots_abs"].to_numpy(),
+        merged["lot_step"].to_numpy(dtype=float),
+        merged["lot_min"].to_numpy(dtype=float),
+        merged["lot_max"].to_numpy(dtype=float),
     )
-    merged["lots_abs"] = merged["lots"].abs().astype(float)
-
-    # Normalize volumes
-    norm_vols = []
-    for _, r in merged.iterrows():
-        v = normalize_volume(
-            vol=float(r["lots_abs"]),
-            lot_step=float(r["lot_step"]),
-            lot_min=float(r["lot_min"]),
-            lot_max=float(r["lot_max"]),
-        )
-        if r["side"] == "SELL":
-            v = -v
-        elif r["side"] == "FLAT":
-            v = 0.0
-        norm_vols.append(v)
-    merged["volume"] = norm_vols
+    merged["volume"] = np.where(lots < 0, -vol, vol)
 
     # Build send requests
+    live = merged[merged["volume"] != 0.0]  # skip tiny/flat
+    fill_modes = (
+        live["fill_mode"] if "fill_mode" in live.columns else pd.Series(pd.NA, index=live.index)
+    )
     to_send: List[Dict[str, Any]] = []
-    for _, r in merged.iterrows():
-        sym = str(r["mt5_symbol"])
-        side = str(r["side"]).upper()
-        vol = float(r["volume"])
-        if vol == 0.0:
-            continue  # skip tiny/flat
-        px = float(r["px"])
-        # fill prefs
-        csv_fill = _as_int(r.get("fill_mode"), None)
-        fills = infer_fill_pref(sym, csv_fill)
-        req = {
-            "symbol": sym,
-            "side": side,
-            "volume": abs(vol),
-            "type": mt5.ORDER_TYPE_SELL if vol < 0 else mt5.ORDER_TYPE_BUY,
-            "price": px,
-            "deviation": int(r["deviation"]),
-            "fills": fills,
-        }
-        to_send.append(req)
+    for sym, side, v, px, dev, fm in zip(
+        live["mt5_symbol"].astype(str),
+        live["side"],
+        live["volume"].to_numpy(dtype=float),
+        live["px"].to_numpy(dtype=float),
+        live["deviation"].to_numpy(dtype=float),
+        fill_modes,
+    ):
+        to_send.append(
+            {
+                "symbol": sym,
+                "side": side,
+                "volume": abs(float(v)),
+                "type": api.ORDER_TYPE_SELL if v < 0 else api.ORDER_TYPE_BUY,
+                "price": float(px),
+                "deviation": int(dev),
+                "fills": infer_fill_pref(sym, _as_int(fm, None)),
+            }
+        )
 
     # Preview table
     preview = merged[
@@ -244,42 +267,129 @@ def build_preview_and_requests(
     return preview, to_send
 
 
-def send_orders(requests: List[Dict[str, Any]]) -> Dict[str, str]:
-    failed: Dict[str, str] = {}
+def _send_one(api, o: Dict[str, Any]) -> Dict[str, Any]:
+    """Try the order's fill modes in turn; returns the outcome with its send latency."""
+    tried = []
+    sent = False
+    t0 = time.perf_counter()
+    for fm in o["fills"]:
+        req = {
+            "action": api.TRADE_ACTION_DEAL,
+            "symbol": o["symbol"],
+            "volume": o["volume"],
+            "type": o["type"],
+            "price": o["price"],
+            "deviation": o["deviation"],
+            "type_time": api.ORDER_TIME_GTC,
+        }
+        if fm is not None:
+            req["type_filling"] = fm
+
+        try:
+            res = api.order_send(req)
+        except Exception as ex:
+            tried.append((fm, None, f"{type(ex).__name__}: {ex}"))
+            continue
+        tried.append((fm, getattr(res, "retcode", None), getattr(res, "comment", None)))
+
+        if getattr(res, "retcode", None) == api.TRADE_RETCODE_DONE:  # 10009
+            sent = True
+            break
+
+    return {
+        "symbol": o["symbol"],
+        "side": o["side"],
+        "volume": o["volume"],
+        "ok": sent,
+        "retcode": tried[-1][1] if tried else None,
+        "fill_mode": tried[-1][0] if tried else None,
+        "attempts": len(tried),
+        "latency_ms": (time.perf_counter() - t0) * 1e3,
+        "tried": tried,
+    }
+
+
+class _SerializedAPI:
+    """Proxy holding one lock around every call into the wrapped MT5 module."""
+
+    def __init__(self, api):
+        self._api = api
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._api, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return call
+
+
+def _send_symbol(api, items: List[tuple[int, Dict[str, Any]]]) -> List[tuple[int, Dict[str, Any]]]:
+    # One worker owns a symbol: its orders go out strictly in CSV order
+    sym = items[0][1]["symbol"]
+    si = api.symbol_info(sym)
+    if not si or not si.visible:
+        api.symbol_select(sym, True)
+    return [(i, _send_one(api, o)) for i, o in items]
+
+
+def dispatch_orders(
+    requests: List[Dict[str, Any]], workers: int = 4, api=None, serialize: bool = True
+) -> pd.DataFrame:
+    """
+    Send orders on a pool of at most `workers` threads, one task per symbol.
+    With serialize (default) one call at a time goes into the MT5 API; latency_ms then
+    includes the wait for that lock.
+    Returns one row per request (input order) with ok/retcode/attempts/latency_ms.
+    """
+    api = api or mt5
+    if serialize:
+        api = _SerializedAPI(api)
+    by_symbol: Dict[str, List[tuple[int, Dict[str, Any]]]] = {}
+    for i, o in enumerate(requests):
+        by_symbol.setdefault(o["symbol"], []).append((i, o))
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+    n = max(1, min(int(workers), len(by_symbol)))
+    if n == 1:
+        done = [_send_symbol(api, items) for items in by_symbol.values()]
+    else:
+        with ThreadPoolExecutor(max_workers=n, thread_name_prefix="mt5-send") as ex:
+            done = list(ex.map(lambda items: _send_symbol(api, items), by_symbol.values()))
+    for chunk in done:
+        for i, r in chunk:
+            results[i] = r
 
-    for o in requests:
-        # Ensure symbol is visible
-        si = mt5.symbol_info(o["symbol"])
-        if not si or not si.visible:
-            mt5.symbol_select(o["symbol"], True)
-
-        tried = []
-        sent = False
-        for fm in o["fills"]:
-            req = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": o["symbol"],
-                "volume": o["volume"],
-                "type": o["type"],
-                "price": o["price"],
-                "deviation": o["deviation"],
-                "type_time": mt5.ORDER_TIME_GTC,
-            }
-            if fm is not None:
-                req["type_filling"] = fm
+    cols = [
+        "symbol",
+        "side",
+        "volume",
+        "ok",
+        "retcode",
+        "fill_mode",
+        "attempts",
+        "latency_ms",
+        "tried",
+    ]
+    return pd.DataFrame(results, columns=cols)
 
-            res = mt5.order_send(req)
-            tried.append((fm, getattr(res, "retcode", None), getattr(res, "comment", None)))
 
-            if getattr(res, "retcode", None) == mt5.TRADE_RETCODE_DONE:  # 10009
-                sent = True
-                break
+def _failures(sends: pd.DataFrame) -> Dict[str, str]:
+    failed: Dict[str, str] = {}
+    for r in sends[~sends["ok"].astype(bool)].itertuples(index=False):
+        print(f"[{r.symbol}] order failed: {r.tried}")
+        failed[r.symbol] = "check contract settings / fill modes"
+    return failed
 
-        if not sent:
-            print(f"[{o['symbol']}] order failed: {tried}")
-            failed[o["symbol"]] = "check contract settings / fill modes"
 
-    return failed
+def send_orders(
+    requests: List[Dict[str, Any]], workers: int = 4, api=None, serialize: bool = True
+) -> Dict[str, str]:
+    return _failures(dispatch_orders(requests, workers=workers, api=api, serialize=serialize))
 
 
 # -----------------------------
@@ -298,6 +408,17 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=50,
         help="Default slippage (points) if not set per symbol",
     )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Max concurrent order sends (orders for one symbol stay sequential)",
+    )
+    p.add_argument(
+        "--parallel_api",
+        action="store_true",
+        help="Let workers call the MT5 API concurrently (default: calls are serialized)",
+    )
     return p.parse_args(argv)
 
 
@@ -307,6 +428,10 @@ def main(argv: Optional[List[str]] = None) -> None:
     contracts_csv = Path(args.contracts_csv)
     dry_run = str(args.dry_run).lower() in {"1", "true", "yes", "y"}
 
+    if mt5 is None:
+        print(f"ERROR: failed to import MetaTrader5: {_MT5_IMPORT_ERROR}", file=sys.stderr)
+        sys.exit(2)
+
     orders = load_orders(orders_csv)
     contracts = load_contracts(contracts_csv)
 
@@ -323,7 +448,16 @@ def main(argv: Optional[List[str]] = None) -> None:
 
     # Live mode
     mt5_init_or_die()
-    failed = send_orders(to_send)
+    t0 = time.perf_counter()
+    sends = dispatch_orders(to_send, workers=args.workers, serialize=not args.parallel_api)
+    wall_ms = (time.perf_counter() - t0) * 1e3
+    failed = _failures(sends)
+    if len(sends):
+        lat = sends["latency_ms"]
+        print(
+            f"[SEND] {len(sends)} orders in {wall_ms:.0f} ms "
+            f"(latency ms: median={lat.median():.1f} max={lat.max():.1f}; workers={args.workers})"
+        )
 
     # Optional: simple reconcile artifact
     try:
@@ -332,6 +466,9 @@ def main(argv: Optional[List[str]] = None) -> None:
         recon_path = Path("executions") / f"reconcile_{run_ts}.csv"
         preview.to_csv(recon_path, index=False)
         print(f"[RECON] saved: {recon_path}")
+        sends_path = Path("executions") / f"sends_{run_ts}.csv"
+        sends.drop(columns="tried").to_csv(sends_path, index=False)
+        print(f"[SEND] latencies saved: {sends_path}")
     except Exception as ex:
         print(f"WARN: failed to write reconcile: {ex}", file=sys.stderr)
 
@@ -86,22 +86,40 @@ class FeatureStore:
         Write to a same-dir temporary file, then os.replace() → atomic on POSIX & Windows.
         Ensures no partial files are left on failure.
         """
+        tmp = self._write_tmp(dst, value)
+        try:
+            os.replace(tmp, dst)
+        except Exception:
+            _unlink_quiet(tmp)
+            raise
+
+    def _write_tmp(self, dst: Path, value: Any, fsync: bool = True) -> Path:
+        """
+        Serialize value into a same-dir temporary file next to dst and return its path
+        (fsync'ed unless the caller syncs a whole batch itself).
+        The caller is responsible for os.replace()-ing it into place.
+        """
         tmp = dst.with_suffix(".tmp." + os.urandom(4).hex())
         try:
             with tmp.open("wb") as f:
                 # protocol 4 is widely compatible (3.4+), good enough for CI
                 pickle.dump(value, f, protocol=4)
                 f.flush()
-                os.fsync(f.fileno())
-            os.replace(tmp, dst)
+                if fsync:
+                    os.fsync(f.fileno())
         except Exception:
             # Best-effort cleanup if something fails before replace
-            try:
-                if tmp.exists():
-                    tmp.unlink()
-            except Exception:
-                pass
+            _unlink_quiet(tmp)
             raise
+        return tmp
+
+
+def _unlink_quiet(p: Path) -> None:
+    try:
+        if p.exists():
+            p.unlink()
+    except Exception:
+        pass
 
 
 # ---- Legacy compatibility shims (legacy API surface) ----
@@ -633,39 +651,445 @@ def _fs__put_wrapper_v2(
     version=None,
     overwrite: bool = False,
 ):
-    # Fast path: plain str key + no metadata → identical digest behavior
-    inferred = None if schema is not None else _fs__infer_schema_if_df(value)
-    if (
-        isinstance(name_or_key, (str, bytes))
-        and params is None
-        and schema is None
-        and version is None
-        and inferred is None
-    ):
-        return self._put_core(name_or_key, value, overwrite=overwrite)
+    key = _fs__resolve_key(name_or_key, value, params=params, schema=schema, version=version)
+    return self._put_core(key, value, overwrite=overwrite)
+
 
-    # Decide final key
+def _fs__resolve_key(name_or_key, value, *, params=None, schema=None, version=None):
+    # Fast path: plain key + no metadata → identical digest behavior
+    inferred = None if schema is not None else _fs__infer_schema_if_df(value)
     if params is None and schema is None and version is None and inferred is None:
         # No metadata: leave non-string keys (e.g., tuples) as-is to keep stable digest
-        key = name_or_key
+        return name_or_key
+
+    # Need metadata: ensure a dict key
+    if isinstance(name_or_key, dict):
+        key = dict(name_or_key)  # shallow copy
     else:
-        # Need metadata: ensure a dict key
-        if isinstance(name_or_key, dict):
-            key = dict(name_or_key)  # shallow copy
-        elif isinstance(name_or_key, (str, bytes)):
-            key = {"name": name_or_key}
+        key = {"name": name_or_key}
+    if params is not None:
+        key["params"] = params
+    if version is not None:
+        key["version"] = version
+    if schema is not None:
+        key["schema"] = schema
+    elif inferred is not None:
+        key["schema"] = inferred
+    return key
+
+
+FeatureStore.put = _fs__put_wrapper_v2
+
+
+# ---- Batch API: put_many()/get_many() with group commit ----
+def _fs__fsync_dir(d):
+    # Directory fsync makes the renames durable; not supported on Windows.
+    if os.name == "nt":
+        return
+    fd = os.open(str(d), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fs__items(items):
+    if hasattr(items, "items"):
+        return list(items.items())
+    return list(items)
+
+
+def _fs_put_many(
+    self,
+    items,
+    *,
+    params=None,
+    schema=None,
+    version=None,
+    overwrite: bool = False,
+    max_workers: Optional[int] = None,
+    fsync_each: bool = False,
+):
+    """
+    Persist many (key, value) pairs (mapping or iterable of pairs) as one group commit.
+
+    Values are serialized into same-dir temp files on a thread pool, flushed with a single
+    os.sync(), then os.replace()-d in bulk and the objects directory is fsync'ed once.
+    fsync_each=True fsyncs every temp file instead (also the fallback where os.sync() does
+    not exist, i.e. Windows). Each key keeps the put() guarantees: a reader sees either
+    the previous object or the complete new one.
+    Collisions are checked up front, so with overwrite=False nothing is written on conflict.
+    Returns the stored paths in input order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    pairs = _fs__items(items)
+    keys = [_fs__resolve_key(k, v, params=params, schema=schema, version=version) for k, v in pairs]
+    paths = [self._path_for_key(k) for k in keys]
+    if not overwrite:
+        for k, p in zip(keys, paths):
+            if p.exists():
+                raise FileExistsError(f"Feature already exists for key={k!r} ({p.name})")
+    if not pairs:
+        return []
+
+    # Last write wins for duplicate keys inside one batch, same as sequential put(overwrite=True).
+    last = {p: i for i, p in enumerate(paths)}
+    jobs = sorted(last.items(), key=lambda kv: kv[1])
+
+    fsync_each = fsync_each or not hasattr(os, "sync")
+    tmps = []
+    try:
+        if len(jobs) == 1:
+            p, i = jobs[0]
+            tmps.append((self._write_tmp(p, pairs[i][1], fsync_each), p))
         else:
-            key = {"name": name_or_key}
-        if params is not None:
-            key["params"] = params
-        if version is not None:
-            key["version"] = version
-        if schema is not None:
-            key["schema"] = schema
-        elif inferred is not None:
-            key["schema"] = inferred
+            with ThreadPoolExecutor(max_workers=max_workers) as ex:
+                futs = [
+                    (ex.submit(self._write_tmp, p, pairs[i][1], fsync_each), p) for p, i in jobs
+                ]
+                err = None
+                for fut, p in futs:
+                    try:
+                        tmps.append((fut.result(), p))
+                    except Exception as e:
+                        err = err or e
+                if err is not None:
+                    raise err
+    except Exception:
+        for tmp, _ in tmps:
+            _unlink_quiet(tmp)
+        raise
 
-    return self._put_core(key, value, overwrite=overwrite)
+    if not fsync_each:
+        os.sync()  # one flush for the whole batch instead of an fsync per temp file
+    for n, (tmp, dst) in enumerate(tmps):
+        try:
+            os.replace(tmp, dst)
+        except Exception:
+            for t, _ in tmps[n:]:
+                _unlink_quiet(t)
+            raise
+    _fs__fsync_dir(self.objects)
+    _fs__manifest_record(self, [(keys[i], pairs[i][1], p) for p, i in jobs])
+    return paths
 
 
-FeatureStore.put = _fs__put_wrapper_v2
+def _fs_get_many(self, keys, *, max_workers: Optional[int] = None):
+    """
+    Load many keys in parallel; returns values in input order.
+    Missing keys raise FileNotFoundError like get().
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    keys = list(keys)
+    if len(keys) <= 1:
+        return [self.get(k) for k in keys]
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(self.get, keys))
+
+
+FeatureStore.put_many = _fs_put_many
+FeatureStore.get_many = _fs_get_many
+
+
+# ---- Manifest index: key → digest/size/schema/timestamps, pointers, provenance ----
+# A single SQLite file (root/manifest.sqlite) replaces directory globbing for list(),
+# the pointers/*.ref files and the provenance.id/provenance.log pair. Legacy files are
+# adopted once when the manifest is first created.
+_MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest     TEXT PRIMARY KEY,
+    key        TEXT,
+    name       TEXT,
+    namespace  TEXT,
+    size       INTEGER,
+    schema_fp  TEXT,
+    created_at REAL,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_objects_name ON objects(name);
+CREATE INDEX IF NOT EXISTS ix_objects_namespace ON objects(namespace, name);
+CREATE TABLE IF NOT EXISTS pointers (
+    name       TEXT PRIMARY KEY,
+    target     TEXT NOT NULL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS provenance (
+    id         INTEGER PRIMARY KEY,
+    args       TEXT,
+    kwargs     TEXT,
+    created_at REAL
+);
+"""
+
+
+def _fs__manifest(self):
+    con = getattr(self, "_manifest_con", None)
+    if con is not None:
+        return con
+    import sqlite3
+    import threading
+
+    path = self.root / "manifest.sqlite"
+    fresh = not path.exists()
+    con = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.executescript(_MANIFEST_SCHEMA)
+    self._manifest_con = con
+    self._manifest_lock = threading.RLock()
+    if fresh:
+        _fs__manifest_adopt_legacy(self)
+    return con
+
+
+def _fs__key_name(key):
+    if isinstance(key, dict) and isinstance(key.get("name"), str):
+        return key["name"]
+    if isinstance(key, bytes):
+        return key.decode("utf-8", "replace")
+    return _normalize_key(key)
+
+
+def _fs__schema_fp(key, value):
+    schema = key.get("schema") if isinstance(key, dict) else None
+    if schema is None:
+        schema = _fs__infer_schema_if_df(value)
+    if schema is None:
+        return None
+    return _key_sha1(schema)
+
+
+def _fs__manifest_record(self, entries):
+    """Upsert (key, value, path) triples into the manifest in one transaction."""
+    import time
+
+    con = _fs__manifest(self)
+    now = time.time()
+    rows = []
+    for key, value, p in entries:
+        name = _fs__key_name(key)
+        ns = name.split("/", 1)[0] if "/" in name else ""
+        try:
+            size = p.stat().st_size
+        except OSError:
+            size = None
+        rows.append(
+            (p.stem, _normalize_key(key), name, ns, size, _fs__schema_fp(key, value), now, now)
+        )
+    with self._manifest_lock:
+        con.execute("BEGIN")
+        try:
+            con.executemany(
+                """
+                INSERT INTO objects(digest, key, name, namespace, size, schema_fp,
+                                    created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(digest) DO UPDATE SET
+                    key=excluded.key, name=excluded.name, namespace=excluded.namespace,
+                    size=excluded.size, schema_fp=excluded.schema_fp,
+                    updated_at=excluded.updated_at
+                """,
+                rows,
+            )
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+
+
+def _fs__manifest_adopt_legacy(self):
+    # Objects written before the manifest existed: digest only, logical key unknown.
+    import time
+
+    con = self._manifest_con
+    now = time.time()
+    objs = []
+    for p in self.objects.glob("*.pkl"):
+        st = p.stat()
+        objs.append((p.stem, st.st_size, st.st_mtime, now))
+    ptr_dir = self.root / "pointers"
+    ptrs = []
+    if ptr_dir.exists():
+        # .ref files are keyed by sha1(name); the name itself is only recoverable via lookup
+        for ref in ptr_dir.glob("*.ref"):
+            ptrs.append(("sha1:" + ref.stem, ref.read_text(encoding="utf-8").strip(), now))
+    counter = self.root / "provenance.id"
+    last_id = 0
+    if counter.exists():
+        try:
+            last_id = int(counter.read_text().strip() or "0")
+        except Exception:
+            last_id = 0
+    con.execute("BEGIN")
+    con.executemany(
+        "INSERT OR IGNORE INTO objects(digest, size, created_at, updated_at) VALUES (?,?,?,?)",
+        objs,
+    )
+    con.executemany("INSERT OR IGNORE INTO pointers VALUES (?,?,?)", ptrs)
+    if last_id > 0:
+        # Reserve the legacy id range so new ids keep increasing.
+        con.execute(
+            "INSERT OR IGNORE INTO provenance(id, created_at) VALUES (?, ?)", (last_id, now)
+        )
+    con.execute("COMMIT")
+
+
+_FS_put_core_plain = FeatureStore._put_core
+
+
+def _fs__put_core_indexed(self, key, value, *, overwrite: bool = False):
+    p = _FS_put_core_plain(self, key, value, overwrite=overwrite)
+    _fs__manifest_record(self, [(key, value, p)])
+    return p
+
+
+FeatureStore._put_core = _fs__put_core_indexed
+
+
+def _fs_delete_indexed(self, key):
+    p = self._path_for_key(key)
+    if p.exists():
+        p.unlink()
+    con = _fs__manifest(self)
+    with self._manifest_lock:
+        con.execute("DELETE FROM objects WHERE digest = ?", (p.stem,))
+
+
+FeatureStore.delete = _fs_delete_indexed
+
+
+def _fs_list_indexed(self, prefix: Optional[str] = None):
+    """Yield stored digests (sorted), optionally filtered by digest prefix (manifest-backed)."""
+    con = _fs__manifest(self)
+    if prefix:
+        cur = con.execute(
+            "SELECT digest FROM objects WHERE digest >= ? AND digest < ? ORDER BY digest",
+            (prefix, prefix + "\uffff"),
+        )
+    else:
+        cur = con.execute("SELECT digest FROM objects ORDER BY digest")
+    for (digest,) in cur:
+        yield digest
+
+
+FeatureStore.list = _fs_list_indexed
+
+_MANIFEST_COLS = (
+    "digest",
+    "key",
+    "name",
+    "namespace",
+    "size",
+    "schema_fp",
+    "created_at",
+    "updated_at",
+)
+
+
+def _fs_lookup(self, key):
+    """Return the manifest entry (dict) for key, or None if it was never stored."""
+    con = _fs__manifest(self)
+    row = con.execute(
+        f"SELECT {', '.join(_MANIFEST_COLS)} FROM objects WHERE digest = ?",
+        (_key_sha1(key),),
+    ).fetchone()
+    return dict(zip(_MANIFEST_COLS, row)) if row else None
+
+
+def _fs_entries(self, prefix: Optional[str] = None, *, namespace: Optional[str] = None):
+    """
+    Manifest entries whose logical name starts with prefix and/or lives in namespace
+    (the part before the first '/', e.g. "prices"). Sorted by name.
+    """
+    where, args = [], []
+    if namespace is not None:
+        where.append("namespace = ?")
+        args.append(namespace)
+    if prefix:
+        where.append("name >= ? AND name < ?")
+        args += [prefix, prefix + "\uffff"]
+    sql = f"SELECT {', '.join(_MANIFEST_COLS)} FROM objects"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY name, digest"
+    con = _fs__manifest(self)
+    return [dict(zip(_MANIFEST_COLS, r)) for r in con.execute(sql, args)]
+
+
+def _fs_gc(self, *, dry_run: bool = False):
+    """
+    Remove object files the manifest does not reference (crash leftovers, stray temp files)
+    and drop manifest rows whose object file is gone. Objects still targeted by a pointer
+    are always kept. Do not run concurrently with writers: in-flight temp files count as
+    stray. Returns the list of removed file names.
+    """
+    con = _fs__manifest(self)
+    known = {d for (d,) in con.execute("SELECT digest FROM objects")}
+    pinned = {t for (t,) in con.execute("SELECT target FROM pointers")}
+    removed = []
+    present = set()
+    for p in self.objects.iterdir():
+        digest = p.name.split(".", 1)[0]
+        if p.suffix == ".pkl" and (digest in known or p.name in pinned):
+            present.add(digest)
+            continue
+        removed.append(p.name)
+        if not dry_run:
+            _unlink_quiet(p)
+    missing = [(d,) for d in known - present]
+    if missing and not dry_run:
+        with self._manifest_lock:
+            con.executemany("DELETE FROM objects WHERE digest = ?", missing)
+    return sorted(removed)
+
+
+def _fs_close(self):
+    con = getattr(self, "_manifest_con", None)
+    if con is not None:
+        con.close()
+        self._manifest_con = None
+
+
+FeatureStore.lookup = _fs_lookup
+FeatureStore.entries = _fs_entries
+FeatureStore.gc = _fs_gc
+FeatureStore.close = _fs_close
+
+
+# Pointers and provenance now live in the manifest; legacy .ref files are still honoured.
+def _fs__write_ptr(self, name, path):
+    import time
+    from pathlib import Path as _P
+
+    con = _fs__manifest(self)
+    with self._manifest_lock:
+        con.execute(
+            "INSERT OR REPLACE INTO pointers(name, target, updated_at) VALUES (?, ?, ?)",
+            (name, _P(path).name, time.time()),
+        )
+
+
+def _fs__read_ptr(self, name):
+    con = _fs__manifest(self)
+    row = con.execute(
+        "SELECT target FROM pointers WHERE name IN (?, ?) ORDER BY name = ? DESC LIMIT 1",
+        (name, "sha1:" + _key_sha1(name), name),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _fs_record_provenance(self, *args, **kwargs):
+    import time
+
+    con = _fs__manifest(self)
+    with self._manifest_lock:
+        cur = con.execute(
+            "INSERT INTO provenance(args, kwargs, created_at) VALUES (?, ?, ?)",
+            (_json.dumps(list(args), default=str), _json.dumps(kwargs, default=str), time.time()),
+        )
+    return cur.lastrowid
+
+
+FeatureStore.record_provenance = _fs_record_provenance
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import math
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 # Public row type: (id, ts, config_hash, metrics, tags[, score])
 PublicRow = Tuple[int, datetime, str, Dict[str, float], Tuple[str, ...]]
 
+# Index keys sort ascending; queries walk them from the end for "best/newest first"
+_ScoreKey = Tuple[float, datetime, int]  # (score, ts, id)
+_TimeKey = Tuple[datetime, int]  # (ts, id)
+_TS_MIN = datetime.min.replace(tzinfo=timezone.utc)
+_TS_MAX = datetime.max.replace(tzinfo=timezone.utc)
+
 
 @dataclass
 class _Entry:
@@ -25,6 +33,14 @@ def _max(a: int, b: int) -> int:
     return a if a > b else b
 
 
+def _score(v) -> Optional[float]:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+
 class AlphaRegistry:
     """
     Minimal in-memory registry used by tests.
@@ -33,14 +49,24 @@ class AlphaRegistry:
     - Provides: register, list_recent, get_latest, get_best, search (w/ score),
       rank (pandas DataFrame), get_summary (pandas DataFrame),
       register_run / get_lineage (for v027 helper utilities).
+    - Secondary indexes maintained on register: a sorted (score, ts, id) list per
+      lowercased metric, a sorted (ts, id) list overall and per tag, and a
+      parent -> children map for runs. Top-k, range and tag queries cost
+      O(log n + k) instead of a scan over every entry.
     """
 
     def __init__(self, db_path: Optional[str] = None) -> None:
         self._db_path = str(db_path) if db_path is not None else ""
         self._next_id = 1
         self._by_name: Dict[str, List[_Entry]] = {}
-        # lineage storage: alpha_id -> list[dict]
+        self._by_id: Dict[int, _Entry] = {}
+        self._recent: List[_TimeKey] = []
+        self._by_tag: Dict[str, List[_TimeKey]] = {}
+        self._by_metric: Dict[str, List[_ScoreKey]] = {}
+        self._metric_sum: Dict[str, float] = {}
+        # lineage storage: alpha_id -> list[dict]; run_id -> child run_ids
         self._lineage: Dict[str, List[Dict]] = {}
+        self._children: Dict[str, List[str]] = {}
 
     # keep compatibility with tests that call .init()
     def init(self) -> "AlphaRegistry":
@@ -64,57 +90,90 @@ class AlphaRegistry:
             tags=tuple(tags or ()),
         )
         self._by_name.setdefault(e.name, []).append(e)
+        self._index(e)
         return eid
 
+    def _index(self, e: _Entry) -> None:
+        self._by_id[e.id] = e
+        tkey = (e.ts, e.id)
+        insort(self._recent, tkey)
+        for t in set(e.tags):
+            insort(self._by_tag.setdefault(t, []), tkey)
+        lowered = {k.lower(): v for k, v in e.metrics.items()}  # last spelling wins, as before
+        for k, v in lowered.items():
+            f = _score(v)
+            if f is None:
+                continue
+            insort(self._by_metric.setdefault(k, []), (f, e.ts, e.id))
+            self._metric_sum[k] = self._metric_sum.get(k, 0.0) + f
+
     def _as_tuple(self, e: _Entry) -> PublicRow:
         return (e.id, e.ts, e.name, e.metrics, e.tags)
 
+    def _newest(self, tag: Optional[str] = None) -> Iterator[_Entry]:
+        keys = self._recent if tag is None else self._by_tag.get(tag, [])
+        for _, eid in reversed(keys):
+            yield self._by_id[eid]
+
+    def _scored(
+        self,
+        metric: str,
+        lo: Optional[float] = None,
+        hi: Optional[float] = None,
+        tag: Optional[str] = None,
+    ) -> Iterator[Tuple[_Entry, float]]:
+        """Entries with metric in [lo, hi] (and tag), best (score, ts, id) first."""
+        keys = self._by_metric.get(metric.lower(), [])
+        i = 0 if lo is None else bisect_left(keys, (float(lo), _TS_MIN, -1))
+        j = len(keys) if hi is None else bisect_right(keys, (float(hi), _TS_MAX, math.inf))
+        if tag is not None:
+            posting = self._by_tag.get(tag, [])
+            if len(posting) < j - i:
+                # Rare tag: rank its own (small) posting list instead of walking the range
+                m = metric.lower()
+                rows = []
+                for _, eid in posting:
+                    e = self._by_id[eid]
+                    f = _score({k.lower(): v for k, v in e.metrics.items()}.get(m))
+                    if f is None or (lo is not None and f < lo) or (hi is not None and f > hi):
+                        continue
+                    rows.append(((f, e.ts, e.id), e))
+                rows.sort(key=lambda r: r[0], reverse=True)
+                for key, e in rows:
+                    yield e, key[0]
+                return
+        for k in range(j - 1, i - 1, -1):
+            f, _, eid = keys[k]
+            e = self._by_id[eid]
+            if tag is not None and tag not in e.tags:
+                continue
+            yield e, f
+
+    @staticmethod
+    def _take(it: Iterator, n: int) -> list:
+        out = []
+        n = _max(0, int(n))
+        for x in it:
+            if len(out) >= n:
+                break
+            out.append(x)
+        return out
+
     def list_recent(self, *, tag: Optional[str] = None, limit: int = 10) -> List[PublicRow]:
-        out: List[_Entry] = []
-        for items in self._by_name.values():
-            for e in items:
-                if tag is not None and tag not in e.tags:
-                    continue
-                out.append(e)
-        out.sort(key=lambda e: (e.ts, e.id), reverse=True)
-        return [self._as_tuple(e) for e in out[: _max(0, int(limit))]]
+        return [self._as_tuple(e) for e in self._take(self._newest(tag), limit)]
 
     def get_latest(self, name: Optional[str] = None) -> PublicRow:
         """Return the latest row overall (name=None) or the latest row whose tags contain `name`."""
-        if name is None:
-            # newest by (ts, id) across all names
-            all_entries = [e for lst in self._by_name.values() for e in lst]
-            if not all_entries:
-                raise KeyError("no rows")
-            e = max(all_entries, key=lambda e: (e.ts, e.id))
-            return self._as_tuple(e)
-
-        tag = str(name)
-        candidates: List[_Entry] = []
-        for lst in self._by_name.values():
-            for e in lst:
-                if tag in e.tags:
-                    candidates.append(e)
-        if not candidates:
-            raise KeyError(f"no rows for {tag}")
-        e = max(candidates, key=lambda e: (e.ts, e.id))
+        tag = None if name is None else str(name)
+        e = next(self._newest(tag), None)
+        if e is None:
+            raise KeyError("no rows" if tag is None else f"no rows for {tag}")
         return self._as_tuple(e)
 
     def get_best(
         self, metric: str, top_k: int = 1
     ) -> List[Tuple[int, datetime, str, Dict[str, float], Tuple[str, ...], float]]:
-        metric_l = metric.lower()
-        scored: List[Tuple[_Entry, float]] = []
-        for items in self._by_name.values():
-            for e in items:
-                m = {k.lower(): v for k, v in e.metrics.items()}
-                if metric_l in m:
-                    scored.append((e, float(m[metric_l])))
-        scored.sort(key=lambda t: (t[1], t[0].ts, t[0].id), reverse=True)
-        out: List[Tuple[int, datetime, str, Dict[str, float], Tuple[str, ...], float]] = []
-        for e, s in scored[: _max(0, int(top_k))]:
-            out.append(self._as_tuple(e) + (s,))
-        return out
+        return [self._as_tuple(e) + (s,) for e, s in self._take(self._scored(metric), top_k)]
 
     def search(
         self,
@@ -125,23 +184,8 @@ class AlphaRegistry:
         tag: Optional[str] = None,
         limit: int = 10,
     ) -> List[Tuple[int, datetime, str, Dict[str, float], Tuple[str, ...], float]]:
-        metric_l = metric.lower()
-        scored: List[Tuple[_Entry, float]] = []
-        for items in self._by_name.values():
-            for e in items:
-                m = {k.lower(): v for k, v in e.metrics.items()}
-                if metric_l not in m:
-                    continue
-                v = float(m[metric_l])
-                if min is not None and v < float(min):
-                    continue
-                if max is not None and v > float(max):
-                    continue
-                if tag is not None and tag not in e.tags:
-                    continue
-                scored.append((e, v))
-        scored.sort(key=lambda t: (t[1], t[0].ts, t[0].id), reverse=True)
-        return [self._as_tuple(e) + (score,) for (e, score) in scored[: _max(0, int(limit))]]
+        hits = self._scored(metric, lo=min, hi=max, tag=tag)
+        return [self._as_tuple(e) + (score,) for (e, score) in self._take(hits, limit)]
 
     # --- Extended API used by v027 helpers --------------------------------
 
@@ -161,25 +205,16 @@ class AlphaRegistry:
             tag = filters.get("tag")
             since = filters.get("since")
 
-        metric_l = metric.lower()
-        rows: List[Tuple[_Entry, float]] = []
-        for items in self._by_name.values():
-            for e in items:
-                if tag and tag not in e.tags:
-                    continue
-                if since:
-                    try:
-                        dt = datetime.fromisoformat(str(since).replace("Z", "+00:00"))
-                        if e.ts < dt:
-                            continue
-                    except Exception:
-                        pass
-                m = {k.lower(): v for k, v in e.metrics.items()}
-                if metric_l not in m:
-                    continue
-                rows.append((e, float(m[metric_l])))
-
-        rows.sort(key=lambda t: (t[1], t[0].ts, t[0].id), reverse=True)
+        since_dt = None
+        if since:
+            try:
+                since_dt = datetime.fromisoformat(str(since).replace("Z", "+00:00"))
+            except Exception:
+                since_dt = None
+        hits = self._scored(metric, tag=tag or None)
+        if since_dt is not None:
+            hits = (t for t in hits if t[0].ts >= since_dt)
+        rows: List[Tuple[_Entry, float]] = self._take(hits, top_n)
 
         try:
             import pandas as pd  # type: ignore
@@ -229,69 +264,26 @@ class AlphaRegistry:
         Return a pandas.DataFrame with basic stats for the given metric across all rows.
         At minimum includes one of: mean / max / median (tests check for presence).
         """
-        metric_l = metric.lower()
-        vals: List[float] = []
-        for items in self._by_name.values():
-            for e in items:
-                m = {k.lower(): v for k, v in e.metrics.items()}
-                if metric_l in m:
-                    vals.append(float(m[metric_l]))
+        keys = self._by_metric.get(metric.lower(), [])
+        n = len(keys)
+        # Index is sorted, so max/median are O(1); mean uses the running sum
+        s_mean = self._metric_sum[metric.lower()] / n if n else None
+        s_max = keys[-1][0] if n else None
+        if n:
+            s_median = (
+                keys[n // 2][0] if n % 2 == 1 else (keys[n // 2 - 1][0] + keys[n // 2][0]) / 2
+            )
+        else:
+            s_median = None
 
+        row = {"metric": metric, "count": n, "mean": s_mean, "max": s_max, "median": s_median}
         try:
             import pandas as pd  # type: ignore
 
-            if not vals:
-                return pd.DataFrame(
-                    [
-                        {
-                            "metric": metric,
-                            "count": 0,
-                            "mean": None,
-                            "max": None,
-                            "median": None,
-                        }
-                    ]
-                )
-
-            s_mean = sum(vals) / len(vals)
-            s_max = max(vals)
-            try:
-                srt = sorted(vals)
-                n = len(vals)
-                s_median = srt[n // 2] if n % 2 == 1 else (srt[n // 2 - 1] + srt[n // 2]) / 2
-            except Exception:
-                s_median = None
-
-            return pd.DataFrame(
-                [
-                    {
-                        "metric": metric,
-                        "count": len(vals),
-                        "mean": s_mean,
-                        "max": s_max,
-                        "median": s_median,
-                    }
-                ]
-            )
+            return pd.DataFrame([row])
         except Exception:
             # Dict fallback (tests only assert presence of keys)
-            if not vals:
-                return {"metric": metric, "count": 0, "mean": None, "max": None, "median": None}
-            s_mean = sum(vals) / len(vals)
-            s_max = max(vals)
-            try:
-                srt = sorted(vals)
-                n = len(vals)
-                s_median = srt[n // 2] if n % 2 == 1 else (srt[n // 2 - 1] + srt[n // 2]) / 2
-            except Exception:
-                s_median = None
-            return {
-                "metric": metric,
-                "count": len(vals),
-                "mean": s_mean,
-                "max": s_max,
-                "median": s_median,
-            }
+            return row
 
     # --- Lineage ----------------------------------------------------------
 
@@ -299,6 +291,7 @@ class AlphaRegistry:
         """
         Accept a run dict that includes at least:
           alpha_id, run_hash, timestamp, source_version, config_hash, config_diff, tags
+        and optionally parent_run (the run_id it was derived from).
         Return the run_id (string).
         """
         rid = str(run.get("run_hash") or run.get("run_id") or "")
@@ -306,8 +299,26 @@ class AlphaRegistry:
         if not rid or not aid:
             raise ValueError("run must include alpha_id and run_hash (or run_id)")
         self._lineage.setdefault(aid, []).append(dict(run))
+        parent = run.get("parent_run")
+        if parent:
+            self._children.setdefault(str(parent), []).append(rid)
         return rid
 
+    def get_children(self, run_id: str, recursive: bool = False) -> List[str]:
+        """Run ids derived from `run_id` (registration order); all descendants if recursive."""
+        out: List[str] = []
+        seen: Set[str] = set()
+        stack = list(reversed(self._children.get(str(run_id), ())))
+        while stack:
+            rid = stack.pop()
+            if rid in seen:
+                continue
+            seen.add(rid)
+            out.append(rid)
+            if recursive:
+                stack.extend(reversed(self._children.get(rid, ())))
+        return out
+
     def get_lineage(self, alpha_id: str):
         """
         Return lineage as a pandas.DataFrame (columns: alpha_id, run_id, timestamp,
@@ -1,115 +1,235 @@
 from typing import Any, Iterable, Mapping
 import duckdb
+import numpy as np
 import pandas as pd
 
 DDL = """
 CREATE TABLE IF NOT EXISTS feature_store (
-    symbol TEXT,
-    ts TIMESTAMPTZ,
-    name TEXT,
+    symbol TEXT NOT NULL,
+    ts TIMESTAMPTZ NOT NULL,
+    name TEXT NOT NULL,
     value DOUBLE,
-    ver TEXT
+    ver TEXT NOT NULL DEFAULT 'v1',
+    PRIMARY KEY (symbol, ts, name, ver)
   )
 """
 
 
+def _to_arrow(res):
+    # duckdb>=1.4 renamed fetch_arrow_table() to to_arrow_table()
+    fetch = getattr(res, "to_arrow_table", None) or res.fetch_arrow_table
+    return fetch()
+
+
 class FeatureStore:
     def __init__(self, path: str):
 
         self.con = duckdb.connect(path)
-        self.con.execute(
-            """
-            CREATE TABLE IF NOT EXISTS feature_store (
-                symbol TEXT,
-                ts TIMESTAMPTZ,
-                name TEXT,
-                value DOUBLE,
-                ver TEXT
-            )
-        """
-        )
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        has_table = self.con.execute(
+            "SELECT count(*) FROM duckdb_tables() WHERE table_name = 'feature_store'"
+        ).fetchone()[0]
+        if has_table and not self._has_primary_key():
+            self._migrate_to_primary_key()
+        self.con.execute(DDL)
         self.con.execute("CREATE INDEX IF NOT EXISTS idx_fs_sym_ts ON feature_store(symbol, ts)")
         self.con.execute(
             "CREATE INDEX IF NOT EXISTS idx_fs_sym_name_ts ON feature_store(symbol, name, ts)"
         )
 
+    def _has_primary_key(self) -> bool:
+        n = self.con.execute(
+            """
+            SELECT count(*) FROM duckdb_constraints()
+            WHERE table_name = 'feature_store' AND constraint_type = 'PRIMARY KEY'
+            """
+        ).fetchone()[0]
+        return bool(n)
+
+    def _migrate_to_primary_key(self) -> None:
+        # Pre-PK databases: rebuild keyed on (symbol, ts, name, ver), keeping the last write.
+        self.con.execute("BEGIN TRANSACTION")
+        try:
+            for idx in ("idx_fs_sym_ts", "idx_fs_sym_name_ts"):
+                self.con.execute(f"DROP INDEX IF EXISTS {idx}")
+            self.con.execute("ALTER TABLE feature_store RENAME TO feature_store_legacy")
+            self.con.execute(DDL)
+            self.con.execute(
+                """
+                INSERT INTO feature_store
+                SELECT symbol, ts, name, value, coalesce(ver, 'v1') AS ver
+                FROM feature_store_legacy
+                WHERE symbol IS NOT NULL AND ts IS NOT NULL AND name IS NOT NULL
+                QUALIFY row_number() OVER (
+                    PARTITION BY symbol, ts, name, coalesce(ver, 'v1') ORDER BY rowid DESC
+                ) = 1
+                """
+            )
+            self.con.execute("DROP TABLE feature_store_legacy")
+            self.con.execute("COMMIT")
+        except Exception:
+            self.con.execute("ROLLBACK")
+            raise
+
     def upsert(self, rows: Iterable[Mapping[str, Any]]) -> int:
         # rows: {symbol, ts (aware datetime), name, value, [ver]}
-        data: list[tuple[str, object, str, float, str]] = []
-        for r in rows:
-            data.append(
-                (
-                    str(r["symbol"]),
-                    r["ts"],
-                    str(r["name"]),
-                    float(r["value"]),
-                    str(r.get("ver", "v1")),
-                )
+        data = [
+            (
+                str(r["symbol"]),
+                r["ts"],
+                str(r["name"]),
+                float(r["value"]),
+                str(r.get("ver", "v1")),
             )
+            for r in rows
+        ]
         if not data:
             return 0
-        # Emulate upsert on (symbol, ts, name, ver)
-        keys = [(s, t, n, v) for (s, t, n, _, v) in data]
-        self.con.executemany(
-            "DELETE FROM feature_store WHERE symbol=? AND ts=? AND name=? AND ver=?",
-            keys,
-        )
-        self.con.executemany(
-            "INSERT INTO feature_store(symbol, ts, name, value, ver) VALUES (?,?,?,?,?)",
-            data,
-        )
-        return len(data)
+        df = pd.DataFrame(data, columns=["symbol", "ts", "name", "value", "ver"])
+        return self.upsert_frame(df)
 
-    def query(self, symbol: str, names=None, start=None, end=None):
+    def upsert_frame(self, data) -> int:
         """
-        Return LONG dataframe: columns [symbol, ts, name, value].
+        Bulk upsert a pandas DataFrame or pyarrow Table with columns
+        [symbol, ts, name, value, (ver)] in a single INSERT OR REPLACE + transaction.
+        Within the batch, the last row per (symbol, ts, name, ver) wins.
         """
-        self.con.execute(
-            """
-            CREATE TABLE IF NOT EXISTS feature_store (
-                symbol TEXT,
-                ts TIMESTAMPTZ,
-                name TEXT,
-                value DOUBLE,
-                ver TEXT
-            )
-        """
-        )
-        sql = "SELECT symbol, ts, name, value FROM feature_store WHERE symbol = ?"
-        params = [symbol]
+        arrow = hasattr(data, "column_names")  # pyarrow.Table
+        if arrow:
+            n, cols = data.num_rows, list(data.column_names)
+        else:
+            n, cols = len(data), [str(c) for c in data.columns]
+        if n == 0:
+            return 0
+        missing = {"symbol", "ts", "name", "value"} - set(cols)
+        if missing:
+            raise ValueError(f"upsert_frame: missing columns {sorted(missing)}")
+        # explicit input position: row_number() OVER () has no defined order
+        if arrow:
+            import pyarrow as pa
+
+            data = data.append_column("_fs_ord", pa.array(np.arange(n, dtype=np.int64)))
+        else:
+            data = data.assign(_fs_ord=np.arange(n, dtype=np.int64))
+        ver = "CAST(ver AS TEXT)" if "ver" in cols else "'v1'"
+        self.con.register("_fs_incoming", data)
+        try:
+            self.con.execute("BEGIN TRANSACTION")
+            try:
+                self.con.execute(
+                    f"""
+                    INSERT OR REPLACE INTO feature_store(symbol, ts, name, value, ver)
+                    SELECT symbol, ts, name, value, ver FROM (
+                        SELECT CAST(symbol AS TEXT) AS symbol,
+                               CAST(ts AS TIMESTAMPTZ) AS ts,
+                               CAST(name AS TEXT) AS name,
+                               CAST(value AS DOUBLE) AS value,
+                               {ver} AS ver,
+                               _fs_ord
+                        FROM _fs_incoming
+                    )
+                    QUALIFY row_number() OVER (
+                        PARTITION BY symbol, ts, name, ver ORDER BY _fs_ord DESC
+                    ) = 1
+                    """
+                )
+                self.con.execute("COMMIT")
+            except Exception:
+                self.con.execute("ROLLBACK")
+                raise
+        finally:
+            self.con.unregister("_fs_incoming")
+        return n
+
+    # ---- reads ----
+
+    @staticmethod
+    def _where(symbols, names=None, start=None, end=None, ver=None):
+        """Filter clause + params with symbol/name/time-range/version pushdown."""
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        symbols = list(symbols)
+        if not symbols:
+            return "FALSE", []  # nothing requested: empty result, not `symbol IN ()`
+        where = [f"symbol IN ({', '.join(['?'] * len(symbols))})"]
+        params: list[Any] = list(symbols)
         if names:
-            placeholders = ", ".join(["?"] * len(names))
-            sql += f" AND name IN ({placeholders})"
+            where.append(f"name IN ({', '.join(['?'] * len(names))})")
             params.extend(list(names))
         if start is not None:
-            sql += " AND ts >= ?"
+            where.append("ts >= ?")
             params.append(start)
         if end is not None:
-            sql += " AND ts <= ?"
+            where.append("ts <= ?")
             params.append(end)
-        sql += " ORDER BY ts"
-        df = self.con.execute(sql, params).fetch_df()
-        if not df.empty:
-            import pandas as pd
+        if ver is not None:
+            where.append("ver = ?")
+            params.append(ver)
+        return " AND ".join(where), params
 
+    def _long(self, symbol, names=None, start=None, end=None, ver=None):
+        where, params = self._where(symbol, names, start, end, ver)
+        sql = f"SELECT symbol, ts, name, value FROM feature_store WHERE {where} ORDER BY ts"
+        return self.con.execute(sql, params)
+
+    def query(self, symbol: str, names=None, start=None, end=None):
+        """
+        Return LONG dataframe: columns [symbol, ts, name, value].
+        """
+        df = self._long(symbol, names, start, end).fetch_df()
+        if not df.empty:
             df["ts"] = pd.to_datetime(df["ts"], utc=True)
         return df
 
+    def query_arrow(self, symbol, names=None, start=None, end=None, ver=None):
+        """LONG result as a pyarrow.Table (no pandas materialization)."""
+        return _to_arrow(self._long(symbol, names, start, end, ver))
+
+    def _wide(self, symbols, names=None, start=None, end=None, ver=None):
+        """
+        Pivot inside DuckDB with conditional aggregation: one column per feature name
+        (sorted), one row per (ts) or (symbol, ts) when several symbols are requested.
+        Where versions collide on a key, the lexicographically latest ver wins.
+        """
+        multi = not isinstance(symbols, str)
+        where, params = self._where(symbols, names, start, end, ver)
+        if names:
+            cols = sorted(set(names))
+        else:
+            cols = [
+                r[0]
+                for r in self.con.execute(
+                    f"SELECT DISTINCT name FROM feature_store WHERE {where} ORDER BY name",
+                    params,
+                ).fetchall()
+            ]
+        keys = "symbol, ts" if multi else "ts"
+        aggs = [
+            'arg_max(value, ver) FILTER (WHERE name = ?) AS "{}"'.format(c.replace('"', '""'))
+            for c in cols
+        ]
+        sql = f"SELECT {', '.join([keys] + aggs)} FROM feature_store WHERE {where}"
+        sql += f" GROUP BY {keys} ORDER BY {keys}"
+        return self.con.execute(sql, list(cols) + params)
+
+    def wide_arrow(self, symbols, names=None, start=None, end=None, ver=None):
+        """
+        Training-matrix path: wide pivot as a pyarrow.Table. symbols may be a single
+        symbol or a list (adds a leading symbol column).
+        """
+        return _to_arrow(self._wide(symbols, names, start, end, ver))
+
     def pivot_wide(self, symbol: str, names=None, start=None, end=None):
         """
         Wide pivot: index=ts, columns=name, values=value. Columns deterministic.
         """
-
-        df = self.query(symbol, names=names, start=start, end=end)
-        if df.empty:
+        wide = self._wide(symbol, names, start, end).fetch_df()
+        if wide.empty:
             return pd.DataFrame(columns=["ts"]).set_index("ts").reset_index()
-        wide = (
-            df.pivot_table(index="ts", columns="name", values="value", aggfunc="last")
-            .sort_index()
-            .reset_index()
-        )
-        cols = ["ts"] + sorted([c for c in wide.columns if c != "ts"])
-        return wide[cols]
+        wide["ts"] = pd.to_datetime(wide["ts"], utc=True)
+        return wide
 
 
 def pivot_wide(self, symbol: str, start: str = None, end: str = None, ver: str | None = None):
@@ -0,0 +1,125 @@
+import duckdb
+import pandas as pd
+
+from alpha_factory.alpha_registry import AlphaRegistry
+
+
+def test_persistent_connection_and_sequence_ids(tmp_path):
+    db = str(tmp_path / "r.duckdb")
+    with AlphaRegistry(db) as reg:
+        con = reg.con
+        assert reg.register("h1", {"sharpe": 1.0}, ["a"]) == 1
+        assert reg.register("h2", {"sharpe": 2.0}, ["b"]) == 2
+        assert reg.con is con
+        assert reg.get_best("sharpe")[0][2] == "h2"
+    assert reg._con is None
+
+    # ids keep increasing across sessions, past rows inserted by other tools
+    c = duckdb.connect(db)
+    c.execute("INSERT INTO alphas (id, config_hash, metrics, tags) VALUES (10, 'x', '{}', '')")
+    c.close()
+    with AlphaRegistry(db) as reg:
+        assert reg.register("h3", {}, []) == 11
+
+
+def test_register_many(tmp_path):
+    runs = pd.DataFrame(
+        {
+            "config_hash": [f"h{i}" for i in range(1000)],
+            "metrics": [{"sharpe": i / 100} for i in range(1000)],
+            "tags": ["sweep,demo"] * 1000,
+        }
+    )
+    with AlphaRegistry(str(tmp_path / "r.duckdb")) as reg:
+        reg.register("h_first", {"sharpe": 0.0})
+        ids = reg.register_many(runs)
+        assert ids == list(range(2, 1002))
+        n, cfg = reg.con.execute(
+            "SELECT COUNT(*), MAX(config_hash) FROM alphas WHERE tags = 'demo,sweep'"
+        ).fetchone()
+        assert n == 1000
+        assert (
+            reg.con.execute("SELECT config_hash FROM alphas WHERE id = 501").fetchone()[0] == "h499"
+        )
+        assert reg.get_best("sharpe")[0][2] == "h999"
+        assert reg.register("h_next", {}) == 1002
+
+
+def test_typed_metrics_migration_and_queries(tmp_path):
+    db = str(tmp_path / "legacy.duckdb")
+    c = duckdb.connect(db)
+    c.execute(
+        "CREATE TABLE alphas (id BIGINT PRIMARY KEY, ts TIMESTAMP NOT NULL DEFAULT now(),"
+        " config_hash TEXT NOT NULL, metrics TEXT NOT NULL, tags TEXT NOT NULL)"
+    )
+    c.execute("""INSERT INTO alphas (id, config_hash, metrics, tags) VALUES
+        (1, 'h1', '{"sharpe": 1.5, "pf": 1.2}', 'a'),
+        (2, 'h2', '{"sharpe": 0.5, "pf": 3.0, "note": "x"}', 'a'),
+        (3, 'h0', '{"sharpe": NaN, "pf": NaN}', 'a')""")
+    c.close()
+
+    with AlphaRegistry(db) as reg:
+        reg.register("h3", {"sharpe": 1.0, "pf": 2.0}, ["b"])
+        con = reg.con
+        assert con.execute("SELECT sharpe FROM alphas WHERE id = 2").fetchone()[0] == 0.5
+        assert con.execute("SELECT sharpe FROM alphas WHERE id = 3").fetchone()[0] is None
+        assert (
+            con.execute("SELECT COUNT(*) FROM alpha_metrics WHERE metric = 'note'").fetchone()[0]
+            == 0
+        )
+
+        assert [r[2] for r in reg.get_best("sharpe", n=4)][:3] == ["h1", "h3", "h2"]
+        assert [r[2] for r in reg.get_best("pf", n=4)][:3] == ["h2", "h3", "h1"]
+        hits = reg.search("pf", min=1.5, max=2.5)
+        assert [(r[2], r[-1]) for r in hits] == [("h3", 2.0)]
+
+        import alpha_factory.alpha_registry_ext_overrides_024  # noqa: F401
+
+        c2 = duckdb.connect(db)
+        c2.execute(
+            "INSERT INTO alphas (id, config_hash, metrics, tags) VALUES (9, 'h9', '{\"sharpe\": 9}', '')"
+        )
+        c2.close()
+        ranked = reg.rank(metric="sharpe", top_n=2)
+        assert list(ranked["run_id"]) == ["9", "1"]
+
+
+def test_tag_index_exact_and_boolean_filters(tmp_path):
+    db = str(tmp_path / "tags.duckdb")
+    c = duckdb.connect(db)
+    c.execute(
+        "CREATE TABLE alphas (id BIGINT PRIMARY KEY, ts TIMESTAMP NOT NULL DEFAULT now(),"
+        " config_hash TEXT NOT NULL, metrics TEXT NOT NULL, tags TEXT NOT NULL)"
+    )
+    c.execute("""INSERT INTO alphas (id, config_hash, metrics, tags) VALUES
+        (1, 'h1', '{"sharpe": 1.0}', 'mom,wf'),
+        (2, 'h2', '{"sharpe": 2.0}', 'xmom')""")
+    c.close()
+
+    with AlphaRegistry(db) as reg:
+        reg.register_many(
+            pd.DataFrame(
+                {
+                    "config_hash": ["h3", "h4"],
+                    "metrics": [{"sharpe": 3.0}, {"sharpe": 4.0}],
+                    "tags": [["mom", "brk"], "brk"],
+                }
+            )
+        )
+        reg.register("h5", {"sharpe": 5.0}, ["wf"])
+
+        def cfgs(rows):
+            return sorted(r[2] for r in rows)
+
+        assert cfgs(reg.search("sharpe", tag="mom")) == ["h1", "h3"]
+        assert cfgs(reg.search("sharpe", tag=["mom", "brk"])) == ["h3"]
+        assert cfgs(reg.search("sharpe", any_tags=["wf", "brk"])) == ["h1", "h3", "h4", "h5"]
+        assert cfgs(reg.search("sharpe", tag="mom", any_tags=["wf"])) == ["h1"]
+        assert reg.get_best("sharpe", tag="xmom")[0][2] == "h2"
+        assert reg.get_latest("wf")[2] == "h5"
+        assert cfgs(reg.list_recent(any_tags=["nope"])) == []
+
+        import alpha_factory.alpha_registry_ext_overrides_024  # noqa: F401
+
+        ranked = reg.rank(metric="sharpe", filters={"tag": "mom"}, top_n=10)
+        assert list(ranked["run_id"]) == ["3", "1"]
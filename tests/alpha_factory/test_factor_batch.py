@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from src.alpha_factory import registry
+from src.alpha_factory.factor_batch import FactorPlan, evaluate_many
+
+
+def _panel(n=400):
+    rng = np.random.default_rng(3)
+    idx = pd.date_range("2024-01-01", periods=n, freq="h")
+    data = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, (n, 3)), axis=0))
+    return pd.DataFrame(data, index=idx, columns=["EURUSD", "GBPUSD", "XAUUSD"])
+
+
+def test_batch_matches_single_factor_compute():
+    panel = _panel()
+    names = [
+        "sma_cross_10_30",
+        "sma_cross_20_50",
+        "sma_slope_30_1",
+        "sma_slope_20_3",
+        "rsi_thresh_14_30_70",
+        "rsi_thresh_14_25_75",
+    ]
+    out = evaluate_many(names, panel)
+    for name in names:
+        for sym in panel.columns:
+            single = registry.make(name).compute(panel[sym])
+            np.testing.assert_array_equal(out[name][sym].to_numpy(), single.to_numpy())
+
+
+def test_plan_dedupes_windows():
+    plan = FactorPlan.from_names(
+        ["sma_cross_10_30", "sma_cross_30_50", "sma_slope_30_1", "rsi_thresh_14_30_70"]
+    )
+    assert plan.unique_windows() == [
+        ("sma", 10),
+        ("sma", 30),
+        ("sma", 50),
+        ("sma_diff", 30, 1),
+        ("rsi", 14),
+    ]
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import json
+import threading
+
+from alpha_factory.live_journal import (
+    JournalWriter,
+    iter_rows,
+    sealed_segments,
+    segment_index,
+)
+
+
+def _row(t: datetime, i: int) -> dict:
+    return {"ts": t.isoformat(), "type": "INTENT", "i": i}
+
+
+def test_journal_writer_rotates_daily_and_reads_time_ranges(tmp_path: Path):
+    journal = tmp_path / "artifacts" / "live" / "journal.ndjson"
+    now = {"t": datetime(2025, 10, 30, 23, 0, tzinfo=timezone.utc)}
+    w = JournalWriter(journal, block_rows=8, clock=lambda: now["t"])
+
+    t0 = now["t"]
+    for i in range(300):
+        now["t"] = t0 + timedelta(minutes=i)  # 23:00 on day 1 .. ~04:00 on day 2
+        w.append(_row(now["t"], i), wait=(i % 7 == 0))
+    w.close()
+
+    segs = sealed_segments(journal)
+    assert [p.name for p in segs] == ["2025-10-30.ndjson"]
+    idx = segment_index(segs[0])
+    assert idx["rows"] == 60 and len(idx["blocks"]) == 8
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 240
+
+    everything = [r["i"] for r in iter_rows(journal)]
+    assert everything == list(range(300))
+
+    since, until = t0 + timedelta(minutes=50), t0 + timedelta(minutes=70)
+    assert [r["i"] for r in iter_rows(journal, since=since, until=until)] == list(range(50, 70))
+    assert [
+        r["i"]
+        for r in iter_rows(journal, since="2025-10-30T23:10:00Z", until="2025-10-30T23:12:00Z")
+    ] == [10, 11]
+
+    # garbage lines are skipped, and a late row appended to a sealed segment is still found
+    with segs[0].open("a", encoding="utf-8") as fh:
+        fh.write("=== banner ===\n")
+        fh.write(json.dumps(_row(t0 + timedelta(minutes=5), 999)) + "\n")
+    got = [r["i"] for r in iter_rows(journal, since=t0, until=t0 + timedelta(minutes=6))]
+    assert got == [0, 1, 2, 3, 4, 5, 999]
+
+
+def test_journal_writer_group_commit_across_threads(tmp_path: Path):
+    journal = tmp_path / "journal.ndjson"
+    w = JournalWriter(journal, rotate=None)
+    t = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def worker(k: int):
+        for i in range(50):
+            w.append(_row(t, k * 1000 + i))
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    rows = [json.loads(x) for x in journal.read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["i"] for r in rows) == sorted(k * 1000 + i for k in range(8) for i in range(50))
+    assert w.stats["rows"] == 400
+    assert w.stats["commits"] <= 400
+    w.close()
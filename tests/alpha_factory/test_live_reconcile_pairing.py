@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import json
+
+from alpha_factory.live_journal import JournalCursor, JournalWriter, sealed_segments
+from alpha_factory.live_reconcile import (
+    _MAX_RECONCILERS,
+    _RECONCILERS,
+    ExecutionReconciler,
+    build_execution_report,
+    pair_intents_and_fills,
+)
+
+
+def _intent(ts: str, symbol: str = "EURUSD", side: str = "BUY", size: float = 0.2) -> dict:
+    return {
+        "type": "INTENT",
+        "ts_utc": ts,
+        "symbol": symbol,
+        "side": side,
+        "size": size,
+        "price_request": 1.1000,
+    }
+
+
+def _fill(
+    ts: str, symbol: str = "EURUSD", side: str = "BUY", size: float = 0.2, px: float = 1.1001
+) -> dict:
+    return {
+        "type": "FILL",
+        "ts_utc": ts,
+        "symbol": symbol,
+        "side": side,
+        "size": size,
+        "price_exec": px,
+    }
+
+
+def test_sort_merge_pairs_one_fill_per_intent_within_window():
+    rows = [
+        _intent("2025-10-31T10:00:00Z"),
+        _intent("2025-10-31T10:00:05Z", side="SELL"),
+        _fill("2025-10-31T09:59:59Z"),  # before the first intent: orphan
+        _intent("2025-10-31T10:00:10Z"),
+        _fill("2025-10-31T10:00:02Z", size=0.1),
+        _fill("2025-10-31T10:00:30Z"),
+        _fill("2025-10-31T10:00:06Z", side="SELL", px=1.0998),
+        _intent("2025-10-31T10:05:00Z", symbol="GBPUSD"),
+    ]
+    pairs = pair_intents_and_fills(rows)
+    assert [p["status"] for p in pairs] == ["PARTIAL", "FILLED", "FILLED", "NOFILL"]
+    assert [p["fill_time"] for p in pairs[:3]] == [
+        "2025-10-31T10:00:02Z",
+        "2025-10-31T10:00:06Z",
+        "2025-10-31T10:00:30Z",
+    ]
+    assert pairs[0]["latency_sec"] == 2.0
+    assert abs(pairs[1]["slippage_pips"] - 2.0) < 1e-9
+
+    # the orphan fill counts once clock skew is tolerated; a wait cap drops the late one
+    pairs = pair_intents_and_fills(rows, tolerance_sec=2.0, max_wait_sec=10.0)
+    assert pairs[0]["fill_time"] == "2025-10-31T09:59:59Z"
+    assert pairs[2]["status"] == "NOFILL"  # 10:00:02 is too early, 10:00:30 too late
+
+
+def test_streaming_report_reads_only_new_rows_across_rotation(tmp_path: Path):
+    journal = tmp_path / "artifacts" / "live" / "journal.ndjson"
+    w = JournalWriter(journal)
+    # journal rows as bridge_contract writes them: payload under contract / fill
+    w.append(
+        {
+            "ts": "2025-10-30T23:58:00+00:00",
+            "type": "INTENT",
+            "contract": {"symbol": "EURUSD", "side": "BUY", "size": 0.3},
+        }
+    )
+    rec = ExecutionReconciler(journal)
+    rep = rec.update()
+    assert rep["summary"]["n_intents"] == 1 and rep["summary"]["n_fills"] == 0
+
+    w.append(
+        {
+            "ts": "2025-10-30T23:59:00+00:00",
+            "type": "FILL",
+            "fill": {"symbol": "EURUSD", "side": "BUY", "size_exec": 0.3, "price_exec": 1.1},
+        }
+    )
+    w.append(
+        {
+            "ts": "2025-10-31T00:01:00+00:00",
+            "type": "INTENT",
+            "contract": {"symbol": "EURUSD", "side": "BUY", "size": 0.3},
+        }
+    )
+    w.close()
+    assert len(sealed_segments(journal)) == 1
+
+    rep = rec.update()
+    assert rep["summary"]["n_intents"] == 2 and rep["summary"]["n_fills"] == 1
+    assert rep["pairs"][0]["latency_sec"] == 60.0
+    assert rec.update()["summary"] == rep["summary"]  # nothing new: nothing re-read
+
+    full = build_execution_report(tmp_path)
+    assert full["summary"] == rep["summary"]
+    assert build_execution_report(tmp_path, stream=True)["summary"] == rep["summary"]
+    day2 = build_execution_report(tmp_path, since="2025-10-31")
+    assert day2["summary"]["n_intents"] == 1
+
+
+def test_cursor_reads_late_rows_in_sealed_segments_and_several_rotations(tmp_path: Path):
+    journal = tmp_path / "journal.ndjson"
+    w = JournalWriter(journal)
+    cur = JournalCursor(journal)
+    w.append(_intent("2025-10-29T23:00:00Z"))
+    assert len(cur.read_new()) == 1
+
+    # two rotations between reads: the rest of day 1 and all of day 2 are picked up
+    w.append(_intent("2025-10-29T23:30:00Z"))
+    w.append(_intent("2025-10-30T12:00:00Z"))
+    w.append(_intent("2025-10-31T01:00:00Z"))
+    assert len(sealed_segments(journal)) == 2
+    got = cur.read_new()
+    assert [r["ts_utc"] for r in got] == [
+        "2025-10-29T23:30:00Z",
+        "2025-10-30T12:00:00Z",
+        "2025-10-31T01:00:00Z",
+    ]
+
+    # a late row lands in an already-read sealed segment
+    with sealed_segments(journal)[0].open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(_fill("2025-10-29T23:30:01Z")) + "\n")
+    assert [r["type"] for r in cur.read_new()] == ["FILL"]
+    assert cur.read_new() == []
+    w.close()
+
+
+def test_streaming_reconciler_settles_old_intents(tmp_path: Path):
+    journal = tmp_path / "artifacts" / "live" / "journal.ndjson"
+    w = JournalWriter(journal, rotate=None)
+    rec = ExecutionReconciler(journal, tolerance_sec=5.0, max_wait_sec=60.0, retain_sec=600.0)
+    t0 = datetime(2025, 10, 31, tzinfo=timezone.utc)
+    for i in range(200):
+        t = t0 + timedelta(minutes=i)
+        w.append(_intent(t.isoformat()))
+        if i % 3:
+            w.append(_fill((t + timedelta(seconds=i % 7)).isoformat(), px=1.1 + i * 1e-5))
+        if i % 4 == 0:
+            w.append(_fill((t - timedelta(seconds=30)).isoformat()))  # orphans
+        if i % 25 == 0:
+            rep = rec.update()
+            assert len(rec.intents.t_ns) <= 11 and len(rec.fills.t_ns) <= 23
+    w.close()
+
+    rep = rec.update()
+    full = build_execution_report(tmp_path, tolerance_sec=5.0, max_wait_sec=60.0)
+    assert rep["summary"] == full["summary"]
+    assert rep["summary"]["n_intents"] == 200
+    assert len(rep["pairs"]) == len(rec.intents.t_ns) <= 11
+
+
+def test_stream_reports_keep_a_bounded_reconciler_cache(tmp_path: Path):
+    _RECONCILERS.clear()
+    for k in range(_MAX_RECONCILERS + 3):
+        build_execution_report(tmp_path / str(k), stream=True)
+    kept = {Path(key[0]).parents[2].name for key in _RECONCILERS}
+    assert len(_RECONCILERS) == _MAX_RECONCILERS
+    assert kept == {str(k) for k in range(3, _MAX_RECONCILERS + 3)}
+    _RECONCILERS.clear()
@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from alpha_factory.meta_allocator import MetaAllocator
+from alpha_factory.runner import _load_corr, _pairs_to_corr
+from analytics.ewma_cov import EWMACovariance
+
+METRICS = {
+    "TF": {"sharpe": 1.1, "dd": 0.06},
+    "MR": {"sharpe": 1.0, "dd": 0.05},
+    "VOL": {"sharpe": 0.8, "dd": 0.04},
+}
+
+
+def test_corr_pairs_and_cov_state_give_the_same_penalty(tmp_path):
+    rng = np.random.default_rng(11)
+    base = rng.normal(0, 0.01, 500)
+    rets = pd.DataFrame(
+        {
+            "TF": base + rng.normal(0, 0.004, 500),
+            "MR": base + rng.normal(0, 0.006, 500),
+            "VOL": rng.normal(0, 0.01, 500),
+        }
+    )
+    est = EWMACovariance.from_frame(rets, halflife=60)
+    est.save(tmp_path / "cov.npz")
+    pairs = [[a, b, rho] for (a, b), rho in est.corr_pairs().items()]
+    (tmp_path / "corr.json").write_text(json.dumps(pairs), encoding="utf-8")
+
+    alloc = MetaAllocator()
+    from_pairs = alloc.allocate(METRICS, corr=_load_corr(tmp_path / "corr.json"))
+    from_state = alloc.allocate(METRICS, corr=_load_corr("", tmp_path / "cov.npz"))
+    assert from_pairs.keys() == from_state.keys()
+    for k in from_pairs:
+        assert abs(from_pairs[k] - from_state[k]) < 1e-12
+
+    # the penalty is really applied: correlated TF loses weight against no correlation
+    assert alloc.allocate(METRICS)["TF"] > from_pairs["TF"]
+
+
+def test_corr_pairs_keep_both_directions():
+    assert _pairs_to_corr([["A", "B", 0.5]]) == {("A", "B"): 0.5, ("B", "A"): 0.5}
@@ -11,3 +11,34 @@ def test_bayes_mode_normalizes():
 def test_empty_metrics_returns_empty():
     w = MetaAllocator().allocate({})
     assert w == {}
+
+
+def test_allocate_many_matches_rebalance_loop():
+    import pandas as pd
+
+    stacked = {
+        "2024-01-01": {"A": {"sharpe": 1.0, "dd": 0.05}, "B": {"sharpe": 0.8, "dd": 0.03}},
+        "2024-01-02": {
+            "A": {"sharpe": 0.4, "dd": 0.06},
+            "B": {"sharpe": 0.9, "dd": 0.03},
+            "C": {"sharpe": 0.5, "dd": 0.04},
+        },
+        "2024-01-03": {"B": {"sharpe": 0.7, "dd": 0.02}, "C": {"sharpe": 0.6, "dd": 0.04}},
+    }
+    pairs = {("A", "B"): 0.7, ("B", "C"): 0.5, ("A", "C"): -0.2}
+    alloc = MetaAllocator(AllocatorConfig(mode="bayes"))
+
+    W = alloc.allocate_many(stacked, corr=pairs, smooth=0.2)
+
+    prev = None
+    for date, metrics in stacked.items():
+        w = alloc.allocate(metrics, prev_weights=prev, corr=pairs, smooth=0.2)
+        for k in W.columns:
+            assert abs(W.loc[date, k] - w.get(k, 0.0)) < 1e-12
+        prev = w
+
+    corr = pd.DataFrame(
+        [[1, 0.7, -0.2], [0.7, 1, 0.5], [-0.2, 0.5, 1]], index=list("ABC"), columns=list("ABC")
+    )
+    day = alloc.allocate(stacked["2024-01-02"], corr=corr, smooth=0.0)
+    assert day == alloc.allocate(stacked["2024-01-02"], corr=pairs, smooth=0.0)
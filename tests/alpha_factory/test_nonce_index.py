@@ -0,0 +1,141 @@
+from pathlib import Path
+import json
+
+from alpha_factory.nonce_index import NonceIndex
+
+
+def _fill(nonce: str) -> dict:
+    return {"ts": "2025-01-01T00:00:00+00:00", "type": "FILL", "fill": {"ticket_nonce": nonce}}
+
+
+def test_nonce_index_snapshot_tail_and_external_appends(tmp_path: Path):
+    journal = tmp_path / "artifacts" / "live" / "journal.ndjson"
+    idx = NonceIndex(journal)
+    assert "n1" not in idx
+
+    idx.append({"ts": "t", "type": "INTENT", "contract": {"ticket_nonce": "n1"}})
+    assert "n1" not in idx  # intents do not count as fired
+    idx.append(_fill("n1"))
+    assert "n1" in idx
+
+    # another process (EA fill recorder) appends behind the index's back, plus junk lines
+    with journal.open("a", encoding="utf-8") as fh:
+        fh.write("=== operator banner ===\n\n")
+        fh.write(json.dumps(_fill("n2")) + "\n")
+        fh.write(json.dumps(_fill("n3"))[:-3])  # half-written line
+    assert "n2" in idx
+    assert "n3" not in idx
+
+    # restart: snapshot (written on close) + tail past the saved offset
+    idx.close()
+    snap = json.loads(idx.snapshot.read_text(encoding="utf-8"))
+    assert set(snap["nonces"]) == {"n1", "n2"}
+    with journal.open("a", encoding="utf-8") as fh:
+        fh.write('"}}\n')
+    idx2 = NonceIndex(journal)
+    assert {"n1", "n2", "n3"} <= idx2.nonces
+    assert idx2.offset == journal.stat().st_size
+
+    # journal replaced by a fresh file: snapshot is ignored and the index rebuilt
+    journal.write_text(json.dumps(_fill("other")) + "\n", encoding="utf-8")
+    idx3 = NonceIndex(journal)
+    assert "other" in idx3
+    assert "n1" not in idx3
+
+
+def test_nonce_index_follows_segment_rotation(tmp_path: Path):
+    from alpha_factory.live_journal import JournalWriter, sealed_segments
+
+    journal = tmp_path / "journal.ndjson"
+    w = JournalWriter(journal)
+    idx = NonceIndex(journal, writer=w)
+    idx.append({"ts": "2025-10-30T10:00:00+00:00", "type": "FILL", "fill": {"ticket_nonce": "d1"}})
+    assert "d1" in idx
+
+    # another process seals the day and starts a new active file, then records a fill
+    other = JournalWriter(journal)
+    other.append(
+        {"ts": "2025-10-30T23:59:00+00:00", "type": "FILL", "fill": {"ticket_nonce": "late"}}
+    )
+    other.append(
+        {"ts": "2025-10-31T00:01:00+00:00", "type": "FILL", "fill": {"ticket_nonce": "d2"}}
+    )
+    other.close()
+    assert len(sealed_segments(journal)) == 1
+    # "late" landed in the sealed file past the index's offset
+    assert "late" in idx and "d2" in idx and "d1" in idx
+    assert idx.offset == journal.stat().st_size
+
+    # a fresh process without snapshot still sees fills from sealed segments
+    idx.snapshot.unlink(missing_ok=True)
+    fresh = NonceIndex(journal)
+    assert {"d1", "late", "d2"} <= fresh.nonces
+    w.close()
+
+
+def test_nonce_index_throttles_snapshot_writes(tmp_path: Path):
+    journal = tmp_path / "journal.ndjson"
+    idx = NonceIndex(journal, save_every=3, save_interval=3600)
+    for n in ("a", "b"):
+        idx.append(_fill(n))
+        assert n in idx
+    assert not idx.snapshot.exists()  # two new nonces: not worth a rewrite yet
+
+    idx.append(_fill("c"))
+    assert set(json.loads(idx.snapshot.read_text(encoding="utf-8"))["nonces"]) == {"a", "b", "c"}
+
+    idx.append(_fill("d"))
+    with journal.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(_fill("e")) + "\n")
+    assert "e" in idx
+    assert len(json.loads(idx.snapshot.read_text(encoding="utf-8"))["nonces"]) == 3
+    idx.close()
+    snap = json.loads(idx.snapshot.read_text(encoding="utf-8"))
+    assert set(snap["nonces"]) == set("abcde") and snap["offset"] == journal.stat().st_size
+
+    # unsaved nonces are not lost after a crash: the journal past the snapshot is re-read
+    idx2 = NonceIndex(journal, save_every=100, save_interval=3600)
+    idx2.append(_fill("f"))
+    crashed = NonceIndex(journal)
+    assert set("abcdef") <= crashed.nonces
+
+
+def test_nonce_index_reads_every_new_segment_and_late_rows(tmp_path: Path):
+    from alpha_factory.live_journal import JournalWriter, sealed_segments
+
+    def fill(day: str, nonce: str) -> dict:
+        return {"ts": f"2025-{day}T12:00:00+00:00", "type": "FILL", "fill": {"ticket_nonce": nonce}}
+
+    journal = tmp_path / "journal.ndjson"
+    with JournalWriter(journal) as w:
+        w.append(fill("10-30", "d30"))
+    idx = NonceIndex(journal)
+    assert "d30" in idx
+
+    # two rotations between lookups: 10-30 and 10-31 are both sealed before the next one
+    with JournalWriter(journal) as w:
+        w.append(fill("10-30", "d30b"))
+        w.append(fill("10-31", "d31"))
+        w.append(fill("11-01", "d01"))
+    segs = sealed_segments(journal)
+    assert [p.name for p in segs] == ["2025-10-30.ndjson", "2025-10-31.ndjson"]
+    assert "d31" in idx
+    assert {"d30b", "d01"} <= idx.nonces
+
+    # a writer holding the old handle appends to a sealed segment after the index moved on
+    with segs[0].open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(fill("10-30", "late30")) + "\n")
+    assert "late30" in idx
+    assert idx.sealed.offsets[segs[0].name] == segs[0].stat().st_size
+
+    # the segment offsets survive a restart, so late rows are still picked up afterwards
+    idx.close()
+    with segs[1].open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(fill("10-31", "late31")) + "\n")
+    idx2 = NonceIndex(journal)
+    assert "late31" in idx2 and "late30" in idx2
+
+    # once quiet long enough a segment is final and no longer stat()ed
+    idx2.sealed.settle_sec = 0.0
+    idx2.refresh()
+    assert all(off is None for off in idx2.sealed.offsets.values())
@@ -35,3 +35,18 @@ def test_portfolio_targets_basic() -> None:
         row = targets.iloc[i]
         assert row.abs().sum() <= 1.0 + 1e-12
         assert (row.abs() <= 0.6 + 1e-12).all()
+
+
+def test_to_targets_with_time_varying_weights() -> None:
+    idx = pd.date_range("2024-01-01", periods=4, freq="h")
+    tf = pd.Series([1.0, 1.0, 1.0, 1.0], index=idx)
+    mr = pd.Series([-1.0, -1.0, -1.0], index=idx[1:])  # starts one bar later
+    weights = pd.DataFrame({"TF": [1.0, 0.25], "MR": [0.0, 0.75]}, index=[idx[0], idx[2]])
+
+    targets = to_targets(
+        {"TF": tf, "MR": mr}, weights, assets=["EURUSD", "GBPUSD"], per_asset_cap=0.6
+    )
+
+    # combo: 1.0, 1.0, 0.25 - 0.75 = -0.5, -0.5 -> equal split, gross capped at 1.0
+    assert targets["EURUSD"].tolist() == [0.5, 0.5, -0.25, -0.25]
+    assert (targets["EURUSD"] == targets["GBPUSD"]).all()
@@ -21,3 +21,30 @@ def test_registry_sync_roundtrip(tmp_path):
     names = [name for (name, _) in rows]
     for expected in registry.names():
         assert expected in names
+
+
+def test_batch_upsert_skips_unchanged_specs(tmp_path):
+    from src.alpha_factory.registry_db import sync_registry, upsert_factors
+
+    conn = sqlite3.connect(tmp_path / "alpha_registry.db")
+    # pre-spec_hash schema with one legacy row
+    conn.execute(
+        "CREATE TABLE factors (name TEXT PRIMARY KEY, params_json TEXT NOT NULL,"
+        " created_at TIMESTAMP, updated_at TIMESTAMP)"
+    )
+    conn.execute("INSERT INTO factors(name, params_json) VALUES ('legacy', '{\"n\": 1}')")
+    conn.commit()
+    init_db(conn)
+
+    stats = upsert_factors(conn, [("legacy", {"n": 1}), ("a", {"n": 2}), ("b", {"n": 3})])
+    assert (stats.inserted, stats.updated, stats.skipped) == (2, 0, 1)
+    assert conn.execute("SELECT spec_hash FROM factors WHERE name='legacy'").fetchone()[0]
+
+    stats = upsert_factors(conn, [("legacy", {"n": 1}), ("a", {"n": 20}), ("b", {"n": 3})])
+    assert (stats.inserted, stats.updated, stats.skipped) == (0, 1, 2)
+    assert dict(list_factors(conn))["a"] == {"n": 20}
+
+    first = sync_registry(registry, conn)
+    again = sync_registry(registry, conn)
+    assert first.inserted == len(registry.names())
+    assert (again.inserted, again.updated, again.skipped) == (0, 0, len(registry.names()))
@@ -0,0 +1,84 @@
+import alpha_factory.alpha_registry_ext_overrides_024  # noqa: F401
+import alpha_factory.registry_session as rs
+from alpha_factory.alpha_registry import AlphaRegistry
+from alpha_factory.registry_tooling_v027 import _con_for, alerts
+
+
+def test_session_shares_connection_and_runs_ddl_once(tmp_path, monkeypatch):
+    calls = []
+    real = rs.build_runs_view
+
+    def counting(con):
+        calls.append(1)
+        return real(con)
+
+    monkeypatch.setattr(rs, "build_runs_view", counting)
+
+    with AlphaRegistry(str(tmp_path / "r.duckdb")) as reg:
+        sess = rs.get_session(reg)
+        assert sess is rs.get_session(reg)
+        assert _con_for(reg) is reg.con is sess.con
+
+        # placeholder view before any alphas exist is retried, not cached
+        sess.ensure_runs_view()
+        reg.register("h1", {"sharpe": 1.0}, ["demo"])
+        reg.register("h2", {"sharpe": 2.0}, ["demo"])
+        for _ in range(5):
+            reg.rank(metric="sharpe", top_n=5)
+            reg.get_summary(metric="sharpe")
+        assert len(alerts(reg, metric="sharpe", min_value=1.5, tag="demo")) == 1
+        assert len(calls) == 2
+        assert len(sess._statements) == 3  # rank, summary, alerts' rank shape
+
+        # reopening on another path redoes the one-time setup
+        reg.db_path = str(tmp_path / "other.duckdb")
+        reg.register("h3", {"sharpe": 3.0})
+        assert list(reg.rank(metric="sharpe")["alpha_id"]) == ["h3"]
+        assert len(calls) == 3
+
+
+def test_result_cache_invalidated_by_writes(tmp_path):
+    db, cache = str(tmp_path / "r.duckdb"), tmp_path / "cache"
+    with AlphaRegistry(db) as reg:
+        sess = rs.get_session(reg)
+        sess.set_cache_dir(cache)
+        reg.register("h1", {"sharpe": 1.0}, ["demo"])
+        first = reg.get_summary(metric="sharpe")
+        hits = sess.cache.stats["hits"]
+        assert reg.get_summary(metric="sharpe").equals(first)
+        assert sess.cache.stats["hits"] == hits + 1
+
+        gen = reg.generation
+        reg.register("h2", {"sharpe": 2.0}, ["demo"])
+        assert reg.generation == gen + 1
+        assert len(reg.get_summary(metric="sharpe")) == 2
+
+        # direct SQL writes are picked up once the writer bumps the generation
+        reg.con.execute("DELETE FROM alphas WHERE config_hash = 'h1'")
+        reg.bump_generation()
+        assert list(reg.rank(metric="sharpe")["alpha_id"]) == ["h2"]
+
+    # a fresh process/session is served from the disk layer until the next write
+    with AlphaRegistry(db) as reg:
+        sess = rs.get_session(reg)
+        sess.set_cache_dir(cache)
+        reg.rank(metric="sharpe")
+        assert sess.cache.stats["disk_hits"] == 1
+
+
+def test_result_cache_not_served_for_recreated_database(tmp_path):
+    db, cache = tmp_path / "r.duckdb", tmp_path / "cache"
+    with AlphaRegistry(str(db)) as reg:
+        rs.get_session(reg).set_cache_dir(cache)
+        reg.register("old", {"sharpe": 1.0})
+        assert list(reg.rank(metric="sharpe")["alpha_id"]) == ["old"]
+        gen, inst = reg.generation, reg.instance
+
+    db.unlink()
+    with AlphaRegistry(str(db)) as reg:
+        sess = rs.get_session(reg)
+        sess.set_cache_dir(cache)
+        reg.register("new", {"sharpe": 2.0})
+        assert reg.generation == gen and reg.instance != inst  # same generation, new file
+        assert list(reg.rank(metric="sharpe")["alpha_id"]) == ["new"]
+        assert sess.cache.stats["disk_hits"] == 0
@@ -0,0 +1,117 @@
+import multiprocessing as mp
+
+import pytest
+
+import alpha_factory.registry_spool as registry_spool
+from alpha_factory.alpha_registry import AlphaRegistry
+from alpha_factory.registry_spool import RegistrySpool, SpoolError, SpoolWriter
+
+
+def _worker(args):
+    spool_dir, w = args
+    spool = RegistrySpool(spool_dir, batch_size=8)
+    tickets = [
+        spool.submit(f"w{w}-{i}", {"sharpe": float(i), "oos_r2": 0.5}, ["sweep"]) for i in range(20)
+    ]
+    spool.flush(wait=True, timeout=30)
+    return [spool.wait(t, timeout=30) for t in tickets]
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="needs the fork start method")
+def test_spool_batches_parallel_workers_into_registry(tmp_path):
+    spool_dir = str(tmp_path / "spool")
+    with AlphaRegistry(str(tmp_path / "r.duckdb")) as reg:
+        writer = SpoolWriter(reg, spool_dir)
+        thread = writer.start(interval=0.02)
+        try:
+            with mp.get_context("fork").Pool(4) as pool:
+                ids = pool.map(_worker, [(spool_dir, w) for w in range(4)])
+        finally:
+            assert thread.stop(timeout=10)
+
+        flat = [i for per in ids for i in per]
+        assert len(set(flat)) == 80
+        assert reg.con.execute("SELECT COUNT(*) FROM alphas").fetchone()[0] == 80
+        assert not writer.pending()
+        # tickets map to the right rows
+        row = reg.con.execute("SELECT config_hash FROM alphas WHERE id = ?", [ids[2][5]]).fetchone()
+        assert row[0] == "w2-5"
+        assert len(reg.search(metric="oos_r2", tag="sweep", limit=100)) == 80
+
+
+def test_drain_coalesces_pending_batches_into_one_insert(tmp_path):
+    spool = RegistrySpool(tmp_path / "spool", batch_size=2)
+    tickets = [spool.submit(f"h{i}", {"sharpe": i}) for i in range(5)]
+    spool.flush()
+    assert not spool.acked(tickets[0])
+    with AlphaRegistry(str(tmp_path / "r.duckdb")) as reg:
+        writer = SpoolWriter(reg, tmp_path / "spool")
+        assert writer.drain() == 5
+        assert writer.stats == {"batches": 3, "runs": 5, "inserts": 1, "quarantined": 0}
+        assert [spool.wait(t, timeout=1) for t in tickets] == [1, 2, 3, 4, 5]
+
+
+def test_failed_ack_is_retried_without_reinserting(tmp_path, monkeypatch, capsys):
+    spool = RegistrySpool(tmp_path / "spool", batch_size=2)
+    tickets = [spool.submit(f"h{i}", {"sharpe": i}) for i in range(4)]
+    spool.flush()
+    real = registry_spool._atomic_write
+    broken = {"n": 1}
+
+    def atomic_write(dst, payload):
+        if dst.parent.name == "acks" and broken["n"]:
+            broken["n"] -= 1
+            raise OSError("disk full")
+        real(dst, payload)
+
+    monkeypatch.setattr(registry_spool, "_atomic_write", atomic_write)
+    with AlphaRegistry(str(tmp_path / "r.duckdb")) as reg:
+        writer = SpoolWriter(reg, tmp_path / "spool")
+        assert writer.drain() == 4
+        assert "ack" in capsys.readouterr().err
+        assert len(writer.pending()) == 1 and not spool.acked(tickets[0])
+
+        assert writer.drain() == 0  # only the ack is written again
+        assert not writer.pending()
+        assert [spool.wait(t, timeout=1) for t in tickets] == [1, 2, 3, 4]
+        assert reg.con.execute("SELECT COUNT(*) FROM alphas").fetchone()[0] == 4
+        assert writer.stats["inserts"] == 1
+
+
+def test_bad_batches_are_quarantined_and_release_waiters(tmp_path, capsys):
+    root = tmp_path / "spool"
+    spool = RegistrySpool(root, batch_size=1)
+    good, bad = spool.submit("ok", {"sharpe": 1.0}), spool.submit("boom", {"sharpe": 2.0})
+    spool.flush()
+    (root / "pending" / "0-torn.json").write_text('[{"config_hash": "x"', encoding="utf-8")
+
+    with AlphaRegistry(str(tmp_path / "r.duckdb")) as reg:
+        writer = SpoolWriter(reg, root, max_attempts=2)
+        real = reg.register_many
+
+        def register_many(df):
+            if "boom" in set(df["config_hash"]):
+                raise ValueError("rejected")
+            return real(df)
+
+        reg.register_many = register_many
+        assert writer.drain() == 1  # the good batch goes in despite its failing neighbour
+        assert spool.wait(good, timeout=1) == 1
+        assert not spool.acked(bad)
+
+        assert writer.drain() == 0  # second failure: both bad files are set aside
+        assert writer.stats["quarantined"] == 2
+        assert not writer.pending()
+        assert sorted(p.name for p in (root / "quarantine").iterdir())[0] == "0-torn.json"
+        with pytest.raises(SpoolError, match="rejected"):
+            spool.wait(bad, timeout=1)
+        assert "quarantined" in capsys.readouterr().err
+
+        # a failing pass is logged, not fatal to the writer loop
+        def broken():
+            raise RuntimeError("db locked")
+
+        writer.drain = broken
+        thread = writer.start(interval=0.01)
+        assert thread.stop(timeout=5)
+        assert "db locked" in capsys.readouterr().err
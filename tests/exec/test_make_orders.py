@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from src.exec.make_orders import (
+    LastPriceProvider,
+    _csv_header_and_tail,
+    _last_row_parquet,
+    build_orders,
+)
+
+
+def _write(path, text: str):
+    path.write_bytes(text.encode("utf-8"))
+    return path
+
+
+@pytest.mark.parametrize("block", [1, 2, 3, 5, 7, 11, 8192])
+def test_csv_tail_skips_blank_and_crlf_lines_across_block_boundaries(tmp_path, block):
+    f = _write(
+        tmp_path / "p.csv",
+        "\ufeffts,close\r\n2024-01-01,1.25\r\n2024-01-02,1.5\r\n\r\n   \r\n",
+    )
+    assert _csv_header_and_tail(f, block=block) == (["ts", "close"], ["2024-01-02", "1.5"])
+
+
+@pytest.mark.parametrize("block", [1, 4, 9, 8192])
+def test_csv_tail_single_row_and_header_only(tmp_path, block):
+    one = _write(tmp_path / "one.csv", "ts,close\n2024-01-01,1.25")  # no trailing newline
+    assert _csv_header_and_tail(one, block=block) == (["ts", "close"], ["2024-01-01", "1.25"])
+
+    empty = _write(tmp_path / "empty.csv", "ts,close\n\n")
+    assert _csv_header_and_tail(empty, block=block) == (["ts", "close"], None)
+
+
+def test_csv_tail_line_longer_than_block(tmp_path):
+    long_ts = "2024-01-02T00:00:00.000000000+00:00"
+    f = _write(tmp_path / "p.csv", f"ts,close,note\n2024-01-01,1,a\n{long_ts},2,{'x' * 50}\n")
+    assert _csv_header_and_tail(f, block=16)[1] == [long_ts, "2", "x" * 50]
+
+
+def test_last_row_parquet_reads_final_row_group(tmp_path):
+    pytest.importorskip("pyarrow")
+    ts = pd.date_range("2024-01-01", periods=10, freq="D", tz="UTC")
+    df = pd.DataFrame({"ts": ts, "Close": [float(i) for i in range(10)]})
+    df.to_parquet(tmp_path / "a.parquet", row_group_size=3, index=False)
+    assert _last_row_parquet(tmp_path / "a.parquet") == (9.0, ts[-1])
+
+    # ts kept in the index instead of a column
+    df.set_index("ts")[["Close"]].rename(columns={"Close": "px"}).to_parquet(
+        tmp_path / "b.parquet", row_group_size=4
+    )
+    assert _last_row_parquet(tmp_path / "b.parquet") == (9.0, ts[-1])
+
+
+def test_staleness_with_mixed_timestamp_formats(tmp_path, capsys):
+    fresh = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    prices = tmp_path / "prices"
+    prices.mkdir()
+    _write(prices / "EURUSD.csv", f"ts,close\n{fresh},1.1\n")
+    _write(prices / "GBPUSD.csv", "ts,close\n01/02/2020 00:00,1.3\n")  # old, non-ISO
+    _write(prices / "USDJPY.csv", "close\n150.0\n")  # no ts: not checked
+    positions = _write(
+        tmp_path / "positions.csv",
+        "symbol,target_position\nEURUSD,0.1\nGBPUSD,-0.05\nUSDJPY,0.02\n",
+    )
+
+    snap = LastPriceProvider(prices).snapshot(["EURUSD", "GBPUSD", "USDJPY"])
+    assert snap["ts"].isna().tolist() == [False, False, True]
+    assert snap["ts"].iloc[1] == pd.Timestamp("2020-01-02", tz="UTC")
+
+    kw = dict(
+        positions_csv=positions,
+        contracts_csv=None,
+        prices_folder=prices,
+        nav=1_000_000.0,
+        gross_cap=0.2,
+        max_price_age_days=7,
+        max_dev_bps=500,
+    )
+    out = build_orders(out_csv=tmp_path / "warn.csv", skip_stale=False, **kw)
+    assert out["symbol"].tolist() == ["EURUSD", "GBPUSD", "USDJPY"]
+    assert "WARN: GBPUSD price is stale" in capsys.readouterr().out
+
+    out = build_orders(out_csv=tmp_path / "skip.csv", skip_stale=True, **kw)
+    assert out["symbol"].tolist() == ["EURUSD", "USDJPY"]
+    assert "SKIP: GBPUSD price is stale" in capsys.readouterr().out
+
+
+def test_flat_book_builds_no_orders(tmp_path):
+    prices = tmp_path / "prices"
+    prices.mkdir()
+    positions = _write(tmp_path / "positions.csv", "symbol,target_position\n")
+    assert LastPriceProvider(prices).snapshot([])["symbol"].dtype == object
+    out = build_orders(
+        positions_csv=positions,
+        contracts_csv=None,
+        prices_folder=prices,
+        nav=1_000_000.0,
+        gross_cap=0.2,
+        max_price_age_days=7,
+        max_dev_bps=500,
+        skip_stale=True,
+        out_csv=tmp_path / "orders.csv",
+    )
+    assert out.empty
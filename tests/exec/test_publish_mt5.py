@@ -0,0 +1,96 @@
+import threading
+import time
+import types
+
+from src.exec.publish_mt5 import dispatch_orders, infer_fill_pref, send_orders
+
+
+def _fake_mt5(delay: float = 0.02, filling: dict | None = None):
+    """MetaTrader5 stand-in recording every order_send; `filling` = {symbol: accepted modes}."""
+    mt5 = types.ModuleType("MetaTrader5")
+    mt5.ORDER_TYPE_BUY, mt5.ORDER_TYPE_SELL = 0, 1
+    mt5.TRADE_ACTION_DEAL, mt5.ORDER_TIME_GTC = 1, 0
+    mt5.TRADE_RETCODE_DONE, RETCODE_INVALID_FILL = 10009, 10030
+    lock = threading.Lock()
+    mt5.sent, mt5.selected, mt5.in_flight, mt5.max_in_flight = [], [], 0, 0
+
+    def symbol_info(sym):
+        return types.SimpleNamespace(visible=sym != "US30")
+
+    def symbol_select(sym, enable):
+        mt5.selected.append(sym)
+        return True
+
+    def order_send(req):
+        with lock:
+            mt5.in_flight += 1
+            mt5.max_in_flight = max(mt5.max_in_flight, mt5.in_flight)
+        time.sleep(delay)
+        with lock:
+            mt5.in_flight -= 1
+            mt5.sent.append(dict(req))
+        ok = req.get("type_filling") in (filling or {}).get(req["symbol"], {None, 0, 1, 2})
+        code = mt5.TRADE_RETCODE_DONE if ok else RETCODE_INVALID_FILL
+        return types.SimpleNamespace(retcode=code, comment="done" if ok else "unsupported filling")
+
+    mt5.symbol_info, mt5.symbol_select, mt5.order_send = symbol_info, symbol_select, order_send
+    return mt5
+
+
+def _orders():
+    out = []
+    for k in range(4):
+        for sym in ("EURUSD", "GBPUSD", "US30", "XAUUSD", "DE40", "USDJPY"):
+            out.append(
+                {
+                    "symbol": sym,
+                    "side": "BUY",
+                    "volume": 0.1 * (k + 1),
+                    "type": 0,
+                    "price": 1.0,
+                    "deviation": 10,
+                    "fills": infer_fill_pref(sym, None),
+                }
+            )
+    return out
+
+
+def test_dispatch_keeps_symbol_order_and_bounds_concurrency():
+    orders = _orders()
+    api = _fake_mt5()
+    res = dispatch_orders(orders, workers=3, api=api, serialize=False)
+
+    assert res["ok"].all() and len(res) == len(orders)
+    assert res["symbol"].tolist() == [o["symbol"] for o in orders]  # rows in input order
+    for sym in {o["symbol"] for o in orders}:
+        sent = [r["volume"] for r in api.sent if r["symbol"] == sym]
+        assert sent == [o["volume"] for o in orders if o["symbol"] == sym]
+    assert 1 < api.max_in_flight <= 3
+    assert api.selected == ["US30"]  # only the invisible symbol is selected, once
+    assert (res["latency_ms"] >= 20).all()
+
+
+def test_dispatch_serializes_api_calls_by_default():
+    api = _fake_mt5(delay=0.005)
+    res = dispatch_orders(_orders(), workers=4, api=api)
+    assert res["ok"].all()
+    assert api.max_in_flight == 1
+
+
+def test_fill_mode_fallback_and_failures(capsys):
+    # DE40 only takes FOK; EURUSD rejects every explicit mode and the default
+    api = _fake_mt5(delay=0.01, filling={"DE40": {2}, "EURUSD": set()})
+    orders = [o for o in _orders()[:6] if o["symbol"] in ("DE40", "EURUSD", "USDJPY")]
+    res = dispatch_orders(orders, workers=2, api=api).set_index("symbol")
+
+    assert res.loc["USDJPY", ["ok", "fill_mode", "attempts"]].tolist() == [True, 1, 1]
+    assert res.loc["DE40", ["ok", "fill_mode", "attempts"]].tolist() == [True, 2, 3]
+    assert [t[0] for t in res.loc["DE40", "tried"]] == [0, 1, 2]
+    assert res.loc["DE40", "latency_ms"] >= 30  # all three attempts are timed
+    assert not res.loc["EURUSD", "ok"]
+    assert res.loc["EURUSD", "attempts"] == 4 and res.loc["EURUSD", "retcode"] == 10030
+
+    assert send_orders(orders, workers=2, api=api) == {
+        "EURUSD": "check contract settings / fill modes"
+    }
+    assert "[EURUSD] order failed" in capsys.readouterr().out
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from core.feature_graph import FeatureGraph
+from core.metrics import realized_vol
+from src.alpha_factory import registry
+
+
+def _close(n=300):
+    rng = np.random.default_rng(7)
+    idx = pd.date_range("2024-01-01", periods=n, freq="h")
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.001, n))), index=idx, name="close")
+
+
+def test_shared_primitives_computed_once():
+    s = _close()
+    g = FeatureGraph()
+    names = ["sma_cross_10_30", "sma_slope_30_1", "sma_slope_10_2", "rsi_thresh_14_30_70"]
+    for name in names:
+        plain = registry.make(name).compute(s)
+        pd.testing.assert_series_equal(registry.make(name).compute(s, graph=g), plain)
+    # unique windows: sma10, sma30, rsi14 -> 3 misses, the rest are hits
+    assert g.stats["misses"] == 3
+    assert g.stats["hits"] == 2
+
+
+def test_disk_cache_and_fingerprint(tmp_path):
+    s = _close()
+    g1 = FeatureGraph(cache_dir=tmp_path)
+    a = g1.compute("ema", g1.source(s, "EURUSD", "H1"), span=20)
+    g2 = FeatureGraph(cache_dir=tmp_path)
+    b = g2.compute("ema", g2.source(s.copy(), "EURUSD", "H1"), span=20)
+    assert g2.stats == {"hits": 0, "disk_hits": 1, "misses": 0}
+    pd.testing.assert_series_equal(a, b)
+    # new data -> new fingerprint -> recompute
+    g2.compute("ema", g2.source(s * 1.01, "EURUSD", "H1"), span=20)
+    assert g2.stats["misses"] == 1
+
+
+def test_realized_vol_via_graph_matches():
+    s = _close()
+    g = FeatureGraph()
+    pd.testing.assert_series_equal(realized_vol(s, 20, "1h", graph=g), realized_vol(s, 20, "1h"))
@@ -80,3 +80,107 @@ def test_atomic_write_no_partial_on_failure(fs_tmp, monkeypatch):
     assert not dst.exists()
     tmps = list((fs_tmp / "objects").glob("*.tmp.*"))
     assert not tmps
+
+
+def test_put_many_get_many_roundtrip(fs_tmp):
+    fs = FeatureStore(fs_tmp)
+    items = {f"sym/{i}": {"i": i} for i in range(20)}
+    paths = fs.put_many(items)
+    assert [p.name for p in paths] == [f"{_key_sha1(k)}.pkl" for k in items]
+    assert fs.get_many(list(items)) == list(items.values())
+    # same digests as single put()
+    assert fs.get("sym/3") == {"i": 3}
+    assert not list((fs_tmp / "objects").glob("*.tmp.*"))
+
+
+def test_put_many_collision_writes_nothing(fs_tmp):
+    fs = FeatureStore(fs_tmp)
+    fs.put("a", 1)
+    with pytest.raises(FileExistsError):
+        fs.put_many([("b", 2), ("a", 3)])
+    assert not fs.exists("b")
+    assert fs.get("a") == 1
+    fs.put_many([("b", 2), ("a", 3)], overwrite=True)
+    assert fs.get_many(["a", "b"]) == [3, 2]
+
+
+def test_put_many_syncs_once_per_batch(fs_tmp, monkeypatch):
+    import os
+
+    calls = {"fsync": 0, "sync": 0}
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        calls["fsync"] += 1
+        real_fsync(fd)
+
+    monkeypatch.setattr(os, "fsync", fsync)
+    monkeypatch.setattr(os, "sync", lambda: calls.__setitem__("sync", calls["sync"] + 1))
+    fs = FeatureStore(fs_tmp)
+    fs.put_many({f"k/{i}": i for i in range(10)})
+    assert calls["sync"] == 1
+    assert calls["fsync"] <= 1  # only the objects directory
+
+    calls.update(fsync=0, sync=0)
+    fs.put_many({f"k/{i}": i for i in range(10)}, overwrite=True, fsync_each=True)
+    assert calls["sync"] == 0 and calls["fsync"] >= 10
+    assert fs.get_many(["k/0", "k/9"]) == [0, 9]
+
+
+def test_put_many_failure_leaves_no_partial(fs_tmp, monkeypatch):
+    fs = FeatureStore(fs_tmp)
+
+    def boom_dump(*args, **kwargs):
+        raise RuntimeError("serialize fail")
+
+    monkeypatch.setattr(pickle, "dump", boom_dump)
+    with pytest.raises(RuntimeError):
+        fs.put_many([("x", 1), ("y", 2)])
+    assert not list((fs_tmp / "objects").iterdir())
+
+
+def test_manifest_lookup_entries_and_gc(fs_tmp):
+    fs = FeatureStore(fs_tmp)
+    fs.put("prices/EURUSD", 1)
+    fs.put("prices/GBPUSD", 2)
+    fs.put("signals/EURUSD", 3)
+    e = fs.lookup("prices/EURUSD")
+    assert e["digest"] == _key_sha1("prices/EURUSD")
+    assert e["namespace"] == "prices" and e["size"] > 0
+    assert fs.lookup("nope") is None
+    assert [x["name"] for x in fs.entries(namespace="prices")] == [
+        "prices/EURUSD",
+        "prices/GBPUSD",
+    ]
+    assert [x["name"] for x in fs.entries("signals/")] == ["signals/EURUSD"]
+
+    stray = fs_tmp / "objects" / ("0" * 40 + ".pkl")
+    stray.write_bytes(b"x")
+    assert fs.gc() == [stray.name]
+    assert not stray.exists()
+    fs.delete("signals/EURUSD")
+    assert set(fs.list()) == {_key_sha1("prices/EURUSD"), _key_sha1("prices/GBPUSD")}
+
+
+def test_manifest_adopts_legacy_layout(fs_tmp):
+    objects = fs_tmp / "objects"
+    objects.mkdir(parents=True)
+    digest = _key_sha1("old")
+    with (objects / f"{digest}.pkl").open("wb") as f:
+        pickle.dump(41, f)
+    (fs_tmp / "provenance.id").write_text("7")
+    fs = FeatureStore(fs_tmp)
+    assert list(fs.list()) == [digest]
+    assert fs.gc() == []
+    assert fs.get("old") == 41
+    assert fs.record_provenance("EURUSD", kind="prices") == 8
+
+
+def test_prices_pointer_roundtrip(fs_tmp):
+    import pandas as pd
+
+    fs = FeatureStore(fs_tmp)
+    df = pd.DataFrame({"close": [1.0, 2.0]})
+    assert fs.upsert_prices("EURUSD", df) == 2
+    pd.testing.assert_frame_equal(fs.get_prices("EURUSD"), df)
+    assert fs.entries(namespace="prices")[0]["schema_fp"] is not None
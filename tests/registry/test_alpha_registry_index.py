@@ -0,0 +1,61 @@
+import random
+
+from src.registry.alpha_registry import AlphaRegistry
+
+
+def _brute(reg, metric, lo=None, hi=None, tag=None):
+    rows = []
+    for e in reg._by_id.values():
+        m = {k.lower(): v for k, v in e.metrics.items()}
+        if metric not in m:
+            continue
+        v = float(m[metric])
+        if (lo is not None and v < lo) or (hi is not None and v > hi):
+            continue
+        if tag is not None and tag not in e.tags:
+            continue
+        rows.append((v, e.ts, e.id))
+    rows.sort(reverse=True)
+    return [r[2] for r in rows]
+
+
+def test_indexed_queries_match_full_scan():
+    rng = random.Random(7)
+    reg = AlphaRegistry()
+    tags = ["fx", "eq", "wf", "rare"]
+    for i in range(500):
+        t = rng.sample(tags[:3], 2) + (["rare"] if i % 97 == 0 else [])
+        reg.register(f"c{i}", {"Sharpe": round(rng.gauss(0, 1), 2), "ret": rng.random()}, t)
+
+    assert [r[0] for r in reg.get_best("sharpe", 25)] == _brute(reg, "sharpe")[:25]
+    for lo, hi, tag in [
+        (0.0, 1.0, None),
+        (-0.5, 0.5, "fx"),
+        (None, 0.0, "rare"),
+        (0.5, None, "wf"),
+    ]:
+        got = [r[0] for r in reg.search("sharpe", min=lo, max=hi, tag=tag, limit=1000)]
+        assert got == _brute(reg, "sharpe", lo, hi, tag)
+
+    ranked = reg.rank(metric="ret", top_n=5, filters={"tag": "rare"})
+    assert list(ranked["id"]) == _brute(reg, "ret", tag="rare")[:5]
+    assert reg.get_latest("rare")[0] == 486
+    assert [r[0] for r in reg.list_recent(tag="eq", limit=3)] == sorted(
+        (e.id for e in reg._by_id.values() if "eq" in e.tags), reverse=True
+    )[:3]
+
+    summary = reg.get_summary(metric="ret")
+    vals = sorted(e.metrics["ret"] for e in reg._by_id.values())
+    assert summary["count"][0] == 500
+    assert abs(summary["median"][0] - (vals[249] + vals[250]) / 2) < 1e-12
+
+
+def test_lineage_children_map():
+    reg = AlphaRegistry()
+    reg.register_run({"alpha_id": "a", "run_hash": "r1"})
+    reg.register_run({"alpha_id": "a", "run_hash": "r2", "parent_run": "r1"})
+    reg.register_run({"alpha_id": "a", "run_hash": "r3", "parent_run": "r1"})
+    reg.register_run({"alpha_id": "b", "run_hash": "r4", "parent_run": "r2"})
+    assert reg.get_children("r1") == ["r2", "r3"]
+    assert reg.get_children("r1", recursive=True) == ["r2", "r4", "r3"]
+    assert len(reg.get_lineage("a")) == 3
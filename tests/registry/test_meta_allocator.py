@@ -29,3 +29,18 @@ def test_bayes_allocator_prefers_better_sleeve():
     W = alloc.allocate(rets)
     assert np.allclose(W.sum(axis=1).values, 1.0, atol=1e-8)
     assert W["A"].mean() > W["B"].mean()
+
+
+def test_online_update_matches_batch_allocation():
+    rets = _make_returns(n=120, seed=3)
+    for alloc in (
+        MetaAllocator(mode="ewma", ewma_cfg=EWMAConfig(expand_blend=0.3, global_blend=0.3)),
+        MetaAllocator(mode="bayes", bayes_cfg=BayesConfig(window=30)),
+    ):
+        alloc.allocate(rets.iloc[:100])
+        online = alloc.update(rets.iloc[100:])
+        # each online row is the last row of a batch allocation over the history so far
+        batch = [alloc.allocate(rets.iloc[: i + 1]).iloc[-1] for i in range(100, 120, 7)]
+        assert np.allclose(online.iloc[::7].to_numpy(), np.vstack(batch), atol=1e-12)
+        w = alloc.update(rets.iloc[-1])
+        assert list(w.index) == ["A", "B", "C"] and np.isclose(w.sum(), 1.0)
@@ -44,3 +44,43 @@ if HAS_DUCKDB:
         v1 = fs.get("feat_duck", version=1)
         assert v1["value"].iloc[0] == df["value"].iloc[0]
         fs.close()
+
+
+def _check_as_of(fs):
+    ts = pd.date_range("2024-01-01", periods=3, freq="D")
+    fs.register(
+        "px",
+        pd.DataFrame({"asof": ts.repeat(2), "symbol": ["EURUSD", "XAUUSD"] * 3, "value": range(6)}),
+    )
+    fs.register("carry", pd.DataFrame({"asof": ts[:1], "symbol": ["EURUSD"], "value": [9.0]}))
+    events = pd.DataFrame(
+        {
+            "symbol": ["EURUSD", "XAUUSD", "EURUSD", "EURUSD"],
+            "asof": [ts[1] + pd.Timedelta(hours=5), ts[2], ts[0] - pd.Timedelta(hours=1), ts[2]],
+            "label": [1, 0, 1, 0],
+        },
+        index=[10, 11, 12, 13],
+    )
+    out = fs.as_of(events, ["px", "carry"])
+    assert list(out.index) == [10, 11, 12, 13]
+    # latest value at or before each event; nothing before the first bar
+    assert out["px"].tolist()[:2] == [2.0, 5.0]
+    assert pd.isna(out["px"].iloc[2])
+    assert out["carry"].iloc[3] == 9.0
+
+    stale = fs.as_of(events, {"carry": 1}, tolerance=pd.Timedelta(days=1))
+    assert pd.isna(stale["carry"].iloc[3])
+
+
+def test_sqlite_as_of(tmp_path: Path):
+    fs = FeatureStore(tmp_path / "store.sqlite")
+    _check_as_of(fs)
+    fs.close()
+
+
+if HAS_DUCKDB:
+
+    def test_duckdb_as_of(tmp_path: Path):
+        fs = FeatureStore(tmp_path / "store.duckdb")
+        _check_as_of(fs)
+        fs.close()
@@ -51,3 +51,80 @@ def test_upsert_and_query_roundtrip(tmp_path):
     assert pd.notna(
         wide.loc[wide["ts"] == pd.Timestamp("2024-01-01 01:00:00+0000", tz="UTC"), "ma_slope"]
     ).any()
+
+
+def test_upsert_frame_replaces_on_primary_key(tmp_path):
+    fs = FeatureStore(str(tmp_path / "fs.duckdb"))
+    ts = pd.Timestamp("2024-01-01", tz="UTC")
+    df = pd.DataFrame(
+        {
+            "symbol": ["EURUSD", "EURUSD", "EURUSD"],
+            "ts": [ts, ts, ts + pd.Timedelta(hours=1)],
+            "name": ["rsi", "rsi", "rsi"],
+            "value": [1.0, 2.0, 3.0],
+        }
+    )
+    assert fs.upsert_frame(df) == 3
+    # last row per key wins inside a batch
+    assert fs.query("EURUSD")["value"].tolist() == [2.0, 3.0]
+
+    df2 = df.iloc[[2]].assign(value=9.0)
+    fs.upsert_frame(df2)
+    assert fs.query("EURUSD")["value"].tolist() == [2.0, 9.0]
+    assert fs.con.execute("SELECT count(*) FROM feature_store").fetchone()[0] == 2
+
+
+def test_wide_pivot_in_duckdb_and_arrow(tmp_path):
+    fs = FeatureStore(str(tmp_path / "fs.duckdb"))
+    ts = pd.date_range("2024-01-01", periods=3, freq="h", tz="UTC")
+    df = pd.DataFrame(
+        {
+            "symbol": ["EURUSD"] * 6 + ["GBPUSD"] * 3,
+            "ts": list(ts) * 3,
+            "name": ["rsi"] * 3 + ["ema"] * 3 + ["rsi"] * 3,
+            "value": [float(i) for i in range(9)],
+        }
+    )
+    fs.upsert_frame(df)
+
+    wide = fs.pivot_wide("EURUSD", start=ts[1])
+    assert list(wide.columns) == ["ts", "ema", "rsi"]
+    assert wide["rsi"].tolist() == [1.0, 2.0]
+
+    pytest.importorskip("pyarrow")
+    tbl = fs.wide_arrow(["EURUSD", "GBPUSD"], names=["rsi"])
+    assert tbl.column_names == ["symbol", "ts", "rsi"]
+    assert tbl.num_rows == 6
+    assert tbl.column("rsi").to_pylist()[3:] == [6.0, 7.0, 8.0]
+
+
+def test_upsert_frame_last_duplicate_wins_in_large_batch(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    fs = FeatureStore(str(tmp_path / "fs.duckdb"))
+    ts = pd.Timestamp("2024-01-01", tz="UTC")
+    n = 50_000
+    df = pd.DataFrame(
+        {
+            "symbol": ["EURUSD"] * n,
+            "ts": [ts + pd.Timedelta(minutes=i % 100) for i in range(n)],
+            "name": ["rsi"] * n,
+            "value": [float(i) for i in range(n)],
+        }
+    )
+    fs.upsert_frame(df)
+    assert fs.query("EURUSD")["value"].tolist() == [float(n - 100 + i) for i in range(100)]
+
+    fs.upsert_frame(pa.Table.from_pandas(df.assign(value=-df["value"]), preserve_index=False))
+    assert fs.query("EURUSD")["value"].tolist() == [-float(n - 100 + i) for i in range(100)]
+
+
+def test_reads_with_no_symbols_are_empty(tmp_path):
+    fs = FeatureStore(str(tmp_path / "fs.duckdb"))
+    ts = pd.Timestamp("2024-01-01", tz="UTC")
+    fs.upsert([{"symbol": "EURUSD", "ts": ts, "name": "rsi", "value": 1.0}])
+    assert fs.query([]).empty
+
+    pytest.importorskip("pyarrow")
+    assert fs.query_arrow([]).num_rows == 0
+    tbl = fs.wide_arrow([])
+    assert tbl.num_rows == 0 and tbl.column_names == ["symbol", "ts"]
@@ -0,0 +1,102 @@
+"""
+Throughput benchmark for the DuckDB long-format feature store (src/store/feature_store.py).
+
+Compares the legacy row-wise upsert (executemany DELETE + executemany INSERT) with the
+bulk Arrow/DataFrame path (single INSERT OR REPLACE in one transaction).
+
+    python tools/Bench-FeatureStore.py --rows 1000000 --legacy-rows 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.store.feature_store import FeatureStore  # noqa: E402
+
+LEGACY_DDL = """
+CREATE TABLE IF NOT EXISTS feature_store (
+    symbol TEXT, ts TIMESTAMPTZ, name TEXT, value DOUBLE, ver TEXT
+)
+"""
+
+
+def make_rows(n: int, symbols: int = 10, names: int = 10) -> pd.DataFrame:
+    per = max(1, n // (symbols * names))
+    ts = pd.date_range("2020-01-01", periods=per, freq="h", tz="UTC")
+    idx = pd.MultiIndex.from_product(
+        [[f"S{i:03d}" for i in range(symbols)], ts, [f"f{j}" for j in range(names)]],
+        names=["symbol", "ts", "name"],
+    )
+    df = idx.to_frame(index=False)
+    df["value"] = np.random.default_rng(0).standard_normal(len(df))
+    df["ver"] = "v1"
+    return df.iloc[:n]
+
+
+def bench_legacy(path: str, df: pd.DataFrame) -> float:
+    import duckdb
+
+    con = duckdb.connect(path)
+    con.execute(LEGACY_DDL)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_fs_sym_ts ON feature_store(symbol, ts)")
+    data = list(df[["symbol", "ts", "name", "value", "ver"]].itertuples(index=False, name=None))
+    keys = [(s, t, n, v) for (s, t, n, _, v) in data]
+    t0 = time.perf_counter()
+    con.executemany("DELETE FROM feature_store WHERE symbol=? AND ts=? AND name=? AND ver=?", keys)
+    con.executemany(
+        "INSERT INTO feature_store(symbol, ts, name, value, ver) VALUES (?,?,?,?,?)", data
+    )
+    dt = time.perf_counter() - t0
+    con.close()
+    return dt
+
+
+def bench_bulk(path: str, df: pd.DataFrame, arrow: bool) -> tuple[float, float]:
+    fs = FeatureStore(path)
+    data = df
+    if arrow:
+        import pyarrow as pa
+
+        data = pa.Table.from_pandas(df, preserve_index=False)
+    t0 = time.perf_counter()
+    fs.upsert_frame(data)
+    first = time.perf_counter() - t0
+    # second pass hits the REPLACE path on every key
+    t0 = time.perf_counter()
+    fs.upsert_frame(data)
+    second = time.perf_counter() - t0
+    fs.con.close()
+    return first, second
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, default=1_000_000, help="rows for the bulk path")
+    ap.add_argument("--legacy-rows", type=int, default=20_000, help="rows for the legacy path")
+    ap.add_argument("--arrow", action="store_true", help="feed a pyarrow.Table instead of pandas")
+    ns = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        legacy_df = make_rows(ns.legacy_rows)
+        dt = bench_legacy(str(Path(d) / "legacy.duckdb"), legacy_df)
+        print(
+            f"legacy executemany : {len(legacy_df):>9,} rows  {len(legacy_df) / dt:>12,.0f} rows/s"
+        )
+
+        df = make_rows(ns.rows)
+        first, second = bench_bulk(str(Path(d) / "bulk.duckdb"), df, ns.arrow)
+        print(f"bulk insert        : {len(df):>9,} rows  {len(df) / first:>12,.0f} rows/s")
+        print(f"bulk replace       : {len(df):>9,} rows  {len(df) / second:>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
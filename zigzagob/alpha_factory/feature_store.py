@@ -129,6 +129,11 @@ class FeatureStore:
                 )
                 """
             )
+            # Per-symbol range index for as-of lookups (latest row with asof <= t)
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_features_data_sym_asof "
+                "ON features_data(feature_id, symbol, asof)"
+            )
             self._conn.commit()
 
     # ------------------------------ Utilities ------------------------------
@@ -345,6 +350,133 @@ class FeatureStore:
                 df["asof"] = pd.to_datetime(df["asof"], utc=True).dt.tz_localize(None)
             return df
 
+    def _feature_ids(self, features) -> list[tuple[str, str]]:
+        """Resolve [name, ...] (latest) or {name: version} to [(name, feature_id), ...]."""
+        items = features.items() if isinstance(features, dict) else [(f, None) for f in features]
+        out = []
+        for name, version in items:
+            if version is None:
+                version = self.latest_version(name)
+                if version is None:
+                    raise KeyError(f"No feature registered with name '{name}'.")
+            sql = "SELECT feature_id FROM features_meta WHERE name = ? AND version = ?"
+            if self.backend == "duckdb":
+                row = self._conn.execute(sql, [name, version]).fetchone()
+            else:
+                row = self._conn.cursor().execute(sql, (name, version)).fetchone()
+            if not row:
+                raise KeyError(f"Feature not found: {name} v{version}")
+            out.append((name, row[0]))
+        return out
+
+    def as_of(
+        self,
+        events: pd.DataFrame,
+        features,
+        *,
+        asof_col: str = "asof",
+        symbol_col: str = "symbol",
+        tolerance: Optional[pd.Timedelta] = None,
+    ) -> pd.DataFrame:
+        """
+        Point-in-time join: for every event row (symbol, event time) attach the latest value
+        of each feature with feature.asof <= event time, so no look-ahead can leak in.
+
+        features: list of names (latest version each) or {name: version}.
+        tolerance: optional max staleness; older matches come back as NaN.
+        Returns a copy of events (same index/order) with one column per feature name.
+        DuckDB runs a single ASOF JOIN per feature; SQLite uses indexed range lookups.
+        """
+        missing = {asof_col, symbol_col} - set(events.columns)
+        if missing:
+            raise ValueError(f"events missing required columns: {sorted(missing)}")
+        fids = self._feature_ids(features)
+        ev = pd.DataFrame(
+            {
+                "_rid": range(len(events)),
+                "symbol": events[symbol_col].astype(str).to_numpy(),
+                "ts": pd.to_datetime(events[asof_col], utc=True)
+                .dt.tz_localize(None)
+                .to_numpy(),
+            }
+        )
+        out = events.copy()
+        if self.backend == "duckdb":
+            cols = self._as_of_duckdb(ev, fids, tolerance)
+        else:
+            cols = self._as_of_sqlite(ev, fids, tolerance)
+        for name, _ in fids:
+            out[name] = cols[name]
+        return out
+
+    def _as_of_duckdb(self, ev: pd.DataFrame, fids, tolerance) -> dict:
+        selects, joins, params = [], [], []
+        for i, (name, fid) in enumerate(fids):
+            alias = f"f{i}"
+            joins.append(
+                f'ASOF LEFT JOIN (SELECT "asof", symbol, value FROM features_data '
+                f"WHERE feature_id = ?) {alias} "
+                f'ON e.symbol = {alias}.symbol AND e.ts >= {alias}."asof"'
+            )
+            params.append(fid)
+            if tolerance is None:
+                selects.append(f"{alias}.value AS v{i}")
+            else:
+                secs = pd.Timedelta(tolerance).total_seconds()
+                selects.append(
+                    f'CASE WHEN e.ts - {alias}."asof" <= to_seconds({secs}) '
+                    f"THEN {alias}.value END AS v{i}"
+                )
+        sql = f"SELECT e._rid, {', '.join(selects)} FROM _asof_events e {' '.join(joins)}"
+        sql += " ORDER BY e._rid"
+        self._conn.register("_asof_events", ev)
+        try:
+            res = self._conn.execute(sql, params).fetchnumpy()
+        finally:
+            with contextlib.suppress(Exception):
+                self._conn.unregister("_asof_events")
+        return {
+            name: pd.to_numeric(pd.Series(res[f"v{i}"]), errors="coerce").to_numpy()
+            for i, (name, _) in enumerate(fids)
+        }
+
+    def _as_of_sqlite(self, ev: pd.DataFrame, fids, tolerance) -> dict:
+        cur = self._conn.cursor()
+        ts = pd.to_datetime(ev["ts"])
+        lo = (ts - pd.Timedelta(tolerance)) if tolerance is not None else None
+        rows = list(
+            zip(
+                ev["_rid"].tolist(),
+                ev["symbol"].tolist(),
+                ts.dt.strftime(ISO_FMT).tolist(),
+                lo.dt.strftime(ISO_FMT).tolist() if lo is not None else [""] * len(ev),
+            )
+        )
+        cur.execute("DROP TABLE IF EXISTS temp._asof_events")
+        cur.execute("CREATE TEMP TABLE _asof_events (rid INTEGER, symbol TEXT, ts TEXT, lo TEXT)")
+        cur.executemany("INSERT INTO temp._asof_events VALUES (?, ?, ?, ?)", rows)
+        try:
+            out = {}
+            for name, fid in fids:
+                # Correlated lookup walks idx_features_data_sym_asof backwards: O(log n) per event
+                got = cur.execute(
+                    """
+                    SELECT e.rid, (
+                        SELECT d.value FROM features_data d
+                        WHERE d.feature_id = ? AND d.symbol = e.symbol
+                          AND d.asof <= e.ts AND d.asof >= e.lo
+                        ORDER BY d.asof DESC LIMIT 1
+                    ) FROM temp._asof_events e ORDER BY e.rid
+                    """,
+                    (fid,),
+                ).fetchall()
+                out[name] = pd.to_numeric(
+                    pd.Series([v for _, v in got], dtype="object"), errors="coerce"
+                ).to_numpy()
+            return out
+        finally:
+            cur.execute("DROP TABLE IF EXISTS temp._asof_events")
+
     # ------------------------------ Context mgmt ------------------------------
     def close(self) -> None:
         with contextlib.suppress(Exception):
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass
 from typing import Optional
 
@@ -16,6 +17,25 @@ def _softmax(x: np.ndarray, temperature: float = 1.0) -> np.ndarray:
     return np.nan_to_num(s, nan=0.0)
 
 
+def _softmax_rows(
+    x: np.ndarray, temperature: float = 1.0, floor: float = 0.0, cap: float = 1.0
+) -> np.ndarray:
+    """Row-wise _softmax + floor/cap + renormalise over a (time x sleeve) matrix.
+
+    NaN scores get zero weight; rows with no usable score fall back to equal weights.
+    """
+    if temperature <= 0:
+        raise ValueError("temperature must be > 0")
+    x = np.atleast_2d(np.asarray(x, dtype=float))
+    v = np.where(np.isnan(x), -np.inf, x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ez = np.exp((v - v.max(axis=1, keepdims=True)) / temperature)
+        s = ez / ez.sum(axis=1, keepdims=True)
+    s = np.clip(np.nan_to_num(s, nan=0.0), floor, cap)
+    tot = s.sum(axis=1, keepdims=True)
+    return np.where(tot > 0, s / np.where(tot > 0, tot, 1.0), 1.0 / x.shape[1])
+
+
 @dataclass(frozen=True)
 class EWMAConfig:
     window: int = 60  # (kept for future use; we use decay)
@@ -60,6 +80,8 @@ class MetaAllocator:
         self.mode = mode
         self.ewma_cfg = ewma_cfg or EWMAConfig()
         self.bayes_cfg = bayes_cfg or BayesConfig()
+        self._cols: Optional[pd.Index] = None
+        self._ew_last = None
 
     # ---------- helpers ----------
     @staticmethod
@@ -73,79 +95,194 @@ class MetaAllocator:
         return series.ewm(alpha=alpha, adjust=False, min_periods=2).std().bfill()
 
     # ---------- modes ----------
-    def _weights_ewma(self, rets: pd.DataFrame) -> pd.DataFrame:
+    def _ewma_scores(self, rets: pd.DataFrame) -> np.ndarray:
         cfg = self.ewma_cfg
         eps = 1e-12
-
-        # EWMA mean/std per sleeve
-        mu_ewm = rets.apply(lambda s: self._ewma(s, cfg.decay))
-        sd_ewm = rets.apply(lambda s: self._ewmstd(s, cfg.decay)).clip(lower=eps)
-        sharpe_ewm = (mu_ewm / sd_ewm).clip(-10, 10)
-
-        # Expanding mean/std stabilizer
-        mu_exp = rets.expanding(min_periods=cfg.expand_warmup).mean().bfill()
-        sd_exp = (
-            rets.expanding(min_periods=cfg.expand_warmup)
-            .std()
-            .bfill()
-            .replace(0, np.nan)
-            .fillna(eps)
-        )
-        sharpe_exp = (mu_exp / sd_exp).clip(-10, 10)
-
-        # Global (full-sample) Sharpe anchor, replicated across time
-        mu_g = rets.mean()
-        sd_g = rets.std().replace(0, np.nan).fillna(eps)
-        sharpe_g_row = (mu_g / sd_g).clip(-10, 10)
-        sharpe_global = pd.DataFrame(
-            np.tile(sharpe_g_row.values, (rets.shape[0], 1)), index=rets.index, columns=rets.columns
-        )
-
+        alpha = 1.0 - cfg.decay
         a = float(cfg.expand_blend)
         b = float(cfg.global_blend)
-        base = max(0.0, 1.0 - a - b)
-        score = (base * sharpe_ewm + a * sharpe_exp + b * sharpe_global).clip(-10, 10)
-
-        w = []
-        cols = rets.columns
-        for t in rets.index:
-            v = score.loc[t, cols].to_numpy(dtype=float)
-            sm = _softmax(v, cfg.temperature)
-            sm = np.clip(sm, cfg.floor, cfg.cap)
-            if sm.sum() == 0:
-                sm = np.ones_like(sm) / len(sm)
+        t = len(rets)
+        # A zero-weight component only matters through its warm-up NaNs, so it is not computed
+        zeros, nans = np.zeros(rets.shape), np.full(rets.shape, np.nan)
+        self._ew_last = None
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # EWMA mean/std per sleeve (pandas ewm runs over all columns at once)
+            if max(0.0, 1.0 - a - b) > 0:
+                mu_ewm = rets.ewm(alpha=alpha, adjust=False).mean()
+                var_ewm = rets.ewm(alpha=alpha, adjust=False, min_periods=2).var()
+                self._ew_last = (mu_ewm.to_numpy()[-1], var_ewm.to_numpy()[-1])
+                sd_ewm = np.sqrt(var_ewm.bfill().to_numpy())
+                sharpe_ewm = np.clip(mu_ewm.to_numpy() / np.maximum(sd_ewm, eps), -10, 10)
             else:
-                sm = sm / sm.sum()
-            w.append(sm)
-        return pd.DataFrame(w, index=rets.index, columns=cols)
+                sharpe_ewm = zeros if t >= 2 else nans
 
-    def _weights_bayes(self, rets: pd.DataFrame) -> pd.DataFrame:
-        cfg = self.bayes_cfg
-        cols = rets.columns
-        roll_mean = rets.rolling(cfg.window, min_periods=max(2, cfg.window // 5)).mean().bfill()
-        roll_var = rets.rolling(cfg.window, min_periods=max(2, cfg.window // 5)).var().bfill()
-        roll_var = roll_var.clip(lower=cfg.obs_var_floor)
+            # Expanding mean/std stabilizer
+            if a > 0:
+                mu_exp = rets.expanding(min_periods=cfg.expand_warmup).mean().bfill().to_numpy()
+                sd_exp = rets.expanding(min_periods=cfg.expand_warmup).std().bfill().to_numpy()
+                sd_exp = np.where(np.isnan(sd_exp) | (sd_exp == 0), eps, sd_exp)
+                sharpe_exp = np.clip(mu_exp / sd_exp, -10, 10)
+            else:
+                sharpe_exp = zeros if t >= cfg.expand_warmup else nans
+
+            # Global (full-sample) Sharpe anchor, broadcast across time
+            if b > 0:
+                sd_g = rets.std().to_numpy()
+                sd_g = np.where(np.isnan(sd_g) | (sd_g == 0), eps, sd_g)
+                sharpe_g = np.clip(rets.mean().to_numpy() / sd_g, -10, 10)
+            else:
+                sharpe_g = zeros
+
+        return self._blend(sharpe_ewm, sharpe_exp, sharpe_g)
 
-        n = rets.rolling(cfg.window, min_periods=1).count().clip(lower=1.0)
+    def _blend(self, sharpe_ewm, sharpe_exp, sharpe_g) -> np.ndarray:
+        a = float(self.ewma_cfg.expand_blend)
+        b = float(self.ewma_cfg.global_blend)
+        base = max(0.0, 1.0 - a - b)
+        return np.clip(base * sharpe_ewm + a * sharpe_exp + b * sharpe_g, -10, 10)
+
+    def _weights_ewma(self, rets: pd.DataFrame) -> pd.DataFrame:
+        cfg = self.ewma_cfg
+        w = _softmax_rows(self._ewma_scores(rets), cfg.temperature, cfg.floor, cfg.cap)
+        return pd.DataFrame(w, index=rets.index, columns=rets.columns)
+
+    def _bayes_scores(self, roll_mean, roll_var, n) -> np.ndarray:
+        cfg = self.bayes_cfg
+        roll_var = np.maximum(roll_var, cfg.obs_var_floor)
         inv_var0 = 1.0 / cfg.prior_var
         mu0_term = cfg.prior_mean * inv_var0
 
-        mu_post = (mu0_term + (n * roll_mean / roll_var)) / (inv_var0 + (n / roll_var))
-        var_post = 1.0 / (inv_var0 + (n / roll_var))
-        std_post = np.sqrt(var_post)
-
-        score = (mu_post / std_post).clip(-10, 10)
-        w = []
-        for t in rets.index:
-            v = score.loc[t, cols].to_numpy(dtype=float)
-            sm = _softmax(v, cfg.temperature)
-            sm = np.clip(sm, cfg.floor, cfg.cap)
-            if sm.sum() == 0:
-                sm = np.ones_like(sm) / len(sm)
+        prec = inv_var0 + (n / roll_var)
+        mu_post = (mu0_term + (n * roll_mean / roll_var)) / prec
+        std_post = np.sqrt(1.0 / prec)
+        return np.clip(mu_post / std_post, -10, 10)
+
+    def _weights_bayes(self, rets: pd.DataFrame) -> pd.DataFrame:
+        cfg = self.bayes_cfg
+        roll = rets.rolling(cfg.window, min_periods=max(2, cfg.window // 5))
+        roll_mean = roll.mean().bfill().to_numpy()
+        roll_var = roll.var().bfill().to_numpy()
+        # no NaNs after allocate()'s fillna, so the in-window count is min(t + 1, window)
+        n = np.minimum(np.arange(1, len(rets) + 1, dtype=float), cfg.window)[:, None]
+        score = self._bayes_scores(roll_mean, roll_var, n)
+        w = _softmax_rows(score, cfg.temperature, cfg.floor, cfg.cap)
+        return pd.DataFrame(w, index=rets.index, columns=rets.columns)
+
+    # ---------- online state ----------
+    # Same recursions as the batch path, so allocate(history) followed by update(bar)
+    # gives the last row of allocate(history + bar) without re-reading history.
+    def _init_state(self, columns) -> None:
+        k = len(columns)
+        self._cols = pd.Index(columns)
+        self._t = 0
+        # EWMA (pandas ewm adjust=False recursion incl. bias correction term)
+        self._ew_mean = np.zeros(k)
+        self._ew_cov = np.zeros(k)
+        self._ew_sw2 = 1.0
+        # expanding / global moments (Welford)
+        self._mean = np.zeros(k)
+        self._m2 = np.zeros(k)
+        # rolling window for bayes
+        self._ring = np.zeros((self.bayes_cfg.window, k))
+        self._rsum = np.zeros(k)
+        self._rsq = np.zeros(k)
+
+    def _seed_state(self, rets: pd.DataFrame) -> None:
+        # Online state after consuming all of `rets`, from closed forms (no per-bar replay).
+        # Only the current mode's statistics are seeded.
+        self._init_state(rets.columns)
+        t = len(rets)
+        if t == 0:
+            return
+        self._t = t
+        if self.mode == "ewma":
+            d = self.ewma_cfg.decay
+            d2 = d ** (2 * (t - 1))
+            self._ew_sw2 = d2 + ((1.0 - d) ** 2 * (1.0 - d2) / (1.0 - d * d) if d < 1.0 else 0.0)
+            if self._ew_last is not None:
+                mu, var = self._ew_last
+                self._ew_mean = mu.copy()
+                self._ew_cov = np.nan_to_num(var) * (1.0 - self._ew_sw2)
+            self._mean = rets.mean().to_numpy()
+            if t >= 2:
+                self._m2 = rets.var().to_numpy() * (t - 1)
+        else:
+            w = self.bayes_cfg.window
+            tail = rets.to_numpy()[-w:]
+            self._ring[np.arange(t - len(tail), t) % w] = tail
+            self._rsum = tail.sum(axis=0)
+            self._rsq = (tail * tail).sum(axis=0)
+
+    def _advance(self, x: np.ndarray) -> None:
+        d = self.ewma_cfg.decay
+        a = 1.0 - d
+        if self._t == 0:
+            self._ew_mean = x.copy()
+        else:
+            old = self._ew_mean
+            self._ew_mean = d * old + a * x
+            self._ew_cov = (
+                d * (self._ew_cov + (old - self._ew_mean) ** 2) + a * (x - self._ew_mean) ** 2
+            )
+            self._ew_sw2 = self._ew_sw2 * d * d + a * a
+        self._t += 1
+        delta = x - self._mean
+        self._mean += delta / self._t
+        self._m2 += delta * (x - self._mean)
+        slot = (self._t - 1) % self.bayes_cfg.window
+        drop = self._ring[slot]
+        self._rsum += x - drop
+        self._rsq += x * x - drop * drop
+        self._ring[slot] = x
+
+    def _state_scores(self) -> np.ndarray:
+        eps = 1e-12
+        t, k = self._t, len(self._cols)
+        nan = np.full(k, np.nan)
+        if self.mode == "ewma":
+            cfg = self.ewma_cfg
+            denom = 1.0 - self._ew_sw2
+            sd_ewm = np.sqrt(self._ew_cov / denom) if (t >= 2 and denom > 0) else nan
+            var = self._m2 / (t - 1) if t >= 2 else nan
+            sd = np.sqrt(np.maximum(var, 0.0))
+            sd = np.where(np.isnan(sd) | (sd == 0), eps, sd)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                sharpe_ewm = np.clip(self._ew_mean / np.maximum(sd_ewm, eps), -10, 10)
+                sharpe_g = np.clip(self._mean / sd, -10, 10)
+                sharpe_exp = sharpe_g if t >= cfg.expand_warmup else nan
+            return self._blend(sharpe_ewm, sharpe_exp, sharpe_g)
+        cfg = self.bayes_cfg
+        n = float(min(t, cfg.window))
+        if n < max(2, cfg.window // 5):
+            return nan
+        mean = self._rsum / n
+        var = np.maximum(self._rsq - n * mean * mean, 0.0) / (n - 1)
+        return self._bayes_scores(mean, var, n)
+
+    def update(self, new_returns) -> pd.Series:
+        """Advance by one bar (Series/mapping by sleeve, or array in column order) in O(sleeves).
+
+        Continues from the last allocate() call (or starts fresh); returns that bar's weights.
+        A DataFrame is consumed bar by bar and returns one weight row per bar.
+        """
+        if isinstance(new_returns, pd.DataFrame):
+            out = [self.update(row) for _, row in new_returns.iterrows()]
+            return pd.DataFrame(out, index=new_returns.index)
+        if self._cols is None:
+            if isinstance(new_returns, (pd.Series, Mapping)):
+                cols = list(new_returns.keys())
             else:
-                sm = sm / sm.sum()
-            w.append(sm)
-        return pd.DataFrame(w, index=rets.index, columns=cols)
+                cols = list(range(len(np.atleast_1d(new_returns))))
+            self._init_state(cols)
+        if isinstance(new_returns, (pd.Series, Mapping)):
+            x = pd.Series(new_returns, dtype=float).reindex(self._cols).to_numpy()
+        else:
+            x = np.asarray(new_returns, dtype=float).reshape(-1)
+        self._advance(np.nan_to_num(x, nan=0.0))
+        cfg = self.ewma_cfg if self.mode == "ewma" else self.bayes_cfg
+        w = _softmax_rows(self._state_scores(), cfg.temperature, cfg.floor, cfg.cap)[0]
+        return pd.Series(w, index=self._cols)
 
     # ---------- public ----------
     def allocate(self, returns: pd.DataFrame) -> pd.DataFrame:
@@ -154,6 +291,7 @@ class MetaAllocator:
             W = self._weights_ewma(rets)
         else:
             W = self._weights_bayes(rets)
+        self._seed_state(rets)
         rs = W.sum(axis=1).replace(0, np.nan)
         W = W.div(rs, axis=0).fillna(1.0 / W.shape[1])
         return W